@@ -0,0 +1,70 @@
+"""
+运行：
+    python -m benchmarks                       # quick 档
+    python -m benchmarks --scale full -k render_json
+    python -m benchmarks --save main           # 保存为基线 benchmarks/baselines/main.json
+    python -m benchmarks --compare main        # 与基线对比，回归时退出码为 1
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import click
+
+from . import cases  # noqa: F401  注册全部基准
+from .harness import compare, load_baseline, measure, registered, save_baseline
+
+
+@click.command()
+@click.option("--scale", type=click.Choice(["quick", "full"]), default="quick", help="输入规模档位")
+@click.option("-k", "pattern", default=None, help="仅运行名称包含该子串的基准")
+@click.option("--repeat", type=int, default=None, help="覆盖每个基准的计时次数")
+@click.option("--workdir", type=click.Path(file_okay=False), default=None, help="合成输入缓存目录（默认临时目录）")
+@click.option("--save", "save_name", default=None, help="将结果保存为基线名称")
+@click.option("--compare", "compare_name", default=None, help="与指定基线（名称或路径）对比")
+@click.option("--threshold", type=float, default=1.2, show_default=True, help="超过基线倍数视为回归")
+@click.option("--json", "as_json", is_flag=True, help="以 JSON 输出结果")
+def main(scale, pattern, repeat, workdir, save_name, compare_name, threshold, as_json):
+    selected = registered(scale, pattern)
+    if not selected:
+        raise click.UsageError("没有匹配的基准")
+    tmp = None
+    if workdir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="docx-stylekit-bench-")
+        workdir = tmp.name
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    try:
+        for c in selected:
+            results[c.name] = measure(c, workdir, repeat=repeat)
+            if not as_json:
+                r = results[c.name]
+                click.echo(f"{c.name:<28} min {r['min_s']:>9.4f}s  median {r['median_s']:>9.4f}s  peak {r['peak_mem_kb']:>11.1f} KiB")
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    rows = None
+    if compare_name:
+        rows = compare(results, load_baseline(compare_name), threshold=threshold)
+    if as_json:
+        click.echo(json.dumps({"results": results, "compare": rows}, ensure_ascii=False, indent=2))
+    elif rows:
+        for row in rows:
+            if row["status"] == "new":
+                click.echo(f"[new] {row['name']}")
+            else:
+                flag = "!!" if row["status"] == "regressed" else "ok"
+                click.echo(f"[{flag}] {row['name']:<28} time x{row['time_ratio']}  mem x{row['mem_ratio']}")
+    if save_name:
+        path = save_baseline(results, save_name)
+        click.echo(f"baseline saved: {path}", err=True)
+    if rows and any(r["status"] == "regressed" for r in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+公开 API 的基准用例。命名：<入口>.<输入规模>，scale=quick 默认运行，full 为大规模档。
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from docx import Document
+
+from docx_stylekit import (
+    diff_yaml,
+    fix_image_paragraphs,
+    merge_batch,
+    merge_yaml,
+    observe_docx,
+    resolve_effective_styles,
+    render_from_json,
+    render_book_from_markdown,
+    render_from_markdown,
+    sanitize_docx,
+)
+from docx_stylekit.convert.markdown import markdown_to_template
+from docx_stylekit.data import load_default_profile
+from docx_stylekit.io.package_zip import save_docx
+from docx_stylekit.merge.merger import merge_enterprise_with_observed
+from docx_stylekit.utils.dicts import MergedView, deep_merge, merge_shared
+from docx_stylekit.utils.io import dump_yaml, load_yaml
+
+from . import generators as gen
+from .harness import case
+
+ENTERPRISE_BASELINE = Path(__file__).resolve().parent.parent / "examples" / "enterprise_baseline.yaml"
+
+
+def _docx_setup(name, **kwargs):
+    def setup(workdir: Path):
+        path = workdir / f"{name}.docx"
+        if not path.exists():
+            gen.make_docx(path, **kwargs)
+        return path
+    return setup
+
+
+def _register_observe(label, scale, **kwargs):
+    case(f"observe.{label}", setup=_docx_setup(f"observe_{label}", **kwargs), scale=scale)(observe_docx)
+
+
+_register_observe("p10", "quick", paragraphs=10)
+_register_observe("p1k", "quick", paragraphs=1000)
+_register_observe("p50k", "full", paragraphs=50000)
+_register_observe("s50", "quick", paragraphs=100, styles=50)
+_register_observe("s500", "full", paragraphs=1000, styles=500)
+_register_observe("img20", "quick", paragraphs=20, images=20)
+_register_observe("img200", "full", paragraphs=200, images=200)
+
+
+def _register_effective_styles(label, scale, styles):
+    def setup(_workdir: Path):
+        return gen.make_observed(styles=styles)
+    case(f"effective_styles.{label}", setup=setup, scale=scale)(resolve_effective_styles)
+
+
+_register_effective_styles("s500", "quick", 500)
+_register_effective_styles("s5k", "full", 5000)
+
+
+def _observed_pair(styles):
+    def setup(_workdir: Path):
+        left = gen.make_observed(styles=styles)
+        return left, gen.mutate_observed(left)
+    return setup
+
+
+def _register_merge(label, scale, styles):
+    def run(args):
+        baseline = load_yaml(ENTERPRISE_BASELINE)
+        merge_yaml(baseline, args[0])
+    case(f"merge.{label}", setup=_observed_pair(styles), scale=scale)(run)
+
+
+def _register_diff(label, scale, styles):
+    def run(args):
+        diff_yaml(args[0], args[1])
+
+    def run_structural(args):
+        diff_yaml(args[0], args[1], structural=True)
+    case(f"diff.{label}", setup=_observed_pair(styles), scale=scale)(run)
+    case(f"diff_structural.{label}", setup=_observed_pair(styles), scale=scale)(run_structural)
+
+
+for _label, _scale, _styles in (("s50", "quick", 50), ("s500", "full", 500)):
+    _register_merge(_label, _scale, _styles)
+    _register_diff(_label, _scale, _styles)
+
+
+def _register_merge_batch(label, scale, files, styles):
+    def setup(workdir: Path):
+        src = workdir / f"merge_batch_{label}"
+        if not src.exists():
+            observed = gen.make_observed(styles=styles)
+            for i in range(files):
+                dump_yaml(gen.mutate_observed(observed) if i % 2 else observed, src / f"dept_{i:04d}.yaml")
+        return src, workdir / f"merge_batch_{label}_out"
+
+    def run_cold(args):
+        merge_batch(ENTERPRISE_BASELINE, [args[0]], args[1], force=True)
+
+    def run_warm(args):
+        merge_batch(ENTERPRISE_BASELINE, [args[0]], args[1])
+    case(f"merge_batch.cold.{label}", setup=setup, scale=scale, repeat=1)(run_cold)
+    case(f"merge_batch.warm.{label}", setup=setup, scale=scale)(run_warm)
+
+
+_register_merge_batch("f50", "quick", 50, 50)
+_register_merge_batch("f500", "full", 500, 50)
+
+
+def _large_profile(styles):
+    """默认模板 + 大量内联样式；override 只改两个键（典型的每次渲染/每张表合并）。"""
+    def setup(_workdir: Path):
+        base = merge_shared(load_default_profile(), gen.make_json_template(paragraphs=0, styles=styles))
+        override = {"doc": {"stylesInline": {"Normal": {"font": {"sizePt": 12}}}, "toc": {"levels": [1, 2]}}}
+        return base, override
+    return setup
+
+
+def _register_dict_merge(label, scale, styles):
+    setup = _large_profile(styles)
+
+    def run_deep(args):
+        deep_merge(args[0], args[1])
+
+    def run_shared(args):
+        merge_shared(args[0], args[1])
+
+    def run_view(args):
+        view = MergedView(args[0], args[1])
+        view["doc"]["stylesInline"]["Normal"]["font"]["sizePt"]
+    case(f"dicts.deep_merge.{label}", setup=setup, scale=scale)(run_deep)
+    case(f"dicts.merge_shared.{label}", setup=setup, scale=scale)(run_shared)
+    case(f"dicts.merged_view.{label}", setup=setup, scale=scale)(run_view)
+
+
+_register_dict_merge("s500", "quick", 500)
+_register_dict_merge("s5k", "full", 5000)
+
+
+def _register_merge_enterprise(label, scale, styles):
+    def setup(_workdir: Path):
+        return load_yaml(ENTERPRISE_BASELINE), gen.make_observed(styles=styles)
+
+    def run(args):
+        merge_enterprise_with_observed(args[0], args[1])
+    case(f"merger.{label}", setup=setup, scale=scale)(run)
+
+
+_register_merge_enterprise("s50", "quick", 50)
+
+
+class _Pipe:
+    def __init__(self, raw):
+        self.write = raw.write
+
+
+def _register_render(label, scale, repeat=3, **kwargs):
+    def setup(workdir: Path):
+        path = workdir / f"render_{label}.json"
+        if not path.exists():
+            path.write_text(json.dumps(gen.make_json_template(**kwargs), ensure_ascii=False), encoding="utf-8")
+        return path, workdir / f"render_{label}.docx"
+
+    def run(args):
+        render_from_json(args[0], output_path=args[1])
+
+    def run_stream(args):
+        # 流式 ZIP 写入不可 seek 的管道（模拟 -o - / HTTP 响应），与写文件对照
+        with open(os.devnull, "wb", buffering=0) as null:
+            render_from_json(args[0], output_path=_Pipe(null))
+    case(f"render_json.{label}", setup=setup, scale=scale, repeat=repeat)(run)
+    case(f"render_json_stream.{label}", setup=setup, scale=scale, repeat=repeat)(run_stream)
+
+
+_register_render("p10", "quick", paragraphs=10)
+_register_render("p1k", "quick", paragraphs=1000)
+_register_render("p50k", "full", repeat=1, paragraphs=50000)
+_register_render("t10", "quick", paragraphs=10, table_rows=10)
+_register_render("t10k", "full", repeat=1, paragraphs=10, table_rows=10000)
+_register_render("s50", "quick", paragraphs=100, styles=50)
+_register_render("s500", "full", paragraphs=1000, styles=500)
+
+
+def _register_wide_table(label, scale, rows, cols):
+    # 宽表：列宽 + 表头/隔行/正文版式，单元格写入与版式均为单趟
+    def setup(workdir: Path):
+        cell = {"blocks": [{"type": "paragraph", "runs": [{"text": "单元格"}]}]}
+        fmt = {"header": {"fill": "DDEEFF", "bold": True}, "bandedRows": True,
+               "alternate": {"fill": "F5F5F5"}, "body": {"verticalAlign": "center"}}
+        block = {"type": "table", "columns": [{}] * cols, "format": fmt,
+                 "header": [[cell] * cols], "rows": [[cell] * cols] * rows}
+        return {"doc": {"blocks": [block]}}, workdir / f"render_table_{label}.docx"
+
+    def run(args):
+        render_from_json(args[0], output_path=args[1])
+    case(f"render_json_table.{label}", setup=setup, scale=scale)(run)
+
+
+_register_wide_table("r200c12", "quick", 200, 12)
+_register_wide_table("r5kc20", "full", 5000, 20)
+
+
+def _register_page_templates(label, scale, uses):
+    # 同一封面/附录模板按不同变量反复套用：模板内容编译一次后按次克隆并代入变量
+    def setup(workdir: Path):
+        cell = {"blocks": [{"type": "paragraph", "runs": [{"text": "单元格"}]}]}
+        tpl = {"doc": {
+            "pageTemplates": {"appendix": {
+                "layout": {"orientation": "landscape"},
+                "blocks": [
+                    {"type": "heading", "level": 1, "text": "附录 {n}"},
+                    {"type": "paragraph", "runs": [{"text": "附录说明"}]},
+                    {"type": "table", "header": [[cell] * 4], "rows": [[cell] * 4] * 20},
+                ],
+            }},
+            "blocks": [{"useTemplate": "appendix", "variables": {"n": i}} for i in range(uses)],
+        }}
+        return tpl, workdir / f"render_tpl_{label}.docx"
+
+    def run(args):
+        render_from_json(args[0], output_path=args[1])
+    case(f"render_json_page_templates.{label}", setup=setup, scale=scale)(run)
+
+
+_register_page_templates("u50", "quick", 50)
+_register_page_templates("u500", "full", 500)
+
+
+def _register_footer_sections(label, scale, sections):
+    # 大量 useTemplate 分节 + 页码页脚：页脚只填一次、各节链接到上一节，耗时不应随节数平方增长
+    def setup(workdir: Path):
+        tpl = {"doc": {
+            "pageTemplates": {"sec": {"layout": {}, "blocks": [{"type": "paragraph", "runs": [{"text": "节"}]}]}},
+            "headersFooters": {"footer": [{"type": "pageNumber", "align": "center"}]},
+            "blocks": [{"useTemplate": "sec"} for _ in range(sections)],
+        }}
+        return tpl, workdir / f"render_footer_{label}.docx"
+
+    def run(args):
+        render_from_json(args[0], output_path=args[1])
+    case(f"render_json_footer_sections.{label}", setup=setup, scale=scale)(run)
+
+
+_register_footer_sections("s200", "quick", 200)
+_register_footer_sections("s2k", "full", 2000)
+
+
+def _register_section_tables(label, scale, sections, tables):
+    # 先分出大量节再写大量表格：表格宽度读记录的节状态，不随节数增长
+    def setup(workdir: Path):
+        cell = {"blocks": [{"type": "paragraph", "runs": [{"text": "单元格"}]}]}
+        table = {"type": "table", "columns": [{"widthPct": 40}, {}], "rows": [[cell, cell]]}
+        tpl = {"doc": {
+            "pageTemplates": {"sec": {"layout": {"orientation": "landscape"}, "blocks": [table]}},
+            "blocks": [{"useTemplate": "sec"} for _ in range(sections)] + [table] * tables,
+        }}
+        return tpl, workdir / f"render_section_tables_{label}.docx"
+
+    def run(args):
+        render_from_json(args[0], output_path=args[1])
+    case(f"render_json_section_tables.{label}", setup=setup, scale=scale)(run)
+
+
+_register_section_tables("s100t500", "quick", 100, 500)
+_register_section_tables("s1kt5k", "full", 1000, 5000)
+
+
+def _register_render_incremental(label, scale, **kwargs):
+    # 缓存预热后修改一个段落再渲染：衡量只重建单块的增量路径
+    def setup(workdir: Path):
+        tpl = gen.make_json_template(**kwargs)
+        cache = workdir / f"render_inc_{label}.fragments.json"
+        render_from_json(tpl, output_path=workdir / f"render_inc_{label}.docx", incremental=True, fragment_cache=cache)
+        for block in tpl["doc"]["blocks"][len(tpl["doc"]["blocks"]) // 2:]:
+            if block.get("type") == "paragraph" and block.get("runs"):
+                block["runs"][0]["text"] += "（已修改）"
+                break
+        return tpl, workdir / f"render_inc_{label}.docx", cache
+
+    def run(args):
+        render_from_json(args[0], output_path=args[1], incremental=True, fragment_cache=args[2])
+    case(f"render_json_incremental.{label}", setup=setup, scale=scale)(run)
+
+
+_register_render_incremental("p1k", "quick", paragraphs=1000)
+_register_render_incremental("p50k", "full", paragraphs=50000)
+
+
+def _register_render_sharded(label, scale, workers=2, **kwargs):
+    # 分片并行写正文（工作进程数为 workers），与 render_json 同规模对照
+    def setup(workdir: Path):
+        return gen.make_json_template(**kwargs), workdir / f"render_sharded_{label}.docx"
+
+    def run(args):
+        render_from_json(args[0], output_path=args[1], workers=workers)
+    case(f"render_json_sharded.{label}", setup=setup, scale=scale)(run)
+
+
+def _register_render_cached(label, scale, cache_name, **kwargs):
+    # 渲染结果缓存命中：setup 中先渲染一次写入缓存，run 只算键并取回字节
+    def setup(workdir: Path):
+        tpl = gen.make_json_template(**kwargs)
+        cache = workdir / cache_name
+        render_from_json(tpl, return_bytes=True, render_cache=cache)
+        return tpl, cache
+
+    def run(args):
+        render_from_json(args[0], return_bytes=True, render_cache=args[1])
+    case(f"render_json_cached.{label}", setup=setup, scale=scale)(run)
+
+
+_register_render_cached("p1k", "quick", "render_cache_dir", paragraphs=1000)
+_register_render_cached("p1k_sqlite", "quick", "render_cache.sqlite", paragraphs=1000)
+
+
+def _register_render_pruned(label, scale, **kwargs):
+    # 保存前精简样式/编号/孤立部件：与 render_json 同规模对照（精简本身的开销 vs 少写出的字节）
+    def setup(workdir: Path):
+        return gen.make_json_template(**kwargs), workdir / f"render_pruned_{label}.docx"
+
+    def run(args):
+        render_from_json(args[0], output_path=args[1], prune=True)
+    case(f"render_json_pruned.{label}", setup=setup, scale=scale)(run)
+
+
+_register_render_pruned("p1k", "quick", paragraphs=1000)
+_register_render_pruned("p50k", "full", paragraphs=50000)
+
+
+_register_render_sharded("p5k", "quick", paragraphs=5000)
+_register_render_sharded("p50k", "full", workers=4, paragraphs=50000)
+
+
+def _register_markdown(label, scale, repeat=3, **kwargs):
+    def setup(workdir: Path):
+        path = workdir / f"markdown_{label}.md"
+        if not path.exists():
+            path.write_text(gen.make_markdown(**kwargs), encoding="utf-8")
+        return path, workdir / f"markdown_{label}.docx"
+
+    def run(args):
+        render_from_markdown(args[0], output_path=args[1])
+
+    def run_stream(args):
+        render_from_markdown(args[0], output_path=args[1], streaming=True)
+    case(f"render_markdown.{label}", setup=setup, scale=scale, repeat=repeat)(run)
+    case(f"render_markdown_stream.{label}", setup=setup, scale=scale, repeat=repeat)(run_stream)
+
+
+_register_markdown("p10", "quick", paragraphs=10)
+_register_markdown("p1k", "quick", paragraphs=1000)
+_register_markdown("p50k", "full", repeat=1, paragraphs=50000)
+_register_markdown("t10k", "full", repeat=1, paragraphs=10, table_rows=10000)
+
+
+def _register_markdown_snippets(label, scale, snippets):
+    def setup(_workdir: Path):
+        return [gen.make_markdown(paragraphs=3) for _ in range(snippets)]
+
+    def run(texts):
+        for text in texts:
+            markdown_to_template(text)
+    case(f"markdown_snippets.{label}", setup=setup, scale=scale)(run)
+
+
+_register_markdown_snippets("n1k", "quick", 1000)
+
+
+def _register_markdown_book(label, scale, chapters, **kwargs):
+    def setup(workdir: Path):
+        src = workdir / f"markdown_book_{label}"
+        if not src.exists():
+            src.mkdir(parents=True)
+            for i in range(chapters):
+                (src / f"ch{i:03d}.md").write_text(gen.make_markdown(**kwargs), encoding="utf-8")
+        return src, workdir / f"markdown_book_{label}.docx"
+
+    def run(args):
+        render_book_from_markdown([args[0]], output_path=args[1])
+    case(f"markdown_book.{label}", setup=setup, scale=scale, repeat=1)(run)
+
+
+_register_markdown_book("c20", "quick", 20, paragraphs=50)
+_register_markdown_book("c200", "full", 200, paragraphs=250)
+
+
+def _register_sanitize(label, scale, repeat=3, **kwargs):
+    def setup(workdir: Path):
+        raw = _docx_setup(f"sanitize_{label}", **kwargs)(workdir)
+        return raw, workdir / f"sanitize_{label}_out.docx"
+
+    def run(args):
+        sanitize_docx(args[0], output_path=args[1])
+    case(f"sanitize.{label}", setup=setup, scale=scale, repeat=repeat)(run)
+
+
+_register_sanitize("p1k", "quick", paragraphs=1000)
+_register_sanitize("p50k", "full", repeat=1, paragraphs=50000)
+_register_sanitize("img20", "quick", paragraphs=20, images=20)
+
+
+def _register_fix_images(label, scale, **kwargs):
+    def setup(workdir: Path):
+        raw = _docx_setup(f"fix_images_{label}", **kwargs)(workdir)
+        return raw, workdir / f"fix_images_{label}_out.docx"
+
+    def run(args):
+        fix_image_paragraphs(args[0], output_path=args[1])
+    case(f"fix_images.{label}", setup=setup, scale=scale)(run)
+
+
+_register_fix_images("img20", "quick", paragraphs=20, images=20)
+_register_fix_images("img200", "full", paragraphs=200, images=200)
+
+
+def _register_save(label, scale, **kwargs):
+    # 仅测保存（打包 + 压缩）：默认 doc.save 对照各压缩选项；XML 为主的包与媒体为主的包各一组
+    def setup(workdir: Path):
+        return Document(str(_docx_setup(f"save_{label}", **kwargs)(workdir))), workdir / f"save_{label}_out.docx"
+
+    variants = {
+        "default": {},
+        "level1": {"compress_level": 1},
+        "level9": {"compress_level": 9},
+        "stored_media": {"store_media": True},
+        "stored": {"compress_level": 0},
+    }
+    for name, options in variants.items():
+        def run(args, options=options):
+            save_docx(args[0], args[1], **options)
+        case(f"save_package.{name}.{label}", setup=setup, scale=scale)(run)
+
+
+_register_save("xml20k", "quick", paragraphs=20000, styles=50)
+_register_save("img100", "quick", paragraphs=20, images=100)
+_register_save("xml200k", "full", paragraphs=200000, styles=50, table_rows=5000)
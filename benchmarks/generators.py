@@ -0,0 +1,241 @@
+"""
+合成基准输入：按规模生成 DOCX / JSON 模板 / Markdown / observed YAML。
+
+所有生成器均为确定性输出（固定随机种子），保证不同机器、不同次运行的输入一致。
+"""
+from __future__ import annotations
+
+import random
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.shared import Pt
+
+_WORDS = [
+    "企业", "文档", "样式", "规范", "模板", "标题", "正文", "表格", "编号", "页眉",
+    "页脚", "段落", "字号", "行距", "缩进", "docx", "stylekit", "render", "merge", "diff",
+]
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return "".join(rng.choice(_WORDS) for _ in range(words)) + "。"
+
+
+def make_png(width: int = 64, height: int = 64, *, seed: int = 0) -> bytes:
+    """生成一张 RGB PNG（噪声像素，避免被压缩得过小）。"""
+    rng = random.Random(seed)
+    raw = bytearray()
+    for _ in range(height):
+        raw.append(0)  # filter: none
+        raw.extend(rng.getrandbits(8) for _ in range(width * 3))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(bytes(raw)))
+        + chunk(b"IEND", b"")
+    )
+
+
+def make_docx(
+    path: Path,
+    *,
+    paragraphs: int = 10,
+    styles: int = 0,
+    table_rows: int = 0,
+    images: int = 0,
+    seed: int = 0,
+) -> Path:
+    """生成合成 DOCX：自定义样式、标题/正文段落、单张大表与若干图片。"""
+    rng = random.Random(seed)
+    doc = Document()
+    custom = []
+    for idx in range(styles):
+        st = doc.styles.add_style(f"BenchStyle {idx}", WD_STYLE_TYPE.PARAGRAPH)
+        st.base_style = doc.styles["Normal"]
+        st.font.size = Pt(rng.choice([9, 10.5, 12, 14, 16, 22]))
+        st.font.bold = bool(idx % 2)
+        custom.append(st)
+
+    for idx in range(paragraphs):
+        if idx % 20 == 0:
+            doc.add_paragraph(f"{idx // 20 + 1}、{_sentence(rng, 4)}", style="Heading 1")
+        else:
+            style = custom[idx % len(custom)] if custom else None
+            doc.add_paragraph(_sentence(rng), style=style)
+
+    if table_rows:
+        table = doc.add_table(rows=table_rows + 1, cols=4)
+        for c_idx, cell in enumerate(table.rows[0].cells):
+            cell.text = f"列{c_idx + 1}"
+        for row in table.rows[1:]:
+            for cell in row.cells:
+                cell.text = _sentence(rng, 3)
+
+    if images:
+        img_path = path.with_suffix(".png")
+        for idx in range(images):
+            img_path.write_bytes(make_png(96, 96, seed=seed + idx))
+            doc.add_paragraph(" ")
+            doc.add_picture(str(img_path))
+        img_path.unlink(missing_ok=True)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc.save(path)
+    return path
+
+
+def _runs(rng: random.Random) -> List[Dict[str, Any]]:
+    runs = [{"text": _sentence(rng, 6)}]
+    if rng.random() < 0.3:
+        runs.append({"text": _sentence(rng, 2), "charStyleRef": "Strong"})
+    runs.append({"text": _sentence(rng, 4)})
+    return runs
+
+
+def make_json_template(
+    *,
+    paragraphs: int = 10,
+    table_rows: int = 0,
+    styles: int = 0,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """生成 render_from_json 可用的 JSON 模板（标题 + 段落 + 可选大表 + 内联样式）。"""
+    rng = random.Random(seed)
+    styles_inline: Dict[str, Any] = {
+        "Strong": {"type": "character", "font": {"bold": True}},
+    }
+    for idx in range(styles):
+        styles_inline[f"BenchStyle {idx}"] = {
+            "type": "paragraph",
+            "basedOn": "Normal",
+            "font": {"sizePt": rng.choice([10.5, 12, 14, 16]), "bold": bool(idx % 2)},
+            "paragraph": {"lineExactPt": 28, "firstLineChars": 2},
+        }
+    style_names = [n for n, d in styles_inline.items() if d["type"] == "paragraph"]
+
+    blocks: List[Dict[str, Any]] = []
+    for idx in range(paragraphs):
+        if idx % 20 == 0:
+            blocks.append({"type": "heading", "level": 1, "text": f"{idx // 20 + 1}、{_sentence(rng, 4)}"})
+            continue
+        blocks.append({
+            "type": "paragraph",
+            "styleRef": style_names[idx % len(style_names)] if style_names else "Normal",
+            "runs": _runs(rng),
+        })
+
+    if table_rows:
+        def cell(text):
+            return {"blocks": [{"type": "paragraph", "styleRef": "TableBase", "runs": [{"text": text}]}]}
+        blocks.append({
+            "type": "table",
+            "header": [[cell(f"列{c + 1}") for c in range(4)]],
+            "rows": [[cell(_sentence(rng, 3)) for _ in range(4)] for _ in range(table_rows)],
+        })
+
+    return {"doc": {"stylesInline": styles_inline, "blocks": blocks}}
+
+
+def make_markdown(*, paragraphs: int = 10, table_rows: int = 0, seed: int = 0) -> str:
+    """生成 Markdown：标题、强调段落、列表、代码块与可选表格。"""
+    rng = random.Random(seed)
+    lines: List[str] = []
+    for idx in range(paragraphs):
+        if idx % 20 == 0:
+            lines.append(f"# 第{idx // 20 + 1}节 {_sentence(rng, 3)}")
+        elif idx % 7 == 0:
+            lines.extend(f"- {_sentence(rng, 4)}" for _ in range(3))
+        elif idx % 11 == 0:
+            lines.extend(["```", _sentence(rng, 5), "```"])
+        else:
+            lines.append(f"{_sentence(rng, 5)} **{_sentence(rng, 2)}** *{_sentence(rng, 2)}* `code`")
+        lines.append("")
+    if table_rows:
+        lines.append("| A | B | C | D |")
+        lines.append("| --- | --- | --- | --- |")
+        for _ in range(table_rows):
+            lines.append("| " + " | ".join(_sentence(rng, 2) for _ in range(4)) + " |")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def make_observed(*, styles: int = 50, seed: int = 0) -> Dict[str, Any]:
+    """生成 observed.yaml 结构（与 observe_docx 的输出同形）。"""
+    rng = random.Random(seed)
+
+    def rpr():
+        size = rng.choice([10.5, 12.0, 14.0, 16.0])
+        return {
+            "eastAsia": rng.choice(["仿宋_GB2312", "黑体", "宋体"]),
+            "ascii": "Times New Roman",
+            "bold": rng.random() < 0.3,
+            "italic": False,
+            "underline": "none",
+            "size_pt": size,
+            "size_cn": None,
+            "color": {"hex": "#000000"},
+        }
+
+    def ppr():
+        return {
+            "alignment": rng.choice(["both", "left", "center"]),
+            "line": {"rule": "exact", "value_pt": 28.0},
+            "space_before_pt": 0,
+            "space_after_pt": 0,
+            "indent": {"first_line": {"type": "chars", "value": 2.0}, "left_cm": 0, "right_cm": 0},
+            "outline_level": None,
+            "keep_next": False,
+        }
+
+    paragraph_styles = {}
+    for idx in range(styles):
+        paragraph_styles[f"BenchStyle{idx}"] = {
+            "name": f"BenchStyle {idx}",
+            "based_on": "Normal" if idx else None,
+            "link_char_style": None,
+            "rPr": rpr(),
+            "pPr": ppr(),
+        }
+    sections = []
+    for idx in range(max(1, styles // 50)):
+        sections.append({
+            "pgSz": {"w_cm": 21.0, "h_cm": 29.7, "orient": "portrait"},
+            "pgMar": {"top": 2.5, "bottom": 2.5, "left": 2.8, "right": 2.8, "header": 1.5, "footer": 1.75, "gutter": 0},
+            "titlePg": bool(idx % 2),
+            "pgNumStart": 1,
+            "headerRefs": [{"type": "default", "rId": f"rId{idx * 2 + 7}"}],
+            "footerRefs": [{"type": "default", "rId": f"rId{idx * 2 + 8}"}],
+        })
+    return {
+        "theme": {"colors": {"accent1": "#4472C4", "text1": "#000000"}, "fonts": {"major": {"latin": "Calibri"}, "minor": {"latin": "Calibri"}}},
+        "styles": {"paragraph_styles": paragraph_styles, "character_styles": {}, "table_styles": {}, "doc_defaults": {"rPr": rpr(), "pPr": ppr()}},
+        "numbering": {"abstract": {}, "nums": {}},
+        "page_setup": {"sections": sections, "even_odd_headers": False},
+        "headers_footers": {"headers": {}, "footers": {}},
+    }
+
+
+def mutate_observed(observed: Dict[str, Any], *, ratio: float = 0.1, seed: int = 1) -> Dict[str, Any]:
+    """复制一份 observed 并按比例改动样式字段，用于 diff 基准。"""
+    import copy
+
+    rng = random.Random(seed)
+    out = copy.deepcopy(observed)
+    for style in out["styles"]["paragraph_styles"].values():
+        if rng.random() < ratio:
+            style["rPr"]["size_pt"] = rng.choice([9.0, 22.0])
+            style["pPr"]["alignment"] = "right"
+    for sec in out["page_setup"]["sections"]:
+        if rng.random() < ratio:
+            sec["footerRefs"][0]["rId"] = "rId99"
+    return out
@@ -0,0 +1,135 @@
+"""
+轻量基准框架（asv 风格）：
+- 用 @case 注册基准，按 scale 分档（quick / full）；
+- 每个基准先 setup 准备输入，再分别测量耗时（perf_counter，多次取 min/median）
+  与峰值内存（tracemalloc，单独一次，避免干扰计时）；
+- 结果可保存为基线 JSON，后续运行与基线对比并标记回归。
+"""
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable[..., Any]
+    setup: Optional[Callable[[Path], Any]] = None
+    scale: str = "quick"
+    repeat: int = 3
+    tags: List[str] = field(default_factory=list)
+
+
+_REGISTRY: Dict[str, Case] = {}
+
+
+def case(name: str, *, setup: Optional[Callable[[Path], Any]] = None, scale: str = "quick", repeat: int = 3, tags=()):
+    """注册一个基准：func(args) 为被测对象，setup(workdir) 返回 args。"""
+    def deco(func):
+        if name in _REGISTRY:
+            raise ValueError(f"重复的基准名：{name}")
+        _REGISTRY[name] = Case(name, func, setup, scale, repeat, list(tags))
+        return func
+    return deco
+
+
+def registered(scale: str = "quick", pattern: Optional[str] = None) -> List[Case]:
+    scales = {"quick": ("quick",), "full": ("quick", "full")}[scale]
+    out = []
+    for c in _REGISTRY.values():
+        if c.scale not in scales:
+            continue
+        if pattern and pattern not in c.name:
+            continue
+        out.append(c)
+    return out
+
+
+def measure(c: Case, workdir: Path, *, repeat: Optional[int] = None) -> Dict[str, Any]:
+    args = c.setup(workdir) if c.setup else None
+    call = (lambda: c.func(args)) if c.setup else c.func
+    times = []
+    for _ in range(repeat or c.repeat):
+        gc.collect()
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "min_s": round(min(times), 6),
+        "median_s": round(statistics.median(times), 6),
+        "peak_mem_kb": round(peak / 1024, 1),
+        "runs": len(times),
+    }
+
+
+def environment() -> Dict[str, str]:
+    from docx_stylekit import __version__
+
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "docx_stylekit": __version__,
+    }
+
+
+def save_baseline(results: Dict[str, Dict[str, Any]], name: str) -> Path:
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = BASELINE_DIR / f"{name}.json"
+    payload = {"env": environment(), "results": results}
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def load_baseline(name_or_path: str) -> Dict[str, Dict[str, Any]]:
+    path = Path(name_or_path)
+    if not path.exists():
+        path = BASELINE_DIR / f"{name_or_path}.json"
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    *,
+    threshold: float = 1.2,
+) -> List[Dict[str, Any]]:
+    """
+    与基线逐项对比：ratio = 当前 / 基线（时间取 min_s，内存取 peak_mem_kb）。
+    任一指标超过 threshold 记为回归。
+    """
+    rows = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base:
+            rows.append({"name": name, "status": "new"})
+            continue
+        t_ratio = cur["min_s"] / base["min_s"] if base["min_s"] else None
+        m_ratio = cur["peak_mem_kb"] / base["peak_mem_kb"] if base["peak_mem_kb"] else None
+        regressed = any(r is not None and r > threshold for r in (t_ratio, m_ratio))
+        rows.append({
+            "name": name,
+            "status": "regressed" if regressed else "ok",
+            "time_ratio": round(t_ratio, 3) if t_ratio is not None else None,
+            "mem_ratio": round(m_ratio, 3) if m_ratio is not None else None,
+        })
+    return rows
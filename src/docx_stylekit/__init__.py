@@ -1,22 +1,34 @@
 from .api import (
     observe_docx,
+    resolve_effective_styles,
     merge_yaml,
+    merge_batch,
     diff_yaml,
+    iter_diff_yaml,
+    diff_corpus,
     render_from_json,
     render_from_markdown,
+    render_book_from_markdown,
     fix_image_paragraphs,
     sanitize_docx,
+    profile_session,
 )
 
 __all__ = [
     "__version__",
     "observe_docx",
+    "resolve_effective_styles",
     "merge_yaml",
+    "merge_batch",
     "diff_yaml",
+    "iter_diff_yaml",
+    "diff_corpus",
     "render_from_json",
     "render_from_markdown",
+    "render_book_from_markdown",
     "fix_image_paragraphs",
     "sanitize_docx",
+    "profile_session",
 ]
 
 __version__ = "0.2.0"
@@ -1,35 +1,54 @@
 from __future__ import annotations
 
+import hashlib
+import itertools
 import json
 import tempfile
 import yaml
+from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
-from importlib import resources
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
 
-from .convert.markdown import markdown_to_template
+from .convert.book import SECTION_BREAK_TEMPLATE, iter_book_blocks, normalize_chapters
+from .convert.markdown import iter_markdown_blocks, markdown_template_head, markdown_to_template
 from .diff.differ import dict_diff
+from .diff.structural import iter_structural_diff
+from .diff.corpus import diff_corpus as _diff_corpus
 from .merge.merger import merge_enterprise_with_observed
-from .render.json_template import expand_document
+from .merge.batch import baseline_digest, merge_batch as _merge_batch
+from .render.cache import open_render_cache, render_cache_key
+from .render.json_template import expand_document, iter_expand_blocks
 from .writer.docx_writer import render_to_docx
+from .writer.incremental import FragmentCache
 from .utils.io import load_yaml
+from .utils.dicts import merge_shared
+from .data import load_default_profile
 from .model.observed import create_observed_skeleton
 from .io.docx_zip import DocxZip
 from .io.rels import parse_document_rels
+from .io.package_zip import deterministic_date_time
+from .io.stream_zip import is_writable_stream
 from .parsers.theme import parse_theme
 from .parsers.styles import parse_styles
+from .parsers.effective_styles import (
+    explicit_view,
+    resolve_effective_styles as _resolve_effective_styles,
+    resolve_effective_styles_xml,
+)
 from .parsers.numbering import parse_numbering
 from .parsers.document import parse_sections
 from .parsers.headers_footers import detect_page_field
 from .emit.observed_yaml import emit_observed_yaml
 from .tools.image_paragraphs import fix_image_paragraph_spacing
 from .tools.sanitizer import sanitize_docx as _sanitize_docx
+from .utils.profiling import count, profile_session, span
 
 
 BytesLike = Union[bytes, bytearray, memoryview]
 PathLike = Union[str, Path]
 YamlLike = Union[Dict[str, Any], PathLike, BytesLike]
 JsonLike = Union[Dict[str, Any], PathLike, BytesLike]
+OutputLike = Union[PathLike, BinaryIO]
 
 
 def _ensure_path(path: Optional[PathLike]) -> Optional[Path]:
@@ -69,36 +88,72 @@ def _write_output(data: Dict[str, Any], output: Optional[PathLike], *, as_yaml:
     return path
 
 
-def observe_docx(docx: PathLike, *, output: Optional[PathLike] = None) -> Dict[str, Any]:
-    dz = DocxZip(docx)
-    parts = dz.parts()
-    observed = create_observed_skeleton()
-
-    if dz.has(parts["theme"]):
-        observed["theme"] = parse_theme(dz.read_xml(parts["theme"]))
-    if dz.has(parts["styles"]):
-        observed["styles"] = parse_styles(dz.read_xml(parts["styles"]))
-    if dz.has(parts["numbering"]):
-        observed["numbering"] = parse_numbering(dz.read_xml(parts["numbering"]))
-    if dz.has(parts["document"]):
-        observed["page_setup"] = parse_sections(dz.read_xml(parts["document"]))
-
-    headers = {}
-    for hp in dz.list_headers():
-        headers[hp] = detect_page_field(dz.read_xml(hp))
-    footers = {}
-    for fp in dz.list_footers():
-        footers[fp] = detect_page_field(dz.read_xml(fp))
-    observed["headers_footers"] = {"headers": headers, "footers": footers}
-
-    if dz.has(parts["doc_rels"]):
-        observed["rels_document"] = parse_document_rels(dz.read_xml(parts["doc_rels"]))
-
-    dz.close()
-    _write_output(observed, output, as_yaml=True)
+def observe_docx(
+    docx: PathLike,
+    *,
+    output: Optional[PathLike] = None,
+    effective_styles: bool = False,
+) -> Dict[str, Any]:
+    """effective_styles=True 时额外输出 styles_effective：按 docDefaults → basedOn 展开后的完整样式属性。"""
+    with span("observe"):
+        dz = DocxZip(docx)
+        parts = dz.parts()
+        observed = create_observed_skeleton()
+
+        if dz.has(parts["theme"]):
+            with span("observe.theme"):
+                observed["theme"] = parse_theme(dz.read_xml(parts["theme"]))
+        styles_xml = dz.read_xml(parts["styles"]) if dz.has(parts["styles"]) else None
+        if styles_xml is not None:
+            with span("observe.styles"):
+                observed["styles"] = parse_styles(styles_xml)
+        if effective_styles:
+            with span("observe.effective_styles"):
+                observed["styles_effective"] = resolve_effective_styles_xml(styles_xml)
+        if dz.has(parts["numbering"]):
+            with span("observe.numbering"):
+                observed["numbering"] = parse_numbering(dz.read_xml(parts["numbering"]))
+        if dz.has(parts["document"]):
+            with span("observe.sections"):
+                observed["page_setup"] = parse_sections(dz.read_xml(parts["document"]))
+
+        with span("observe.headers_footers"):
+            headers = {}
+            for hp in dz.list_headers():
+                headers[hp] = detect_page_field(dz.read_xml(hp))
+            footers = {}
+            for fp in dz.list_footers():
+                footers[fp] = detect_page_field(dz.read_xml(fp))
+            observed["headers_footers"] = {"headers": headers, "footers": footers}
+
+        if dz.has(parts["doc_rels"]):
+            observed["rels_document"] = parse_document_rels(dz.read_xml(parts["doc_rels"]))
+
+        dz.close()
+        with span("observe.emit"):
+            _write_output(observed, output, as_yaml=True)
     return observed
 
 
+def resolve_effective_styles(source: YamlLike) -> Dict[str, Any]:
+    """
+    计算有效样式表：
+    {"paragraph_styles": {styleId: {"rPr", "pPr"}}, "character_styles": {...}, "table_styles": {...}}。
+    source 为 DOCX 路径时直接解析 styles.xml（精确）；为 observed YAML（或其中的 styles 段）时，
+    YAML 已把缺失项填成默认值，按 explicit_view 近似：显式写出的默认值（如关闭继承的加粗）会被忽略。
+    """
+    if isinstance(source, (str, Path)) and str(source).lower().endswith(".docx"):
+        dz = DocxZip(source)
+        try:
+            styles_part = dz.parts()["styles"]
+            return resolve_effective_styles_xml(dz.read_xml(styles_part) if dz.has(styles_part) else None)
+        finally:
+            dz.close()
+    data = _load_yaml_any(source) or {}
+    styles = data.get("styles", data)
+    return _resolve_effective_styles(explicit_view(styles))
+
+
 def merge_yaml(
     enterprise: YamlLike,
     observed: YamlLike,
@@ -112,25 +167,143 @@ def merge_yaml(
     return merged
 
 
-def diff_yaml(left: YamlLike, right: YamlLike) -> List[Dict[str, Any]]:
+def merge_batch(
+    enterprise: YamlLike,
+    sources: Iterable[PathLike],
+    out_dir: PathLike,
+    *,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    一份企业基线批量合并一批 observed YAML（文件或目录），输出到 out_dir 下的同名相对路径。
+    基线仅加载一次，文件并行合并；out_dir 中的清单按内容哈希记录，基线与 observed 均未变化的输入直接跳过。
+    返回 {"merged", "skipped", "errors", "removed"}。
+    """
+    if isinstance(enterprise, dict):
+        ent, base_hash = enterprise, None
+    else:
+        raw = bytes(enterprise) if isinstance(enterprise, (bytes, bytearray, memoryview)) else Path(enterprise).read_bytes()
+        ent, base_hash = _load_yaml_any(raw), baseline_digest(raw)
+    return _merge_batch(ent, sources, out_dir, baseline_hash=base_hash, workers=workers, force=force)
+
+
+def diff_yaml(left: YamlLike, right: YamlLike, *, structural: bool = False) -> List[Dict[str, Any]]:
+    """
+    structural=False：原 dict_diff（list 整体比较）；
+    structural=True：按键/序列对齐 list，仅报告真实变化的元素。
+    """
     a = _load_yaml_any(left)
     b = _load_yaml_any(right)
+    if structural:
+        return list(iter_structural_diff(a, b))
     return dict_diff(a, b)
 
 
+def iter_diff_yaml(left: YamlLike, right: YamlLike) -> Iterator[Dict[str, Any]]:
+    """结构化 diff 的惰性版本：逐条产出差异，适合大文件或流式输出。"""
+    a = _load_yaml_any(left)
+    b = _load_yaml_any(right)
+    return iter_structural_diff(a, b)
+
+
+def diff_corpus(
+    baseline: YamlLike,
+    sources: Iterable[PathLike],
+    *,
+    workers: Optional[int] = None,
+    depth: Optional[int] = None,
+    max_paths: int = 20,
+    output: Optional[PathLike] = None,
+) -> Dict[str, Any]:
+    """
+    一份基线对比一批 observed YAML（文件或目录，目录递归查找 .yaml/.yml）。
+    基线仅加载/索引一次，文件并行 diff；返回逐文件偏离摘要与按路径的漂移统计。
+    depth 用于把路径截断到前 N 段再统计（如 3 → styles.paragraph_styles.<styleId>）。
+    """
+    base = _load_yaml_any(baseline)
+    result = _diff_corpus(base, sources, workers=workers, depth=depth, max_paths=max_paths)
+    _write_output(result, output, as_yaml=False)
+    return result
+
+
 def render_from_json(
     template: JsonLike,
     *,
     template_docx: Optional[PathLike] = None,
     styles_yaml: Optional[YamlLike] = None,
-    output_path: Optional[PathLike] = None,
+    output_path: Optional[OutputLike] = None,
     prefer_json_styles: bool = False,
     fail_on_unknown_style: bool = True,
     keep_template_content: bool = False,
     return_bytes: bool = False,
-) -> Union[Path, bytes]:
+    incremental: bool = False,
+    fragment_cache: Optional[PathLike] = None,
+    workers: Optional[int] = None,
+    compress_level: Optional[int] = None,
+    store_media: bool = False,
+    deterministic: bool = False,
+    prune: bool = False,
+    render_cache: Any = None,
+) -> Union[Path, bytes, BinaryIO]:
+    """
+    output_path 也可以是可写的二进制流（HTTP 响应、管道、sys.stdout.buffer）：不可 seek 时以流式 ZIP 边生成边写出，返回该流。
+    incremental=True：增量渲染，按顶层块复用上次生成的正文片段，只重建变化的块；
+    片段缓存默认写在输出旁（<输出>.fragments.json），也可用 fragment_cache 指定。
+    workers>1：把正文切成分片在多个进程中并行写出，再按顺序拼接（输出与串行一致，不能与增量渲染同时使用）。
+    compress_level：保存时的 deflate 级别（0 仅存储、1 最快 … 9 最小），大部件多线程压缩；store_media=True 时图片等媒体仅存储。
+    render_cache：渲染结果缓存（目录、.db/.sqlite 文件，或实现 get/put 的后端），相同输入直接返回缓存的字节，见 render/cache.py。
+    deterministic=True：可复现输出（ZIP 时间戳与核心属性时间固定、成员按名称排序；SOURCE_DATE_EPOCH 可指定时间），
+    相同输入逐字节相同，便于去重与 ETag；缓存渲染总是如此。
+    prune=True：保存前删掉正文用不到的样式、编号定义与部件（模板带来的几百个样式、孤立媒体），见 writer/prune.py。
+    """
     data = _load_json_any(template)
-    prepared = expand_document(_merge_with_default(data) if template_docx is None else data)
+    if template_docx is None:
+        with span("render.merge_default"):
+            data = _merge_with_default(data)
+    with span("render.expand"):
+        prepared = expand_document(data)
+    return _render_prepared(
+        prepared,
+        template_docx=template_docx,
+        styles_yaml=styles_yaml,
+        output_path=output_path,
+        prefer_json_styles=prefer_json_styles,
+        fail_on_unknown_style=fail_on_unknown_style,
+        keep_template_content=keep_template_content,
+        return_bytes=return_bytes,
+        incremental=incremental,
+        fragment_cache=fragment_cache,
+        workers=workers,
+        compress_level=compress_level,
+        store_media=store_media,
+        deterministic=deterministic,
+        prune=prune,
+        render_cache=render_cache,
+    )
+
+
+def _render_prepared(
+    prepared: Dict[str, Any],
+    *,
+    blocks: Optional[Iterable[Dict[str, Any]]] = None,
+    template_docx: Optional[PathLike] = None,
+    styles_yaml: Optional[YamlLike] = None,
+    output_path: Optional[OutputLike] = None,
+    prefer_json_styles: bool = False,
+    fail_on_unknown_style: bool = True,
+    keep_template_content: bool = False,
+    return_bytes: bool = False,
+    incremental: bool = False,
+    fragment_cache: Optional[PathLike] = None,
+    workers: Optional[int] = None,
+    compress_level: Optional[int] = None,
+    store_media: bool = False,
+    deterministic: bool = False,
+    prune: bool = False,
+    render_cache: Any = None,
+    cache_source: Optional[str] = None,
+) -> Union[Path, bytes, BinaryIO]:
     styles_resolved: Optional[Dict[str, Any]] = None
     if styles_yaml:
         styles_resolved = _load_yaml_any(styles_yaml)
@@ -145,13 +318,11 @@ def render_from_json(
     else:
         template_path = _ensure_path(template_docx)
 
-    tmp_output_path: Optional[Path] = None
+    sink: Optional[BytesIO] = None
     if return_bytes:
-        tmp_output = tempfile.NamedTemporaryFile(suffix=".docx", delete=False)
-        tmp_output.close()
-        output_path = Path(tmp_output.name)
-        tmp_output_path = output_path
-    else:
+        sink = BytesIO()
+        output_path = sink
+    elif not is_writable_stream(output_path):
         if output_path is None:
             raise ValueError("output_path is required when return_bytes is False")
         output_path = _ensure_path(output_path)
@@ -159,21 +330,73 @@ def render_from_json(
             raise ValueError("output_path is required when return_bytes is False")
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    render_to_docx(
-        prepared,
-        template_docx_path=template_path,
-        styles_yaml=styles_resolved,
-        output_path=output_path,
-        prefer_json_styles=prefer_json_styles,
-        fail_on_unknown_style=fail_on_unknown_style,
-        clear_existing_content=not keep_template_content,
-    )
+    fragments: Optional[FragmentCache] = None
+    if incremental or fragment_cache is not None:
+        if fragment_cache is None and not isinstance(output_path, Path):
+            raise ValueError("return_bytes / 输出流模式下增量渲染需要显式指定 fragment_cache")
+        fragments = FragmentCache(fragment_cache or f"{output_path}.fragments.json")
+
+    def render(target, deterministic):
+        render_to_docx(
+            prepared,
+            template_docx_path=template_path,
+            styles_yaml=styles_resolved,
+            output_path=target,
+            prefer_json_styles=prefer_json_styles,
+            fail_on_unknown_style=fail_on_unknown_style,
+            clear_existing_content=not keep_template_content,
+            blocks=blocks,
+            fragment_cache=fragments,
+            workers=workers,
+            compress_level=compress_level,
+            store_media=store_media,
+            deterministic=deterministic,
+            prune=prune,
+        )
+        if fragments is not None:
+            fragments.save()
+
     try:
-        if return_bytes:
-            assert tmp_output_path is not None
-            data_bytes = tmp_output_path.read_bytes()
-            tmp_output_path.unlink(missing_ok=True)
-            return data_bytes
+        if render_cache is None:
+            render(output_path, deterministic)
+        else:
+            if blocks is not None and cache_source is None:
+                raise ValueError("块迭代器输入需要提供 cache_source 才能使用渲染结果缓存")
+            results = open_render_cache(render_cache)
+            try:
+                key = render_cache_key(
+                    prepared,
+                    template_path,
+                    source_digest=cache_source,
+                    styles=styles_resolved,
+                    prefer_json_styles=prefer_json_styles,
+                    fail_on_unknown_style=fail_on_unknown_style,
+                    keep_template_content=keep_template_content,
+                    compress_level=compress_level,
+                    store_media=store_media,
+                    prune=prune,
+                    date_time=deterministic_date_time(),
+                )
+                with span("render.cache.get"):
+                    data = results.get(key)
+                if data is None:
+                    count("render.cache.miss")
+                    buf = BytesIO()
+                    render(buf, True)
+                    data = buf.getvalue()
+                    with span("render.cache.put"):
+                        results.put(key, data)
+                else:
+                    count("render.cache.hit")
+            finally:
+                if results is not render_cache:
+                    results.close()
+            if isinstance(output_path, Path):
+                output_path.write_bytes(data)
+            else:
+                output_path.write(data)
+        if sink is not None:
+            return sink.getvalue()
         assert output_path is not None
         return output_path
     finally:
@@ -186,24 +409,60 @@ def render_from_markdown(
     *,
     template_docx: Optional[PathLike] = None,
     styles_yaml: Optional[YamlLike] = None,
-    output_path: Optional[PathLike] = None,
+    output_path: Optional[OutputLike] = None,
     prefer_json_styles: bool = False,
     fail_on_unknown_style: bool = True,
     keep_template_content: bool = False,
     return_bytes: bool = False,
     title: Optional[str] = None,
-) -> Union[Path, bytes]:
+    streaming: bool = False,
+    compress_level: Optional[int] = None,
+    store_media: bool = False,
+    deterministic: bool = False,
+    prune: bool = False,
+    render_cache: Any = None,
+) -> Union[Path, bytes, BinaryIO]:
+    """
+    streaming=True：按顶层块分窗解析 Markdown，blocks 逐块送入 writer，不构建完整的中间 JSON 模板；
+    输出与非流式一致，适合超大 Markdown。
+    render_cache：同 render_from_json；流式转换时以 Markdown 文本摘要代替展开后的 blocks 计算缓存键。
+    """
     if isinstance(markdown, (bytes, bytearray, memoryview)):
         text = bytes(markdown).decode("utf-8")
     elif isinstance(markdown, str):
         candidate = Path(markdown)
-        if candidate.exists():
-            text = candidate.read_text(encoding="utf-8")
-        else:
-            text = markdown
+        try:
+            is_file = candidate.exists()
+        except OSError:  # 过长的 Markdown 文本会触发 “File name too long”
+            is_file = False
+        text = candidate.read_text(encoding="utf-8") if is_file else markdown
     else:
         text = Path(markdown).read_text(encoding="utf-8")
-    json_template = markdown_to_template(text, title=title)
+    if streaming:
+        data = markdown_template_head(title=title)
+        if template_docx is None:
+            data = _merge_with_default(data)
+        prepared = expand_document(data)
+        blocks = iter_expand_blocks(iter_markdown_blocks(text), prepared["doc"].get("variables", {}))
+        return _render_prepared(
+            prepared,
+            blocks=blocks,
+            template_docx=template_docx,
+            styles_yaml=styles_yaml,
+            output_path=output_path,
+            prefer_json_styles=prefer_json_styles,
+            fail_on_unknown_style=fail_on_unknown_style,
+            keep_template_content=keep_template_content,
+            return_bytes=return_bytes,
+            compress_level=compress_level,
+            store_media=store_media,
+            deterministic=deterministic,
+            prune=prune,
+            render_cache=render_cache,
+            cache_source=hashlib.sha256(text.encode("utf-8")).hexdigest() if render_cache is not None else None,
+        )
+    with span("markdown.convert"):
+        json_template = markdown_to_template(text, title=title)
     return render_from_json(
         json_template,
         template_docx=template_docx,
@@ -213,27 +472,88 @@ def render_from_markdown(
         fail_on_unknown_style=fail_on_unknown_style,
         keep_template_content=keep_template_content,
         return_bytes=return_bytes,
+        compress_level=compress_level,
+        store_media=store_media,
+        deterministic=deterministic,
+        prune=prune,
+        render_cache=render_cache,
+    )
+
+
+def render_book_from_markdown(
+    chapters: Iterable[Union[PathLike, Dict[str, Any]]],
+    *,
+    base_template: Optional[JsonLike] = None,
+    chapter_break: str = "page",
+    workers: Optional[int] = None,
+    template_docx: Optional[PathLike] = None,
+    styles_yaml: Optional[YamlLike] = None,
+    output_path: Optional[OutputLike] = None,
+    prefer_json_styles: bool = False,
+    fail_on_unknown_style: bool = True,
+    keep_template_content: bool = False,
+    return_bytes: bool = False,
+    title: Optional[str] = None,
+    compress_level: Optional[int] = None,
+    store_media: bool = False,
+    deterministic: bool = False,
+    prune: bool = False,
+) -> Union[Path, bytes, BinaryIO]:
+    """
+    多个 Markdown 章节（文件/目录，或 {"path"|"text", "useTemplate", "variables"}）并行转换后按顺序合成一份 DOCX。
+    chapter_break：章节间插入 page（分页）/ section（分节）/ none；指定 useTemplate 的章节由页面模板新建节。
+    base_template：可选 JSON 模板，提供 stylesInline / pageTemplates / pageSetup 等，其 blocks（如封面、目录）位于各章之前。
+    """
+    chapter_list = normalize_chapters(chapters)
+    data = markdown_template_head(title=title)
+    if base_template is not None:
+        data = merge_shared(data, _load_json_any(base_template))
+    doc = dict(data["doc"])
+    if chapter_break == "section":
+        doc["pageTemplates"] = {SECTION_BREAK_TEMPLATE: {"layout": {}, "blocks": []}, **(doc.get("pageTemplates") or {})}
+    data = {**data, "doc": doc}
+    if template_docx is None:
+        data = _merge_with_default(data)
+    prepared = expand_document(data)
+    lead = prepared["doc"].get("blocks") or []
+    book = iter_book_blocks(chapter_list, chapter_break=chapter_break, workers=workers, leading_content=bool(lead))
+    blocks = itertools.chain(lead, iter_expand_blocks(book, prepared["doc"].get("variables", {})))
+    return _render_prepared(
+        prepared,
+        blocks=blocks,
+        template_docx=template_docx,
+        styles_yaml=styles_yaml,
+        output_path=output_path,
+        prefer_json_styles=prefer_json_styles,
+        fail_on_unknown_style=fail_on_unknown_style,
+        keep_template_content=keep_template_content,
+        return_bytes=return_bytes,
+        compress_level=compress_level,
+        store_media=store_media,
+        deterministic=deterministic,
+        prune=prune,
     )
 
 
 def _merge_with_default(data: Dict[str, Any]) -> Dict[str, Any]:
-    from docx_stylekit.utils.dicts import deep_merge
-    resource_path = resources.files("docx_stylekit.data").joinpath("default_render_template.yaml")
-    with resources.as_file(resource_path) as path:
-        default_profile = load_yaml(path)
-    return deep_merge(default_profile, data)
+    # 结构共享合并：默认模板缓存且不复制，expand_document 会深复制 doc，不会改动共享对象
+    return merge_shared(load_default_profile(), data)
 
 
 def fix_image_paragraphs(
     docx: PathLike,
     *,
     output_path: Optional[PathLike] = None,
+    compress_level: Optional[int] = None,
+    store_media: bool = False,
+    deterministic: bool = False,
 ) -> Path:
     input_path = _ensure_path(docx)
     if input_path is None:
         raise ValueError("input path is required")
     destination = _ensure_path(output_path)
-    return fix_image_paragraph_spacing(input_path, destination)
+    return fix_image_paragraph_spacing(input_path, destination, compress_level=compress_level, store_media=store_media,
+                                       deterministic=deterministic)
 
 
 def sanitize_docx(
@@ -241,10 +561,16 @@ def sanitize_docx(
     template_docx: Optional[PathLike] = None,
     *,
     output_path: Optional[PathLike] = None,
+    compress_level: Optional[int] = None,
+    store_media: bool = False,
+    deterministic: bool = False,
+    prune: bool = False,
 ) -> Path:
     raw_path = _ensure_path(raw_docx)
     if raw_path is None:
         raise ValueError("raw_docx is required")
     template_path = _ensure_path(template_docx) if template_docx else None
     output = _ensure_path(output_path) if output_path else None
-    return _sanitize_docx(raw_path, template_path, output_path=output)
+    return _sanitize_docx(raw_path, template_path, output_path=output,
+                          compress_level=compress_level, store_media=store_media, deterministic=deterministic,
+                          prune=prune)
@@ -1,26 +1,113 @@
+import json
+from contextlib import contextmanager
+
 import click
 from colorama import Fore, Style
-from .emit.report import print_diff_report
+from .convert.book import normalize_chapters
+from .emit.report import STATUSES, write_diff_stream
+from .render.cache import DEFAULT_MAX_BYTES, open_render_cache
+from .utils.profiling import active_profiler, profile_session
 from .api import (
     observe_docx,
     merge_yaml,
+    merge_batch,
     diff_yaml,
+    iter_diff_yaml,
+    diff_corpus,
     render_from_json,
     render_from_markdown,
+    render_book_from_markdown,
     fix_image_paragraphs,
     sanitize_docx,
 )
 
+def _save_options(f):
+    """保存选项：压缩级别越低越快、体积越大；媒体（PNG/JPEG 等）可只存储不压缩；可复现输出。"""
+    f = click.option("--deterministic", is_flag=True,
+                     help="可复现输出：固定时间戳与核心属性、成员排序，相同输入逐字节相同（SOURCE_DATE_EPOCH 可指定时间）。")(f)
+    f = click.option("--store-media", is_flag=True, help="图片等已压缩媒体只存储不再 deflate。")(f)
+    f = click.option("--compress-level", type=click.IntRange(0, 9), default=None,
+                     help="DOCX 压缩级别：0 仅存储，1 最快 … 9 最小（默认 zlib 默认级别；大部件多线程压缩）。")(f)
+    return f
+
+
+def _prune_option(f):
+    return click.option("--prune", is_flag=True,
+                        help="保存前删掉正文用不到的样式、编号定义与部件（模板带来的冗余），并报告节省的字节数。")(f)
+
+
+@contextmanager
+def _prune_report(enabled):
+    """--prune 时从 profile 计数器读取精简结果；已开启 --profile 时沿用其会话。"""
+    if not enabled:
+        yield
+        return
+    prof = active_profiler()
+    if prof is None:
+        with profile_session() as prof:
+            yield
+    else:
+        yield
+    c = prof.counters
+    if "prune.bytes_saved" not in c:  # 命中渲染结果缓存时没有执行精简
+        return
+    click.echo(Fore.CYAN + f"pruned: {c['prune.styles_removed']} styles, {c['prune.numbering_removed']} numbering "
+               f"definitions, {c['prune.parts_removed']} parts, {c['prune.bytes_saved'] / 1024:.1f} KiB saved"
+               + Style.RESET_ALL, err=True)
+
+
+def _render_cache_options(f):
+    f = click.option("--render-cache-max-mb", type=int, default=None,
+                     help="渲染结果缓存容量上限（MB，超出按最久未用淘汰；默认 1024）。")(f)
+    f = click.option("--render-cache", type=click.Path(), default=None,
+                     help="渲染结果缓存：目录或 .db/.sqlite 文件，相同输入直接输出缓存的 DOCX。")(f)
+    return f
+
+
+def _open_render_cache(path, max_mb):
+    if path is None:
+        return None
+    # 随命令上下文结束关闭（SQLite 连接等）
+    backend = open_render_cache(path, max_bytes=(max_mb << 20) if max_mb else DEFAULT_MAX_BYTES)
+    return click.get_current_context().with_resource(backend)
+
+
+def _docx_output(output):
+    """-o - 表示写到 stdout：以流式 ZIP 边生成边写出，可直接接管道。"""
+    return click.get_binary_stream("stdout") if output == "-" else output
+
+
+def _echo_generated(output):
+    # 写 stdout 时提示走 stderr，避免混入 DOCX 字节流
+    where = "<stdout>" if output == "-" else output
+    click.echo(Fore.GREEN + f"DOCX generated at: {where}" + Style.RESET_ALL, err=output == "-")
+
+
+@contextmanager
+def _profile_to_file(path, *, cprofile, trace_memory):
+    with profile_session(cprofile=cprofile, trace_memory=trace_memory) as prof:
+        yield prof
+    prof.write_json(path)
+    click.echo(Fore.CYAN + f"profile report written to: {path}" + Style.RESET_ALL, err=True)
+
 @click.group()
-def main():
+@click.option("--profile", "profile_path", type=click.Path(dir_okay=False), default=None,
+              help="输出分阶段耗时/计数 JSON 报告的路径。")
+@click.option("--profile-cprofile", is_flag=True, help="配合 --profile：附带 cProfile 热点函数。")
+@click.option("--profile-memory", is_flag=True, help="配合 --profile：使用 tracemalloc 记录内存峰值。")
+@click.pass_context
+def main(ctx, profile_path, profile_cprofile, profile_memory):
     """docx-stylekit: Observe → Merge → Diff → Validate"""
+    if profile_path:
+        ctx.with_resource(_profile_to_file(profile_path, cprofile=profile_cprofile, trace_memory=profile_memory))
 
 @main.command()
 @click.argument("docx_path", type=click.Path(exists=True))
 @click.option("-o", "--output", default="observed.yaml", help="Output YAML path.")
-def observe(docx_path, output):
+@click.option("--effective-styles", is_flag=True, help="附带 styles_effective：按 docDefaults → basedOn 展开后的有效样式。")
+def observe(docx_path, output, effective_styles):
     """从DOCX解析样式/编号/页面设置，生成 observed.yaml"""
-    observe_docx(docx_path, output=output)
+    observe_docx(docx_path, output=output, effective_styles=effective_styles)
     click.echo(Fore.GREEN + f"observed.yaml generated at: {output}" + Style.RESET_ALL)
 
 @main.command()
@@ -32,14 +119,67 @@ def merge(enterprise_yaml, observed_yaml, output):
     merge_yaml(enterprise_yaml, observed_yaml, output=output)
     click.echo(Fore.GREEN + f"merged.yaml generated at: {output}" + Style.RESET_ALL)
 
+@main.command("merge-batch")
+@click.argument("enterprise_yaml", type=click.Path(exists=True))
+@click.argument("sources", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("-o", "--out-dir", required=True, type=click.Path(file_okay=False), help="merged YAML 输出目录。")
+@click.option("-j", "--workers", type=int, default=None, help="并行进程数（默认 CPU 核数）。")
+@click.option("--force", is_flag=True, help="忽略清单，全部重新合并。")
+def merge_batch_cmd(enterprise_yaml, sources, out_dir, workers, force):
+    """一份企业基线批量合并一批 observed YAML（目录或文件），仅重算内容有变化的输入。"""
+    result = merge_batch(enterprise_yaml, sources, out_dir, workers=workers, force=force)
+    for rel, err in result["errors"].items():
+        click.echo(Fore.RED + f"[!] {rel}: {err}" + Style.RESET_ALL)
+    click.echo(
+        Fore.GREEN
+        + f"merged: {len(result['merged'])}  unchanged: {len(result['skipped'])}  errors: {len(result['errors'])}  -> {out_dir}"
+        + Style.RESET_ALL
+    )
+    if result["errors"]:
+        raise SystemExit(1)
+
 @main.command()
 @click.argument("left_yaml", type=click.Path(exists=True))
 @click.argument("right_yaml", type=click.Path(exists=True))
-@click.option("--fmt", type=click.Choice(["text","json"]), default="text")
-def diff(left_yaml, right_yaml, fmt):
+@click.option("--fmt", type=click.Choice(["text","json","jsonl"]), default="text")
+@click.option("--structural/--legacy", default=False,
+              help="结构化 diff：list 按 styleId/numId/rId 或序列对齐（默认沿用整体比较）。")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), default=None, help="写入文件（默认 stdout）。")
+@click.option("--prefix", "prefixes", multiple=True, help="仅输出该路径前缀下的差异（可多次指定）。")
+@click.option("--status", "statuses", multiple=True, type=click.Choice(list(STATUSES)),
+              help="仅输出指定状态（可多次指定）。")
+def diff(left_yaml, right_yaml, fmt, structural, output, prefixes, statuses):
     """对比两份 YAML（可用于企业基线 vs 观测）"""
-    diffs = diff_yaml(left_yaml, right_yaml)
-    print_diff_report(diffs, fmt=fmt)
+    diffs = iter_diff_yaml(left_yaml, right_yaml) if structural else diff_yaml(left_yaml, right_yaml)
+    write_diff_stream(diffs, fmt=fmt, out=output, path_prefix=prefixes, statuses=statuses)
+
+@main.command("diff-corpus")
+@click.argument("baseline_yaml", type=click.Path(exists=True))
+@click.argument("sources", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("-j", "--workers", type=int, default=None, help="并行进程数（默认 CPU 核数）。")
+@click.option("--depth", type=int, default=None, help="统计时把路径截断到前 N 段（如 3 → styles.paragraph_styles.<id>）。")
+@click.option("--top", type=int, default=20, show_default=True, help="文本输出中展示的高频漂移路径数。")
+@click.option("--fmt", type=click.Choice(["text", "json"]), default="text")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), default=None, help="完整 JSON 结果写入路径。")
+def diff_corpus_cmd(baseline_yaml, sources, workers, depth, top, fmt, output):
+    """一份基线对比一批 observed YAML（目录或文件），输出逐文件偏离与高频漂移路径。"""
+    result = diff_corpus(baseline_yaml, sources, workers=workers, depth=depth, max_paths=top, output=output)
+    if fmt == "json":
+        if not output:
+            click.echo(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    summary = result["summary"]
+    for r in result["files"]:
+        if r["error"]:
+            click.echo(Fore.RED + f"[!] {r['file']}: {r['error']}" + Style.RESET_ALL)
+        else:
+            click.echo(f"{r['file']}: {r['total']} (+{r['added']} -{r['removed']} ±{r['changed']})")
+    click.echo(f"\nfiles: {summary['files']}  with deviation: {summary['with_deviation']}  errors: {summary['errors']}")
+    click.echo("most frequent drift (files affected):")
+    for path, n in list(result["paths"].items())[:top]:
+        click.echo(f"  {n:>6}  {path}")
+    if output:
+        click.echo(Fore.GREEN + f"corpus diff written to: {output}" + Style.RESET_ALL)
 
 @main.command()
 @click.argument("json_template", type=click.Path(exists=True))
@@ -47,23 +187,42 @@ def diff(left_yaml, right_yaml, fmt):
               help="样式模板 DOCX（包含企业样式/编号/页眉页脚）。若省略，则使用内置默认模板。")
 @click.option("--styles", "-s", type=click.Path(exists=False), required=False,
               help="合并后的 YAML（merged.yaml）。可选，用于校验/对照。")
-@click.option("-o", "--output", type=click.Path(), default="output.docx", help="输出 DOCX 路径")
+@click.option("-o", "--output", type=click.Path(), default="output.docx", help="输出 DOCX 路径（- 表示写到 stdout）")
 @click.option("--prefer-json-styles/--no-prefer-json-styles", default=False, help="允许 JSON 覆盖同名 YAML 样式字段")
 @click.option("--fail-on-unknown-style/--no-fail-on-unknown-style", default=True, help="未知样式是否直接失败（默认 true）")
 @click.option("--keep-template-content/--wipe-template-content", default=False,
               help="是否保留模板 DOCX 原有正文内容（默认不保留，仅使用样式/布局）")
-def render(json_template, template, styles, output, prefer_json_styles, fail_on_unknown_style, keep_template_content):
+@click.option("--incremental", is_flag=True, help="增量渲染：复用上次生成的正文片段，只重建变化的块。")
+@click.option("--fragment-cache", type=click.Path(dir_okay=False), default=None,
+              help="片段缓存文件（默认 <输出>.fragments.json），指定时自动启用增量渲染。")
+@click.option("-j", "--workers", type=int, default=None,
+              help="分片并行渲染正文的进程数（默认串行；适合超大文档，不能与增量渲染同时使用）。")
+@_save_options
+@_prune_option
+@_render_cache_options
+def render(json_template, template, styles, output, prefer_json_styles, fail_on_unknown_style, keep_template_content,
+           incremental, fragment_cache, workers, compress_level, store_media, deterministic, prune, render_cache,
+           render_cache_max_mb):
     """读取 JSON 模版（含内容+内联样式+页面模板），渲染为 DOCX"""
-    render_from_json(
-        json_template,
-        template_docx=template,
-        styles_yaml=styles,
-        output_path=output,
-        prefer_json_styles=prefer_json_styles,
-        fail_on_unknown_style=fail_on_unknown_style,
-        keep_template_content=keep_template_content,
-    )
-    click.echo(Fore.GREEN + f"DOCX generated at: {output}" + Style.RESET_ALL)
+    with _prune_report(prune):
+        render_from_json(
+            json_template,
+            template_docx=template,
+            styles_yaml=styles,
+            output_path=_docx_output(output),
+            prefer_json_styles=prefer_json_styles,
+            fail_on_unknown_style=fail_on_unknown_style,
+            keep_template_content=keep_template_content,
+            incremental=incremental,
+            fragment_cache=fragment_cache,
+            workers=workers,
+            compress_level=compress_level,
+            store_media=store_media,
+            deterministic=deterministic,
+            prune=prune,
+            render_cache=_open_render_cache(render_cache, render_cache_max_mb),
+        )
+    _echo_generated(output)
 
 
 @main.command()
@@ -72,33 +231,90 @@ def render(json_template, template, styles, output, prefer_json_styles, fail_on_
               help="样式模板 DOCX（包含企业样式/编号/页眉页脚）。若省略，则使用内置默认模板。")
 @click.option("--styles", "-s", type=click.Path(exists=False), required=False,
               help="合并后的 YAML（merged.yaml），供样式校验使用。")
-@click.option("-o", "--output", type=click.Path(), default="output.docx", help="输出 DOCX 路径")
+@click.option("-o", "--output", type=click.Path(), default="output.docx", help="输出 DOCX 路径（- 表示写到 stdout）")
 @click.option("--title", type=str, required=False, help="覆盖 Markdown 文档标题。")
+@click.option("--stream", is_flag=True, help="流式转换：按块分窗解析并逐块写入，适合超大 Markdown（输出一致）。")
 @click.option("--prefer-json-styles/--no-prefer-json-styles", default=False, help="允许 JSON 覆盖同名 YAML 样式字段")
 @click.option("--fail-on-unknown-style/--no-fail-on-unknown-style", default=True, help="未知样式是否直接失败（默认 true）")
 @click.option("--keep-template-content/--wipe-template-content", default=False,
               help="是否保留模板 DOCX 原有正文内容（默认不保留，仅使用样式/布局）")
-def markdown(markdown_path, template, styles, output, title, prefer_json_styles, fail_on_unknown_style, keep_template_content):
+@_save_options
+@_prune_option
+@_render_cache_options
+def markdown(markdown_path, template, styles, output, title, stream, prefer_json_styles, fail_on_unknown_style,
+             keep_template_content, compress_level, store_media, deterministic, prune, render_cache,
+             render_cache_max_mb):
     """将 Markdown 文件转换为 DOCX（内部先转 JSON，再复用 render 流程）"""
-    render_from_markdown(
-        markdown_path,
-        template_docx=template,
-        styles_yaml=styles,
-        output_path=output,
-        prefer_json_styles=prefer_json_styles,
-        fail_on_unknown_style=fail_on_unknown_style,
-        keep_template_content=keep_template_content,
-        title=title,
-    )
-    click.echo(Fore.GREEN + f"DOCX generated at: {output}" + Style.RESET_ALL)
+    with _prune_report(prune):
+        render_from_markdown(
+            markdown_path,
+            template_docx=template,
+            styles_yaml=styles,
+            output_path=_docx_output(output),
+            prefer_json_styles=prefer_json_styles,
+            fail_on_unknown_style=fail_on_unknown_style,
+            keep_template_content=keep_template_content,
+            title=title,
+            streaming=stream,
+            compress_level=compress_level,
+            store_media=store_media,
+            deterministic=deterministic,
+            prune=prune,
+            render_cache=_open_render_cache(render_cache, render_cache_max_mb),
+        )
+    _echo_generated(output)
+
+
+@main.command("markdown-book")
+@click.argument("chapters", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--template", "-t", type=click.Path(exists=True), required=False,
+              help="样式模板 DOCX（包含企业样式/编号/页眉页脚）。若省略，则使用内置默认模板。")
+@click.option("--styles", "-s", type=click.Path(exists=False), required=False,
+              help="合并后的 YAML（merged.yaml），供样式校验使用。")
+@click.option("--base-json", type=click.Path(exists=True), required=False,
+              help="JSON 模板：提供 stylesInline/pageTemplates 等，其 blocks（封面/目录）置于各章之前。")
+@click.option("--break", "chapter_break", type=click.Choice(["page", "section", "none"]), default="page",
+              show_default=True, help="章节之间的分隔方式。")
+@click.option("--chapter-template", type=str, required=False, help="每章开头使用的页面模板（pageTemplates 中的名称）。")
+@click.option("-j", "--workers", type=int, default=None, help="并行进程数（默认 CPU 核数）。")
+@click.option("-o", "--output", type=click.Path(), default="output.docx", help="输出 DOCX 路径（- 表示写到 stdout）")
+@click.option("--title", type=str, required=False, help="文档标题。")
+@click.option("--fail-on-unknown-style/--no-fail-on-unknown-style", default=True, help="未知样式是否直接失败（默认 true）")
+@_save_options
+@_prune_option
+def markdown_book(chapters, template, styles, base_json, chapter_break, chapter_template, workers, output, title,
+                  fail_on_unknown_style, compress_level, store_media, deterministic, prune):
+    """将多个 Markdown 章节（文件或目录，按给定顺序）并行转换并合成一份 DOCX"""
+    specs = list(chapters)
+    if chapter_template:
+        specs = [dict(ch, useTemplate=chapter_template) for ch in normalize_chapters(specs)]
+    with _prune_report(prune):
+        render_book_from_markdown(
+            specs,
+            base_template=base_json,
+            chapter_break=chapter_break,
+            workers=workers,
+            template_docx=template,
+            styles_yaml=styles,
+            output_path=_docx_output(output),
+            fail_on_unknown_style=fail_on_unknown_style,
+            title=title,
+            compress_level=compress_level,
+            store_media=store_media,
+            deterministic=deterministic,
+            prune=prune,
+        )
+    _echo_generated(output)
 
 
 @main.command("fix-images")
 @click.argument("docx_path", type=click.Path(exists=True))
 @click.option("-o", "--output", type=click.Path(), help="输出 DOCX 路径（默认覆盖原文件）")
-def fix_images(docx_path, output):
+@_save_options
+def fix_images(docx_path, output, compress_level, store_media, deterministic):
     """调整包含图片段落的行距、对齐与缩进。"""
-    result = fix_image_paragraphs(docx_path, output_path=output)
+    result = fix_image_paragraphs(docx_path, output_path=output, compress_level=compress_level, store_media=store_media,
+                                  deterministic=deterministic)
     click.echo(Fore.GREEN + f"Image paragraphs adjusted: {result}" + Style.RESET_ALL)
 
 
@@ -107,9 +323,13 @@ def fix_images(docx_path, output):
 @click.option("-t", "--template", type=click.Path(exists=True), required=False,
               help="标准样式模板 DOCX（未提供时使用默认样式）。")
 @click.option("-o", "--output", type=click.Path(), help="输出 DOCX 路径（默认覆盖原文件）。")
-def sanitize_cmd(raw_docx, template, output):
+@_save_options
+@_prune_option
+def sanitize_cmd(raw_docx, template, output, compress_level, store_media, deterministic, prune):
     """应用标准样式模板，规范化 DOCX（标题/表格/图片等样式）。"""
-    result = sanitize_docx(raw_docx, template_docx=template, output_path=output)
+    with _prune_report(prune):
+        result = sanitize_docx(raw_docx, template_docx=template, output_path=output, compress_level=compress_level,
+                               store_media=store_media, deterministic=deterministic, prune=prune)
     click.echo(Fore.GREEN + f"Sanitized DOCX generated at: {result}" + Style.RESET_ALL)
 
 
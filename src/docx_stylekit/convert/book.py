@@ -0,0 +1,94 @@
+"""
+多文件书稿：多个 Markdown 章节并行转换为 blocks，按顺序拼接成一份文档。
+- 章节在进程池中解析（markdown-it + _tokens_to_blocks），主进程按章节顺序逐章产出，
+  写入与后续章节的转换可重叠进行；
+- 章节之间插入分页或分节；章节可指定 useTemplate（页面模板自带新节，不再额外分隔）。
+每个章节独立判断是否启用中文标题启发式（与单独转换该文件一致）。
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .markdown import markdown_to_template
+
+CHAPTER_BREAKS = ("page", "section", "none")
+# chapter_break="section" 时使用的内部页面模板：沿用上一节布局，仅新建节
+SECTION_BREAK_TEMPLATE = "__chapter_section__"
+
+ChapterLike = Union[str, Path, Dict[str, Any]]
+
+
+def normalize_chapters(chapters: Iterable[ChapterLike]) -> List[Dict[str, Any]]:
+    """
+    章节统一为 dict：{"path": ...} 或 {"text": ...}，可带 "useTemplate" / "variables"。
+    目录按文件名排序展开其中的 .md 文件。
+    """
+    out: List[Dict[str, Any]] = []
+    for ch in chapters:
+        if isinstance(ch, dict):
+            if "path" not in ch and "text" not in ch:
+                raise ValueError(f"章节需要提供 path 或 text：{ch}")
+            out.append(dict(ch))
+            continue
+        p = Path(ch)
+        if p.is_dir():
+            out.extend({"path": str(f)} for f in sorted(p.glob("*.md")))
+        else:
+            out.append({"path": str(p)})
+    return out
+
+
+def convert_chapter(chapter: Dict[str, Any]) -> List[Dict[str, Any]]:
+    text = chapter.get("text")
+    if text is None:
+        text = Path(chapter["path"]).read_text(encoding="utf-8")
+    return markdown_to_template(text)["doc"]["blocks"]
+
+
+def iter_chapter_blocks(chapters: List[Dict[str, Any]], *, workers: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """按章节顺序产出每章的 blocks；workers=1 在当前进程内执行，默认使用 CPU 核数。"""
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(chapters) or 1))
+    if workers == 1:
+        for ch in chapters:
+            yield convert_chapter(ch)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(convert_chapter, chapters)
+
+
+def iter_book_blocks(
+    chapters: List[Dict[str, Any]],
+    *,
+    chapter_break: str = "page",
+    workers: Optional[int] = None,
+    leading_content: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    拼接各章 blocks。leading_content=True 表示书稿前已有内容（如封面/目录），第一章前也插入分隔。
+    """
+    if chapter_break not in CHAPTER_BREAKS:
+        raise ValueError(f"未知的章节分隔方式：{chapter_break}")
+    written = leading_content
+    for chapter, blocks in zip(chapters, iter_chapter_blocks(chapters, workers=workers)):
+        if chapter.get("useTemplate"):
+            yield {"useTemplate": chapter["useTemplate"], "variables": chapter.get("variables") or {}}
+        elif written and chapter_break == "page":
+            yield {"type": "pageBreak"}
+        elif written and chapter_break == "section":
+            yield {"useTemplate": SECTION_BREAK_TEMPLATE}
+        yield from blocks
+        written = written or bool(blocks) or bool(chapter.get("useTemplate"))
+
+
+__all__ = [
+    "CHAPTER_BREAKS",
+    "SECTION_BREAK_TEMPLATE",
+    "normalize_chapters",
+    "convert_chapter",
+    "iter_chapter_blocks",
+    "iter_book_blocks",
+]
@@ -1 +1,17 @@
+from functools import lru_cache
+from importlib import resources
 
+from ..utils.io import load_yaml
+
+DEFAULT_RENDER_TEMPLATE = "default_render_template.yaml"
+
+
+@lru_cache(maxsize=1)
+def load_default_profile() -> dict:
+    """
+    内置默认渲染模板，进程内只解析一次。
+    返回的是共享对象：调用方只能读取，合并请用 utils.dicts.merge_shared / MergedView。
+    """
+    resource_path = resources.files("docx_stylekit.data").joinpath(DEFAULT_RENDER_TEMPLATE)
+    with resources.as_file(resource_path) as path:
+        return load_yaml(path)
@@ -0,0 +1,162 @@
+"""
+多对一基线 Diff：一份企业基线 vs 大量 observed 文件。
+- 基线只加载、建索引（预计算子树摘要）一次，每个工作进程通过 initializer 各持一份；
+- 文件并行 diff，工作进程只回传计数与少量路径，不回传完整差异；
+- 汇总：逐文件偏离摘要 + 按路径（可截断到指定深度）统计的漂移次数。
+"""
+from __future__ import annotations
+
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from ..utils.io import load_yaml
+from .structural import DEFAULT_LIST_KEYS, DigestCache, StructuralDiffer
+
+YAML_SUFFIXES = (".yaml", ".yml")
+
+
+class BaselineIndex:
+    """
+    已加载并预计算摘要的基线，可复用于任意多次 diff。
+    基线摘要建好后不再写入；每次 diff 用一个读基线摘要的子缓存存放 observed 侧摘要，diff 结束即丢弃，
+    内存不随对比的文件数增长。
+    """
+
+    def __init__(self, baseline: Dict[str, Any], *, list_keys: Sequence[str] = DEFAULT_LIST_KEYS):
+        self.baseline = baseline
+        self.list_keys = tuple(list_keys)
+        self.digests = DigestCache()
+        self.digests.digest(baseline)
+
+    def iter_diff(self, observed: Dict[str, Any]):
+        differ = StructuralDiffer(list_keys=self.list_keys, digests=self.digests.child())
+        return differ.iter_diff(self.baseline, observed)
+
+
+def collapse_path(path: str, depth: Optional[int]) -> str:
+    """按段截断路径：depth=3 时 styles.paragraph_styles.Normal.rPr.size_pt → styles.paragraph_styles.Normal。"""
+    if not depth:
+        return path
+    parts = path.split(".")
+    if len(parts) > depth:
+        return ".".join(parts[:depth])
+    return path
+
+
+def summarize_file(
+    index: BaselineIndex,
+    path: Union[str, Path],
+    *,
+    depth: Optional[int] = None,
+    max_paths: int = 20,
+) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {
+        "file": str(path),
+        "total": 0,
+        "added": 0,
+        "removed": 0,
+        "changed": 0,
+        "paths": [],
+        "error": None,
+    }
+    paths: Counter = Counter()
+    try:
+        observed = load_yaml(path) or {}
+        for d in index.iter_diff(observed):
+            summary["total"] += 1
+            summary[d["status"]] += 1
+            paths[collapse_path(d["path"], depth)] += 1
+    except Exception as exc:  # 单个文件损坏不影响整体
+        summary["error"] = f"{type(exc).__name__}: {exc}"
+    summary["paths"] = [p for p, _ in paths.most_common(max_paths)] if max_paths else []
+    summary["_counter"] = paths
+    return summary
+
+
+_WORKER_INDEX: Optional[BaselineIndex] = None
+_WORKER_OPTS: Dict[str, Any] = {}
+
+
+def _init_worker(baseline: Dict[str, Any], list_keys, depth, max_paths):
+    global _WORKER_INDEX, _WORKER_OPTS
+    _WORKER_INDEX = BaselineIndex(baseline, list_keys=list_keys)
+    _WORKER_OPTS = {"depth": depth, "max_paths": max_paths}
+
+
+def _worker_summarize(path: str) -> Dict[str, Any]:
+    assert _WORKER_INDEX is not None
+    return summarize_file(_WORKER_INDEX, path, **_WORKER_OPTS)
+
+
+def iter_corpus_files(sources: Iterable[Union[str, Path]]) -> List[Path]:
+    """展开目录（递归查找 .yaml/.yml）与文件列表，按路径排序保证输出稳定。"""
+    files: List[Path] = []
+    for src in sources:
+        p = Path(src)
+        if p.is_dir():
+            files.extend(f for f in p.rglob("*") if f.is_file() and f.suffix.lower() in YAML_SUFFIXES)
+        else:
+            files.append(p)
+    return sorted(set(files))
+
+
+def diff_corpus(
+    baseline: Dict[str, Any],
+    sources: Iterable[Union[str, Path]],
+    *,
+    workers: Optional[int] = None,
+    depth: Optional[int] = None,
+    max_paths: int = 20,
+    list_keys: Sequence[str] = DEFAULT_LIST_KEYS,
+) -> Dict[str, Any]:
+    """
+    返回：
+    {
+      "files": [{"file","total","added","removed","changed","paths":[最常见偏离路径],"error"}, ...],
+      "paths": {path: 出现该偏离的文件次数, ...}（按次数降序）,
+      "summary": {"files","with_deviation","errors","added","removed","changed"}
+    }
+    workers=1 在当前进程内执行；默认使用 CPU 核数。
+    """
+    files = iter_corpus_files(sources)
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(files) or 1))
+    results: List[Dict[str, Any]] = []
+
+    if workers == 1:
+        index = BaselineIndex(baseline, list_keys=list_keys)
+        for f in files:
+            results.append(summarize_file(index, f, depth=depth, max_paths=max_paths))
+    else:
+        chunksize = max(1, len(files) // (workers * 8))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(baseline, tuple(list_keys), depth, max_paths),
+        ) as pool:
+            results.extend(pool.map(_worker_summarize, [str(f) for f in files], chunksize=chunksize))
+
+    aggregate: Counter = Counter()
+    summary = {"files": len(results), "with_deviation": 0, "errors": 0, "added": 0, "removed": 0, "changed": 0}
+    for r in results:
+        counter = r.pop("_counter")
+        # 每个路径按“出现该偏离的文件数”计数
+        aggregate.update(counter.keys())
+        if r["error"]:
+            summary["errors"] += 1
+        elif r["total"]:
+            summary["with_deviation"] += 1
+        for status in ("added", "removed", "changed"):
+            summary[status] += r[status]
+
+    return {
+        "files": results,
+        "paths": dict(aggregate.most_common()),
+        "summary": summary,
+    }
+
+
+__all__ = ["BaselineIndex", "collapse_path", "summarize_file", "iter_corpus_files", "diff_corpus"]
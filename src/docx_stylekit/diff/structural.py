@@ -0,0 +1,210 @@
+"""
+结构化 Diff 引擎（相对 dict_diff）：
+- list 不再整体视为值：元素为 dict 且带唯一键（styleId/numId/rId…）时按键对齐，
+  否则按子树摘要做序列对齐（difflib），插入/删除一个节不会让后续节全部“changed”；
+- 相同子树整体跳过：已缓存摘要（如预先索引的基线）时摘要不同即判不等，否则用 C 层 == 判定；
+  序列对齐所需的元素摘要按对象缓存，可跨多次 diff 复用；
+- 路径字符串只在确实存在差异的分支上拼接；
+- 以生成器惰性产出差异，记录格式与 dict_diff 相同：{"path","a","b","status"}。
+"""
+from __future__ import annotations
+
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+DEFAULT_LIST_KEYS = ("styleId", "numId", "abstractNumId", "rId")
+
+_MISSING = object()
+
+
+class DigestCache:
+    """
+    子树摘要缓存：id(obj) → (obj, digest)。持有 obj 引用，保证 id 在缓存生命周期内不被复用。
+    摘要与 == 语义一致（dict 无序、list 有序、1 == 1.0），可跨多次 diff 复用（如同一基线对比多份文件）。
+    parent 为只读的上层缓存（如预先索引的基线）：查找时先查自身再查 parent，新摘要只写入自身，
+    用完即弃的子缓存不会让 parent 随对比文件数增长。
+    """
+
+    def __init__(self, parent: Optional["DigestCache"] = None):
+        self._memo: Dict[int, tuple] = {}
+        self._parent = parent
+
+    def __len__(self) -> int:
+        return len(self._memo)
+
+    def child(self) -> "DigestCache":
+        return DigestCache(parent=self)
+
+    def _lookup(self, obj_id: int):
+        hit = self._memo.get(obj_id)
+        if hit is None and self._parent is not None:
+            return self._parent._lookup(obj_id)
+        return hit
+
+    def digest(self, obj: Any) -> int:
+        if isinstance(obj, dict):
+            hit = self._lookup(id(obj))
+            if hit is not None:
+                return hit[1]
+            d = hash(("d", frozenset((k, self.digest(v)) for k, v in obj.items())))
+        elif isinstance(obj, (list, tuple)):
+            hit = self._lookup(id(obj))
+            if hit is not None:
+                return hit[1]
+            d = hash(("l", tuple(self.digest(v) for v in obj)))
+        else:
+            try:
+                return hash(obj)
+            except TypeError:
+                return hash(repr(obj))
+        self._memo[id(obj)] = (obj, d)
+        return d
+
+    def same(self, a: Any, b: Any) -> bool:
+        """
+        相等判定：两侧摘要都已缓存时先比摘要（不同即不等）；
+        否则直接走 C 层 ==，不为一次性对象额外计算摘要。
+        """
+        if a is b:
+            return True
+        ha = self._lookup(id(a))
+        hb = self._lookup(id(b))
+        if ha is not None and hb is not None and ha[1] != hb[1]:
+            return False
+        return a == b
+
+    def clear(self):
+        self._memo.clear()
+
+
+def _join(path: str, key: Any) -> str:
+    return f"{path}.{key}" if path else str(key)
+
+
+def _list_key(items_a: Sequence[Any], items_b: Sequence[Any], keys: Sequence[str]) -> Optional[str]:
+    if not items_a and not items_b:
+        return None
+    for key in keys:
+        ok = True
+        for items in (items_a, items_b):
+            seen = set()
+            for it in items:
+                if not isinstance(it, dict) or key not in it:
+                    ok = False
+                    break
+                val = it[key]
+                try:
+                    if val in seen:
+                        ok = False
+                        break
+                    seen.add(val)
+                except TypeError:
+                    ok = False
+                    break
+            if not ok:
+                break
+        if ok:
+            return key
+    return None
+
+
+class StructuralDiffer:
+    def __init__(self, *, list_keys: Sequence[str] = DEFAULT_LIST_KEYS, digests: Optional[DigestCache] = None):
+        self.list_keys = tuple(list_keys)
+        self.digests = digests if digests is not None else DigestCache()
+
+    def iter_diff(self, a: Any, b: Any, path: str = "") -> Iterator[Dict[str, Any]]:
+        if isinstance(a, dict) and isinstance(b, dict):
+            if self.digests.same(a, b):
+                return
+            yield from self._diff_dict(a, b, path)
+        elif isinstance(a, list) and isinstance(b, list):
+            if self.digests.same(a, b):
+                return
+            yield from self._diff_list(a, b, path)
+        elif a != b:
+            yield {"path": path, "a": a, "b": b, "status": "changed"}
+
+    def _diff_dict(self, a: dict, b: dict, path: str) -> Iterator[Dict[str, Any]]:
+        for k, va in a.items():
+            if k not in b:
+                yield {"path": _join(path, k), "a": va, "b": None, "status": "removed"}
+        for k, vb in b.items():
+            if k not in a:
+                yield {"path": _join(path, k), "a": None, "b": vb, "status": "added"}
+        for k, va in a.items():
+            vb = b.get(k, _MISSING)
+            if vb is _MISSING or va is vb:
+                continue
+            if isinstance(va, (dict, list)) and type(va) is type(vb):
+                yield from self.iter_diff(va, vb, _join(path, k))
+            elif va != vb:
+                yield {"path": _join(path, k), "a": va, "b": vb, "status": "changed"}
+
+    def _diff_list(self, a: list, b: list, path: str) -> Iterator[Dict[str, Any]]:
+        key = _list_key(a, b, self.list_keys)
+        if key is not None:
+            yield from self._diff_keyed(a, b, path, key)
+            return
+        da = [self.digests.digest(x) for x in a]
+        db = [self.digests.digest(x) for x in b]
+        matcher = SequenceMatcher(None, da, db, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            if tag == "replace":
+                paired = min(i2 - i1, j2 - j1)
+                for off in range(paired):
+                    yield from self.iter_diff(a[i1 + off], b[j1 + off], f"{path}[{i1 + off}]")
+                for i in range(i1 + paired, i2):
+                    yield {"path": f"{path}[{i}]", "a": a[i], "b": None, "status": "removed"}
+                for j in range(j1 + paired, j2):
+                    yield {"path": f"{path}[{j}]", "a": None, "b": b[j], "status": "added"}
+            elif tag == "delete":
+                for i in range(i1, i2):
+                    yield {"path": f"{path}[{i}]", "a": a[i], "b": None, "status": "removed"}
+            elif tag == "insert":
+                for j in range(j1, j2):
+                    yield {"path": f"{path}[{j}]", "a": None, "b": b[j], "status": "added"}
+
+    def _diff_keyed(self, a: list, b: list, path: str, key: str) -> Iterator[Dict[str, Any]]:
+        index_b = {it[key]: it for it in b}
+        keys_a = set()
+        for it in a:
+            kv = it[key]
+            keys_a.add(kv)
+            if kv not in index_b:
+                yield {"path": f"{path}[{key}={kv}]", "a": it, "b": None, "status": "removed"}
+        for it in b:
+            kv = it[key]
+            if kv not in keys_a:
+                yield {"path": f"{path}[{key}={kv}]", "a": None, "b": it, "status": "added"}
+        for it in a:
+            other = index_b.get(it[key])
+            if other is None or self.digests.same(it, other):
+                continue
+            yield from self._diff_dict(it, other, f"{path}[{key}={it[key]}]")
+
+
+def iter_structural_diff(
+    a: Any,
+    b: Any,
+    *,
+    list_keys: Sequence[str] = DEFAULT_LIST_KEYS,
+    digests: Optional[DigestCache] = None,
+) -> Iterator[Dict[str, Any]]:
+    """惰性产出 a → b 的结构化差异。"""
+    return StructuralDiffer(list_keys=list_keys, digests=digests).iter_diff(a, b)
+
+
+def structural_diff(a: Any, b: Any, **kwargs) -> List[Dict[str, Any]]:
+    return list(iter_structural_diff(a, b, **kwargs))
+
+
+__all__ = [
+    "DEFAULT_LIST_KEYS",
+    "DigestCache",
+    "StructuralDiffer",
+    "iter_structural_diff",
+    "structural_diff",
+]
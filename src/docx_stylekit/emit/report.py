@@ -1,17 +1,89 @@
 import json
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+STATUSES = ("added", "removed", "changed")
+
+
+def _format_text(d):
+    status = d["status"]
+    path = d["path"]
+    a = d["a"]
+    b = d["b"]
+    if status == "added":
+        return f"[+] {path}: {b}"
+    if status == "removed":
+        return f"[-] {path}: {a}"
+    return f"[±] {path}: {a}  -->  {b}"
+
 
 def print_diff_report(diffs, fmt="text"):
-    if fmt == "json":
-        print(json.dumps(diffs, ensure_ascii=False, indent=2))
-        return
+    write_diff_stream(diffs, fmt=fmt)
+
+
+def filter_diffs(diffs, *, path_prefix=None, statuses=None):
+    """
+    按路径前缀（按段边界匹配：x.y 匹配 x.y / x.y.z / x.y[0]，不匹配 x.yz）与状态过滤，惰性产出。
+    path_prefix 可为字符串或字符串序列。
+    """
+    prefixes = (path_prefix,) if isinstance(path_prefix, str) else tuple(path_prefix or ())
+    wanted = set(statuses) if statuses else None
     for d in diffs:
-        status = d["status"]
-        path = d["path"]
-        a = d["a"]
-        b = d["b"]
-        if status == "added":
-            print(f"[+] {path}: {b}")
-        elif status == "removed":
-            print(f"[-] {path}: {a}")
+        if wanted is not None and d["status"] not in wanted:
+            continue
+        if prefixes:
+            path = d["path"]
+            if not any(
+                path == p or path.startswith(p + ".") or path.startswith(p + "[")
+                for p in prefixes
+            ):
+                continue
+        yield d
+
+
+@contextmanager
+def _open_out(out):
+    if out is None or out == "-":
+        yield sys.stdout
+    elif isinstance(out, (str, Path)):
+        path = Path(out)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            yield f
+    else:
+        yield out
+
+
+def write_diff_stream(diffs, *, fmt="text", out=None, path_prefix=None, statuses=None):
+    """
+    增量写出 diff：diffs 可以是任意可迭代对象（如 iter_diff_yaml 的生成器），逐条写出，内存占用与条数无关。
+    fmt:
+      - text：每条一行（[+]/[-]/[±]）；
+      - jsonl：每条一个 JSON 对象一行；
+      - json：JSON 数组，输出与 json.dumps(list, indent=2) 逐字节一致，但逐元素写出。
+    out：None/"-" 表示 stdout，也可为路径或可写文本流。返回写出的条数。
+    """
+    if fmt not in ("text", "json", "jsonl"):
+        raise ValueError(f"未知的输出格式：{fmt}")
+    written = 0
+    with _open_out(out) as f:
+        items = filter_diffs(diffs, path_prefix=path_prefix, statuses=statuses)
+        if fmt == "json":
+            for d in items:
+                body = json.dumps(d, ensure_ascii=False, indent=2, default=str)
+                f.write("[\n  " if written == 0 else ",\n  ")
+                f.write(body.replace("\n", "\n  "))
+                written += 1
+            f.write("[]\n" if written == 0 else "\n]\n")
+        elif fmt == "jsonl":
+            for d in items:
+                f.write(json.dumps(d, ensure_ascii=False, default=str))
+                f.write("\n")
+                written += 1
         else:
-            print(f"[±] {path}: {a}  -->  {b}")
+            for d in items:
+                f.write(_format_text(d))
+                f.write("\n")
+                written += 1
+    return written
@@ -0,0 +1,278 @@
+"""
+可配置压缩的 DOCX 打包写出：只顺序调用 write，不 seek，路径与任意可写流通用。
+- compress_level：0 = 全部仅存储；1–9 = deflate 级别（越低越快、体积越大）；None = zlib 默认（与 python-docx 一致）；
+- store_media：PNG/JPEG 等本身已压缩的媒体直接存储，不再徒劳地 deflate；
+- 大部件（≥ PARALLEL_MIN_BYTES）交给线程池 deflate（zlib 压缩/CRC 期间释放 GIL），
+  主线程同时序列化后续部件；成员按原顺序写出，内容整体已知，头部直接写入 CRC/大小。
+文件头/中央目录字段与 zipfile.writestr 的写法一致，默认级别下成员数据与 doc.save 逐字节相同；
+超过 4 GiB 或 65535 个成员时同 zipfile 一样写 ZIP64 扩展字段与 ZIP64 目录尾。
+"""
+from __future__ import annotations
+
+import os
+import struct
+import time
+import zlib
+from datetime import datetime, timezone
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Tuple
+from zipfile import ZIP_DEFLATED, ZIP_STORED
+
+from docx.opc.pkgwriter import PackageWriter
+from docx.oxml.ns import qn
+
+from ..utils.profiling import count
+from .stream_zip import ChunkedWriter, _seekable, is_writable_stream, write_docx_stream
+
+PARALLEL_MIN_BYTES = 256 * 1024
+MEDIA_EXTENSIONS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".tif", ".tiff", ".wdp", ".jxr",
+    ".mp3", ".mp4", ".m4a", ".zip", ".docx", ".xlsx", ".pptx",
+})
+
+_LOCAL = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL = struct.Struct("<4s4B4HL2L5H2L")
+_END = struct.Struct("<4s4H2LH")
+_END64 = struct.Struct("<4sQ2H2L4Q")
+_END64_LOCATOR = struct.Struct("<4sLQL")
+_VERSION = 20
+_ZIP64_VERSION = 45
+_SYSTEM = 0 if os.name == "nt" else 3
+_EXTERNAL_ATTR = 0o600 << 16
+_UTF8_FLAG = 0x800
+# 超出 _LIMIT/_COUNT_LIMIT 时改用 ZIP64，原字段写占位值 0xFFFFFFFF/0xFFFF
+_LIMIT = 0xFFFFFFFF
+_COUNT_LIMIT = 0xFFFF
+_MAX32 = 0xFFFFFFFF
+_MAX16 = 0xFFFF
+# 固定的成员时间戳（ZIP 能表示的最早时间），用于可复现输出；设置 SOURCE_DATE_EPOCH 时以其为准
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+_FIRST_MEMBERS = ("[Content_Types].xml", "_rels/.rels")
+
+
+def default_threads() -> int:
+    return min(4, os.cpu_count() or 1)
+
+
+def _deflate(data: bytes, level: int) -> Tuple[int, bytes]:
+    c = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return zlib.crc32(data), c.compress(data) + c.flush()
+
+
+def deterministic_date_time() -> Tuple[int, ...]:
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if not epoch:
+        return FIXED_DATE_TIME
+    return max(FIXED_DATE_TIME, tuple(time.gmtime(int(epoch))[:6]))
+
+
+def _member_order(name: str):
+    return (_FIRST_MEMBERS.index(name) if name in _FIRST_MEMBERS else len(_FIRST_MEMBERS), name)
+
+
+def normalize_core_properties(doc, date_time=None) -> None:
+    """核心属性的创建/修改时间统一为 date_time（默认 deterministic_date_time()），去掉打印时间。"""
+    when = datetime(*(date_time or deterministic_date_time()), tzinfo=timezone.utc)
+    props = doc.core_properties
+    props.created = when
+    props.modified = when
+    last_printed = props._element.find(qn("cp:lastPrinted"))
+    if last_printed is not None:
+        props._element.remove(last_printed)
+
+
+def _dos_time(date_time) -> Tuple[int, int]:
+    y, mo, d, h, mi, s = date_time
+    return h << 11 | mi << 5 | s // 2, (y - 1980) << 9 | mo << 5 | d
+
+
+class PackageZipWriter:
+    """
+    按顺序写出 ZIP 成员；write(pack_uri, blob) 与 python-docx 的 PhysPkgWriter 接口相同，
+    可直接交给 PackageWriter 的各写出步骤。
+    """
+
+    def __init__(self, target, *, compress_level: Optional[int] = None, store_media: bool = False,
+                 threads: Optional[int] = None, date_time=None):
+        if compress_level is not None and not 0 <= compress_level <= 9:
+            raise ValueError(f"compress_level 取值 0–9：{compress_level}")
+        self.target = target
+        self.level = zlib.Z_DEFAULT_COMPRESSION if compress_level is None else compress_level
+        self.store_all = compress_level == 0
+        self.store_media = store_media
+        self.dos_time = _dos_time(date_time or time.localtime(time.time())[:6])
+        threads = default_threads() if threads is None else threads
+        self._pool = ThreadPoolExecutor(threads) if threads > 1 else None
+        self._pending = deque()
+        self._central = []
+        self._offset = 0
+
+    def _method(self, name: str) -> int:
+        if self.store_all:
+            return ZIP_STORED
+        if self.store_media and os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS:
+            return ZIP_STORED
+        return ZIP_DEFLATED
+
+    def write(self, pack_uri, blob: bytes):
+        self.add(getattr(pack_uri, "membername", pack_uri), blob)
+
+    def add(self, name: str, data: bytes):
+        method = self._method(name)
+        if method == ZIP_STORED:
+            result = (zlib.crc32(data), data)
+        elif self._pool is not None and len(data) >= PARALLEL_MIN_BYTES:
+            result = self._pool.submit(_deflate, data, self.level)
+            count("save.parallel_deflate")
+        else:
+            result = _deflate(data, self.level)
+        self._pending.append((name, method, len(data), result))
+        self._drain(block=False)
+
+    def _drain(self, block: bool):
+        while self._pending:
+            name, method, size, result = self._pending[0]
+            if not isinstance(result, tuple):
+                if not block and not result.done():
+                    return
+                result = result.result()
+            self._pending.popleft()
+            self._write_member(name, method, size, *result)
+
+    def _write_member(self, name: str, method: int, size: int, crc: int, payload: bytes):
+        try:
+            encoded, flags = name.encode("ascii"), 0
+        except UnicodeEncodeError:
+            encoded, flags = name.encode("utf-8"), _UTF8_FLAG
+        dos_time, dos_date = self.dos_time
+        csize, offset = len(payload), self._offset
+        # 与 zipfile 相同：大小超限时本地头与中央目录都带 ZIP64 大小，偏移超限只记在中央目录
+        local_extra, central64 = b"", []
+        if size > _LIMIT or csize > _LIMIT:
+            local_extra = struct.pack("<HHQQ", 1, 16, size, csize)
+            central64 += [size, csize]
+        if offset > _LIMIT:
+            central64.append(offset)
+        central_extra = struct.pack(f"<HH{len(central64)}Q", 1, 8 * len(central64), *central64) if central64 else b""
+        local_version = _ZIP64_VERSION if local_extra else _VERSION
+        central_version = _ZIP64_VERSION if central_extra else _VERSION
+        hsize, hcsize = (_MAX32, _MAX32) if local_extra else (size, csize)
+        header = _LOCAL.pack(b"PK\003\004", local_version, 0, flags, method, dos_time, dos_date,
+                             crc, hcsize, hsize, len(encoded), len(local_extra))
+        self._central.append(_CENTRAL.pack(b"PK\001\002", central_version, _SYSTEM, central_version, 0, flags,
+                                           method, dos_time, dos_date, crc, hcsize, hsize, len(encoded),
+                                           len(central_extra), 0, 0, 0, _EXTERNAL_ATTR,
+                                           _MAX32 if offset > _LIMIT else offset)
+                             + encoded + central_extra)
+        self.target.write(header + encoded + local_extra)
+        self.target.write(payload)
+        self._offset += len(header) + len(encoded) + len(local_extra) + csize
+
+    def close(self):
+        try:
+            self._drain(block=True)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+        directory = b"".join(self._central)
+        self.target.write(directory)
+        n, size, offset = len(self._central), len(directory), self._offset
+        if n > _COUNT_LIMIT or size > _LIMIT or offset > _LIMIT:
+            self.target.write(_END64.pack(b"PK\006\006", _END64.size - 12, _ZIP64_VERSION, _ZIP64_VERSION,
+                                          0, 0, n, n, size, offset))
+            self.target.write(_END64_LOCATOR.pack(b"PK\006\007", 0, offset + size, 1))
+            n, size, offset = _MAX16, _MAX32, _MAX32
+        self.target.write(_END.pack(b"PK\005\006", 0, 0, n, n, size, offset, 0))
+
+
+def _open_target(target):
+    if is_writable_stream(target):
+        return ChunkedWriter(target), None
+    fh = open(target, "wb")
+    return ChunkedWriter(fh), fh
+
+
+def write_zip_parts(target, parts: Iterable[Tuple[str, bytes]], **options) -> None:
+    """把 (成员名, 内容) 依次写成 ZIP；options 同 PackageZipWriter。"""
+    sink, fh = _open_target(target)
+    try:
+        writer = PackageZipWriter(sink, **options)
+        for name, data in parts:
+            writer.add(name, data)
+        writer.close()
+        sink.flush()
+    finally:
+        if fh is not None:
+            fh.close()
+
+
+class _CollectedParts(list):
+    def write(self, pack_uri, blob: bytes):
+        self.append((pack_uri.membername, blob))
+
+
+def write_docx_package(doc, target, *, sort_members: bool = False, **options) -> None:
+    """
+    按 python-docx 的部件顺序写出 doc（等价于 doc.save），压缩方式由 options 决定。
+    sort_members=True 时成员按 [Content_Types].xml、_rels/.rels、其余按名称排序写出，与部件图的遍历顺序无关。
+    """
+    package = doc.part.package
+    parts = package.parts
+    for part in parts:
+        part.before_marshal()
+    sink, fh = _open_target(target)
+    try:
+        writer = PackageZipWriter(sink, **options)
+        if sort_members:
+            collected = _CollectedParts()
+            PackageWriter._write_content_types_stream(collected, parts)
+            PackageWriter._write_pkg_rels(collected, package.rels)
+            PackageWriter._write_parts(collected, parts)
+            for name, blob in sorted(collected, key=lambda item: _member_order(item[0])):
+                writer.add(name, blob)
+        else:
+            PackageWriter._write_content_types_stream(writer, parts)
+            PackageWriter._write_pkg_rels(writer, package.rels)
+            PackageWriter._write_parts(writer, parts)
+        writer.close()
+        sink.flush()
+    finally:
+        if fh is not None:
+            fh.close()
+
+
+def save_docx(doc, target, *, compress_level: Optional[int] = None, store_media: bool = False,
+              deterministic: bool = False) -> None:
+    """
+    保存 doc 到路径或可写流。指定压缩选项或 deterministic 时用 PackageZipWriter（并行 deflate）；
+    否则路径/可 seek 的流常规保存，不可 seek 的流改为流式写出。
+    deterministic=True：固定成员时间戳与核心属性时间、成员按名称排序，相同内容得到逐字节相同的包。
+    """
+    if deterministic:
+        date_time = deterministic_date_time()
+        normalize_core_properties(doc, date_time)
+        write_docx_package(doc, target, sort_members=True, compress_level=compress_level,
+                           store_media=store_media, date_time=date_time)
+    elif compress_level is not None or store_media:
+        write_docx_package(doc, target, compress_level=compress_level, store_media=store_media)
+    elif not is_writable_stream(target):
+        doc.save(str(target))
+    elif _seekable(target):
+        doc.save(target)
+    else:
+        write_docx_stream(doc, target)
+
+
+__all__ = [
+    "PARALLEL_MIN_BYTES",
+    "FIXED_DATE_TIME",
+    "deterministic_date_time",
+    "normalize_core_properties",
+    "MEDIA_EXTENSIONS",
+    "default_threads",
+    "PackageZipWriter",
+    "write_zip_parts",
+    "write_docx_package",
+    "save_docx",
+]
@@ -0,0 +1,68 @@
+"""
+流式写出 DOCX：部件逐个压缩后直接写入可写流（HTTP 响应、管道、stdout），不需要先落盘或整包驻留内存。
+- 写入端只暴露 write/flush：zipfile 检测到不可 seek，为每个成员写数据描述符（CRC/大小跟在数据后），全程不回退；
+- 小块写入按 chunk_size 聚合后再交给底层流，减少 socket/管道上的系统调用；
+- 可 seek 的目标（文件、BytesIO）仍走 python-docx 的常规保存，输出与保存到路径逐字节一致（分派见 io/package_zip.save_docx）。
+"""
+from __future__ import annotations
+
+import os
+from typing import Any
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ChunkedWriter:
+    """不可 seek 的写入端：累积到 chunk_size 再写出，flush 时写出剩余数据。"""
+
+    def __init__(self, raw, chunk_size: int = CHUNK_SIZE):
+        self.raw = raw
+        self.chunk_size = chunk_size
+        self.bytes_written = 0
+        self._buf = bytearray()
+
+    def write(self, data) -> int:
+        if len(data) >= self.chunk_size:
+            # 大块（如整个压缩后的部件）不再拷进缓冲区
+            self._drain()
+            self.raw.write(data)
+            self.bytes_written += len(data)
+            return len(data)
+        self._buf += data
+        if len(self._buf) >= self.chunk_size:
+            self._drain()
+        return len(data)
+
+    def _drain(self):
+        if self._buf:
+            self.raw.write(bytes(self._buf))
+            self.bytes_written += len(self._buf)
+            self._buf.clear()
+
+    def flush(self):
+        self._drain()
+        flush = getattr(self.raw, "flush", None)
+        if flush is not None:
+            flush()
+
+
+def is_writable_stream(target: Any) -> bool:
+    return hasattr(target, "write") and not isinstance(target, (str, bytes, os.PathLike))
+
+
+def _seekable(stream) -> bool:
+    try:
+        return bool(stream.seekable())
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def write_docx_stream(doc, stream, *, chunk_size: int = CHUNK_SIZE) -> int:
+    """把 doc 以流式 ZIP（数据描述符、无 seek）写入 stream，返回写出的字节数。"""
+    sink = ChunkedWriter(stream, chunk_size)
+    doc.save(sink)
+    sink.flush()
+    return sink.bytes_written
+
+
+__all__ = ["CHUNK_SIZE", "ChunkedWriter", "is_writable_stream", "write_docx_stream"]
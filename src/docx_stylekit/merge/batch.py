@@ -0,0 +1,168 @@
+"""
+批量合并：一份企业基线 × 大量 observed YAML → 每个输入一份 merged YAML。
+- 基线只加载一次，每个工作进程通过 initializer 各持一份；
+- 增量：输出目录下的清单（manifest）记录 sha256(基线 + observed + 版本)，未变化且输出仍存在的条目直接跳过；
+- 失败的条目不写入清单，下次运行会自动重试。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import yaml
+
+from .merger import merge_enterprise_with_observed
+
+YAML_SUFFIXES = (".yaml", ".yml")
+MANIFEST_NAME = ".merge-manifest.json"
+# 合并逻辑变更时递增，使旧清单整体失效
+MERGE_FORMAT = 1
+# 批量场景下 YAML 读写是主要开销，libyaml 可用时改用 C 实现（输出一致）
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def baseline_digest(baseline: Union[bytes, Dict[str, Any]]) -> str:
+    """基线摘要：字节按原样哈希；dict 按规范化 JSON 哈希。"""
+    if isinstance(baseline, dict):
+        baseline = json.dumps(baseline, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return _sha256(bytes(baseline))
+
+
+def iter_batch_inputs(sources: Iterable[Union[str, Path]]) -> List[Tuple[str, Path]]:
+    """
+    展开输入为 (相对名, 路径)：目录按相对路径（递归查找 .yaml/.yml），文件取文件名。
+    相对名决定输出位置，重名时报错。
+    """
+    found: Dict[str, Path] = {}
+    for src in sources:
+        p = Path(src)
+        if p.is_dir():
+            items = [
+                (f.relative_to(p).as_posix(), f)
+                for f in p.rglob("*")
+                if f.is_file() and f.suffix.lower() in YAML_SUFFIXES
+            ]
+        else:
+            items = [(p.name, p)]
+        for rel, f in items:
+            prev = found.get(rel)
+            if prev is not None and prev.resolve() != f.resolve():
+                raise ValueError(f"输入重名，无法确定输出位置：{prev} 与 {f}")
+            found[rel] = f
+    return sorted(found.items())
+
+
+def load_manifest(out_dir: Union[str, Path]) -> Dict[str, Any]:
+    path = Path(out_dir) / MANIFEST_NAME
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"format": MERGE_FORMAT, "files": {}}
+    if manifest.get("format") != MERGE_FORMAT or not isinstance(manifest.get("files"), dict):
+        return {"format": MERGE_FORMAT, "files": {}}
+    return manifest
+
+
+def save_manifest(out_dir: Union[str, Path], manifest: Dict[str, Any]) -> Path:
+    path = Path(out_dir) / MANIFEST_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+    return path
+
+
+def _merge_one(enterprise: Dict[str, Any], src: str, dst: str) -> Optional[str]:
+    try:
+        with open(src, "r", encoding="utf-8") as f:
+            observed = yaml.load(f, Loader=_Loader) or {}
+        merged = merge_enterprise_with_observed(enterprise, observed)
+        Path(dst).parent.mkdir(parents=True, exist_ok=True)
+        with open(dst, "w", encoding="utf-8") as f:
+            yaml.dump(merged, f, Dumper=_Dumper, sort_keys=False, allow_unicode=True)
+    except Exception as exc:  # 单个文件失败不影响整体
+        return f"{type(exc).__name__}: {exc}"
+    return None
+
+
+_WORKER_BASELINE: Optional[Dict[str, Any]] = None
+
+
+def _init_worker(enterprise: Dict[str, Any]):
+    global _WORKER_BASELINE
+    _WORKER_BASELINE = enterprise
+
+
+def _worker_merge(job: Tuple[str, str]) -> Optional[str]:
+    assert _WORKER_BASELINE is not None
+    return _merge_one(_WORKER_BASELINE, *job)
+
+
+def merge_batch(
+    enterprise: Dict[str, Any],
+    sources: Iterable[Union[str, Path]],
+    out_dir: Union[str, Path],
+    *,
+    baseline_hash: Optional[str] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    把 sources（observed YAML 文件或目录）逐个与 enterprise 合并，写入 out_dir/<相对名>。
+    baseline_hash 缺省时按 enterprise 的规范化 JSON 计算；传入基线文件字节的哈希可避免重复序列化。
+    force=True 忽略清单全部重算。workers=1 在当前进程内执行；默认使用 CPU 核数。
+    返回：{"merged": [相对名], "skipped": [...], "errors": {相对名: 错误}, "removed": [清单中已不存在的输入]}
+    """
+    out = Path(out_dir)
+    inputs = iter_batch_inputs(sources)
+    base_hash = baseline_hash or baseline_digest(enterprise)
+    manifest = {} if force else load_manifest(out)["files"]
+
+    entries: Dict[str, Dict[str, str]] = {}
+    jobs: List[Tuple[str, Tuple[str, str]]] = []
+    skipped: List[str] = []
+    for rel, src in inputs:
+        key = _sha256(f"{MERGE_FORMAT}:{base_hash}:".encode("utf-8") + src.read_bytes())
+        dst = out / rel
+        entries[rel] = {"source": str(src), "key": key}
+        prev = manifest.get(rel)
+        if prev and prev.get("key") == key and dst.exists():
+            skipped.append(rel)
+        else:
+            jobs.append((rel, (str(src), str(dst))))
+
+    errors: Dict[str, str] = {}
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs) or 1))
+    if workers == 1:
+        results = [_merge_one(enterprise, *job) for _, job in jobs]
+    else:
+        chunksize = max(1, len(jobs) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(enterprise,)) as pool:
+            results = list(pool.map(_worker_merge, [job for _, job in jobs], chunksize=chunksize))
+
+    merged: List[str] = []
+    for (rel, _), err in zip(jobs, results):
+        if err:
+            errors[rel] = err
+            entries.pop(rel)
+        else:
+            merged.append(rel)
+
+    removed = sorted(set(manifest) - {rel for rel, _ in inputs})
+    save_manifest(out, {"format": MERGE_FORMAT, "baseline": base_hash, "files": entries})
+    return {"merged": merged, "skipped": skipped, "errors": errors, "removed": removed}
+
+
+__all__ = ["baseline_digest", "iter_batch_inputs", "load_manifest", "save_manifest", "merge_batch"]
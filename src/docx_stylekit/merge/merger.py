@@ -1,5 +1,3 @@
-import copy
-
 def merge_enterprise_with_observed(enterprise_yaml: dict, observed_yaml: dict) -> dict:
     """
     简化版策略：
@@ -8,8 +6,10 @@ def merge_enterprise_with_observed(enterprise_yaml: dict, observed_yaml: dict) -
       - 若 enterprise 存在 default，则保留 default，将 observed 值加入 options（或 mapping）；
       - 若 enterprise 缺失该字段的 options，则创建；
     - 不覆盖 default，除非后续提供“模板优先”开关。
+    结构共享：只复制被改动路径上的 dict（theme/colors/fonts），其余子树直接引用
+    enterprise_yaml，不再整体深复制；输入不会被修改。
     """
-    merged = copy.deepcopy(enterprise_yaml)
+    merged = dict(enterprise_yaml)
 
     # 1) theme colors/fonts → 追加 options，不动 default
     _merge_theme(merged, observed_yaml.get("theme", {}))
@@ -29,17 +29,27 @@ def merge_enterprise_with_observed(enterprise_yaml: dict, observed_yaml: dict) -
     return merged
 
 def _merge_theme(merged, theme_obs):
+    # 写时复制：theme 及其 colors/fonts 各层先浅复制再改，避免改动 enterprise 原对象
+    theme = dict(merged.get("theme") or {})
+    merged["theme"] = theme
     # colors
     colors = theme_obs.get("colors", {})
-    merged.setdefault("theme", {}).setdefault("colors", {})
+    mcolors = dict(theme.get("colors") or {})
+    theme["colors"] = mcolors
     for k, v in colors.items():
-        merged["theme"]["colors"].setdefault(k, v)
+        mcolors.setdefault(k, v)
     # fonts
     fonts = theme_obs.get("fonts", {})
-    mfonts = merged["theme"].setdefault("fonts", {"major": {}, "minor": {}})
+    mfonts = dict(theme.get("fonts") or {"major": {}, "minor": {}})
+    theme["fonts"] = mfonts
     for group in ("major", "minor"):
-        for key, val in fonts.get(group, {}).items():
-            mfonts[group].setdefault(key, val)
+        group_obs = fonts.get(group, {})
+        if not group_obs:
+            continue
+        mgroup = dict(mfonts.get(group) or {})
+        mfonts[group] = mgroup
+        for key, val in group_obs.items():
+            mgroup.setdefault(key, val)
 
 def _merge_styles(merged, styles_obs):
     # 仅把新样式挂到 merged["styles_observed"]，避免污染基线
@@ -0,0 +1,164 @@
+"""
+有效样式解析：把 parse_styles 的原始结果按 docDefaults → basedOn 链 → 样式自身 逐层展开，
+得到每个样式的完整 rPr/pPr（所有键齐全），消费方可按样式直接比较有效值而无需再走继承链。
+- 逐层覆盖需要知道哪些属性是样式显式写出的：输入为 parse_styles(..., explicit_only=True) 的结果
+  （resolve_effective_styles_xml 直接从 styles.xml 解析）；
+- observe 输出的 styles 段对缺失项填了默认值，只能用 explicit_view 近似（等于默认值的键视为未设置）；
+- 每种样式类型内部按 basedOn 做一次拓扑展开，结果按 styleId 记忆化，链上的公共前缀只算一次；
+- 循环或悬空的 basedOn 视为链终止（退回 docDefaults）。
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from .styles import closest_cn_size_name, parse_styles
+
+STYLE_KINDS = ("paragraph_styles", "character_styles", "table_styles")
+
+EMPTY_RPR = {
+    "eastAsia": None,
+    "ascii": None,
+    "bold": False,
+    "italic": False,
+    "underline": "none",
+    "size_pt": None,
+    "size_cn": None,
+    "color": None,
+}
+
+EMPTY_PPR = {
+    "alignment": None,
+    "line": None,
+    "space_before_pt": 0,
+    "space_after_pt": 0,
+    "indent": {"first_line": None, "left_cm": 0, "right_cm": 0},
+    "outline_level": None,
+    "keep_next": False,
+}
+
+
+def _overlay(base: Dict[str, Any], layer: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # parse_styles 只输出显式写出的键，这里逐键覆盖（含显式关闭的 False、0.0 缩进）；None 视为未设置
+    if not layer:
+        return base
+    out = dict(base)
+    for key, val in layer.items():
+        if key == "size_cn" or val is None:
+            continue
+        if key == "indent" and isinstance(val, dict):
+            out[key] = _overlay(out[key], val)
+        else:
+            out[key] = val
+    return out
+
+
+def _overlay_rPr(base: Dict[str, Any], layer: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    out = _overlay(base, layer)
+    if out["size_pt"] != base["size_pt"] or (out["size_pt"] and out["size_cn"] is None):
+        out = dict(out, size_cn=closest_cn_size_name(out["size_pt"]) if out["size_pt"] else None)
+    return out
+
+
+class EffectiveStyleResolver:
+    """按 styleId 记忆化的继承展开器；同一份 styles 可重复 resolve 任意样式。"""
+
+    def __init__(self, styles: Dict[str, Any]):
+        self.styles = styles or {}
+        defaults = self.styles.get("doc_defaults") or {}
+        self.default_rPr = _overlay_rPr(EMPTY_RPR, defaults.get("rPr"))
+        self.default_pPr = _overlay(EMPTY_PPR, defaults.get("pPr"))
+        self._memo: Dict[tuple, Dict[str, Any]] = {}
+
+    def resolve(self, kind: str, style_id: str) -> Optional[Dict[str, Any]]:
+        table = self.styles.get(kind) or {}
+        if style_id not in table:
+            return None
+        memo_key = (kind, style_id)
+        hit = self._memo.get(memo_key)
+        if hit is not None:
+            return hit
+
+        # 沿 basedOn 向上收集尚未解析的祖先，遇到已记忆化/悬空/循环处截止
+        chain = []
+        seen = set()
+        cur = style_id
+        base = None
+        while cur in table and cur not in seen:
+            cached = self._memo.get((kind, cur))
+            if cached is not None:
+                base = cached
+                break
+            seen.add(cur)
+            chain.append(cur)
+            cur = table[cur].get("based_on")
+
+        rPr = base["rPr"] if base else self.default_rPr
+        pPr = base["pPr"] if base else self.default_pPr
+        for sid in reversed(chain):
+            item = table[sid]
+            rPr = _overlay_rPr(rPr, item.get("rPr"))
+            pPr = _overlay(pPr, item.get("pPr"))
+            self._memo[(kind, sid)] = {"rPr": rPr, "pPr": pPr}
+        return self._memo[memo_key]
+
+    def resolve_all(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for kind in STYLE_KINDS:
+            out[kind] = {sid: self.resolve(kind, sid) for sid in (self.styles.get(kind) or {})}
+        return out
+
+
+def _drop_defaults(props: Optional[Dict[str, Any]], empty: Dict[str, Any]) -> Dict[str, Any]:
+    out = {}
+    for key, val in (props or {}).items():
+        if key == "indent" and isinstance(val, dict):
+            val = _drop_defaults(val, empty[key])
+            if val:
+                out[key] = val
+        elif key not in empty or val != empty[key]:
+            out[key] = val
+    return out
+
+
+def explicit_view(styles: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    把 observe 输出的 styles 段（缺失项已填默认值）转成显式视图：等于默认值的键视为未设置。
+    只是近似——显式写出的默认值（如 w:b w:val="0"、0 缩进）无法与缺失区分，精确结果请用
+    resolve_effective_styles_xml。
+    """
+    out = dict(styles or {})
+    for kind in ("doc_defaults",) + STYLE_KINDS:
+        items = styles.get(kind) or {}
+        if kind == "doc_defaults":
+            out[kind] = {"rPr": _drop_defaults(items.get("rPr"), EMPTY_RPR),
+                         "pPr": _drop_defaults(items.get("pPr"), EMPTY_PPR)}
+            continue
+        out[kind] = {
+            sid: dict(item, rPr=_drop_defaults(item.get("rPr"), EMPTY_RPR),
+                      pPr=_drop_defaults(item.get("pPr"), EMPTY_PPR))
+            for sid, item in items.items()
+        }
+    return out
+
+
+def resolve_effective_styles(styles: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    输入 parse_styles(..., explicit_only=True) 的结果，返回：
+    {"paragraph_styles": {styleId: {"rPr": {...}, "pPr": {...}}}, "character_styles": {...}, "table_styles": {...}}
+    同一链上的样式共享未改动的 rPr/pPr 对象，结果应视为只读。
+    """
+    return EffectiveStyleResolver(styles).resolve_all()
+
+
+def resolve_effective_styles_xml(xml_bytes) -> Dict[str, Dict[str, Any]]:
+    """直接从 styles.xml 计算有效样式表（按显式写出的属性逐层覆盖）。"""
+    return resolve_effective_styles(parse_styles(xml_bytes, explicit_only=True))
+
+
+__all__ = [
+    "EffectiveStyleResolver",
+    "resolve_effective_styles",
+    "resolve_effective_styles_xml",
+    "explicit_view",
+    "STYLE_KINDS",
+]
@@ -1,13 +1,23 @@
+from bisect import bisect_left
+
 from ..utils.xml import parse_bytes, findall, find, attr
 from ..utils.units import halfpoints_to_pt
 from ..constants import NS, CN_FONT_SIZE_PT
 
+# 按 pt 升序预排好的 (pt, 表内顺序, 字号名)，距离相同时取表内靠前者（与逐项排序的旧实现一致）
+_CN_SIZES = sorted((pt, i, name) for i, (name, pt) in enumerate(CN_FONT_SIZE_PT.items()))
+_CN_SIZE_KEYS = [pt for pt, _, _ in _CN_SIZES]
+
 def closest_cn_size_name(pt):
-    # 最近邻匹配中文字号名
-    items = sorted(CN_FONT_SIZE_PT.items(), key=lambda kv: abs(kv[1]-pt))
-    return items[0][0] if items else None
+    # 最近邻匹配中文字号名：二分定位后只比较左右两个邻居
+    if not _CN_SIZES:
+        return None
+    i = bisect_left(_CN_SIZE_KEYS, pt)
+    candidates = _CN_SIZES[max(0, i - 1):i + 1]
+    best = min(candidates, key=lambda c: (abs(c[0] - pt), c[1]))
+    return best[2]
 
-def parse_styles(xml_bytes):
+def parse_styles(xml_bytes, *, explicit_only=False):
     """
     返回：
     {
@@ -25,19 +35,22 @@ def parse_styles(xml_bytes):
       "table_styles": {...},
       "doc_defaults": {...}
     }
+    explicit_only=True 时 rPr/pPr（含 indent）只包含 XML 中写出的属性，未写出的键省略，
+    b/i/keepNext 的 w:val="0"/"false"/"off" 记为 False；供有效样式展开判断逐层覆盖，observe 输出不使用。
     """
     if not xml_bytes:
         return {"paragraph_styles": {}, "character_styles": {}, "table_styles": {}, "doc_defaults": {}}
 
     root = parse_bytes(xml_bytes)
+    read_rPr, read_pPr = (_read_explicit_rPr, _read_explicit_pPr) if explicit_only else (_read_rPr, _read_pPr)
     out = {"paragraph_styles": {}, "character_styles": {}, "table_styles": {}, "doc_defaults": {}}
 
     # docDefaults
     rdef = find(root, ".//w:docDefaults/w:rPrDefault/w:rPr")
     pdef = find(root, ".//w:docDefaults/w:pPrDefault/w:pPr")
     out["doc_defaults"] = {
-        "rPr": _read_rPr(rdef),
-        "pPr": _read_pPr(pdef),
+        "rPr": read_rPr(rdef),
+        "pPr": read_pPr(pdef),
     }
 
     # styles
@@ -52,8 +65,8 @@ def parse_styles(xml_bytes):
             "name": st_name,
             "based_on": based_on,
             "link_char_style": link,
-            "rPr": _read_rPr(find(st, "w:rPr")),
-            "pPr": _read_pPr(find(st, "w:pPr")),
+            "rPr": read_rPr(find(st, "w:rPr")),
+            "pPr": read_pPr(find(st, "w:pPr")),
         }
 
         if st_type == "paragraph":
@@ -152,3 +165,93 @@ def _read_pPr(node):
         "outline_level": int(attr(outline, "{%s}val" % NS["w"])) if outline is not None else None,
         "keep_next": find(node, "w:keepNext") is not None,
     }
+
+def _on_off(node):
+    # ST_OnOff：缺省 val 即开启，"0"/"false"/"off" 为显式关闭
+    return attr(node, "{%s}val" % NS["w"], "1") not in ("0", "false", "off")
+
+def _read_explicit_rPr(node):
+    # 只输出 XML 中实际写出的属性，缺失项不填默认值（继承展开时据此判断是否覆盖上层）
+    if node is None:
+        return {}
+    out = {}
+    rFonts = find(node, "w:rFonts")
+    for key in ("eastAsia", "ascii"):
+        val = attr(rFonts, "{%s}%s" % (NS["w"], key))
+        if val is not None:
+            out[key] = val
+    for key, tag in (("bold", "w:b"), ("italic", "w:i")):
+        el = find(node, tag)
+        if el is not None:
+            out[key] = _on_off(el)
+    u = find(node, "w:u")
+    if u is not None:
+        out["underline"] = attr(u, "{%s}val" % NS["w"])
+    sz = find(node, "w:sz")
+    if sz is not None:
+        out["size_pt"] = halfpoints_to_pt(float(attr(sz, "{%s}val" % NS["w"], 0)))
+        out["size_cn"] = closest_cn_size_name(out["size_pt"]) if out["size_pt"] else None
+    color = find(node, "w:color")
+    if color is not None:
+        val = attr(color, "{%s}val" % NS["w"])
+        theme = attr(color, "{%s}themeColor" % NS["w"])
+        out["color"] = ({"hex": f"#{val}"} if val else None) or ({"theme": theme} if theme else None)
+    return out
+
+def _read_explicit_pPr(node):
+    # 同 _read_explicit_rPr：缺失项不出现在结果中，indent 内部也只含写出的子属性
+    if node is None:
+        return {}
+    from ..utils.units import twips_to_cm
+    out = {}
+    jc = find(node, "w:jc")
+    if jc is not None:
+        out["alignment"] = attr(jc, "{%s}val" % NS["w"])
+
+    # 行距与段前段后
+    spacing = find(node, "w:spacing")
+    if spacing is not None:
+        line_rule = attr(spacing, "{%s}lineRule" % NS["w"])
+        line_val = attr(spacing, "{%s}line" % NS["w"])
+        if line_val:
+            if line_rule in ("auto", None):
+                lv = int(line_val)
+                if lv == 240: kind = "single"
+                elif lv == 360: kind = "1.5"
+                elif lv == 480: kind = "double"
+                else: kind = "auto"
+                out["line"] = {"rule": kind}
+            elif line_rule == "exact":
+                out["line"] = {"rule": "exact", "value_pt": int(line_val)/20.0}
+            elif line_rule == "atLeast":
+                out["line"] = {"rule": "at_least", "value_pt": int(line_val)/20.0}
+        for key, name in (("space_before_pt", "before"), ("space_after_pt", "after")):
+            val = attr(spacing, "{%s}%s" % (NS["w"], name))
+            if val is not None:
+                out[key] = int(val)/20.0
+
+    # 缩进（优先 firstLineChars）
+    ind = find(node, "w:ind")
+    if ind is not None:
+        indent = {}
+        flc = attr(ind, "{%s}firstLineChars" % NS["w"])
+        fl = attr(ind, "{%s}firstLine" % NS["w"])
+        if flc:
+            indent["first_line"] = {"type": "chars", "value": int(flc)/100.0}
+        elif fl:
+            # 以 cm 近似
+            indent["first_line"] = {"type": "cm", "value": twips_to_cm(int(fl))}
+        for key, name in (("left_cm", "left"), ("right_cm", "right")):
+            val = attr(ind, "{%s}%s" % (NS["w"], name))
+            if val is not None:
+                indent[key] = twips_to_cm(int(val))
+        if indent:
+            out["indent"] = indent
+
+    outline = find(node, "w:outlineLvl")
+    if outline is not None:
+        out["outline_level"] = int(attr(outline, "{%s}val" % NS["w"]))
+    keep_next = find(node, "w:keepNext")
+    if keep_next is not None:
+        out["keep_next"] = _on_off(keep_next)
+    return out
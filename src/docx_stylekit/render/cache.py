@@ -0,0 +1,199 @@
+"""
+渲染结果缓存：相同输入（展开后的模板 + 模板 DOCX 内容 + 渲染开关 + 库版本）直接返回上次生成的 DOCX 字节。
+- 键 = sha256(格式版本, 库版本, 规范化 JSON(展开后的模板), 模板 DOCX 内容, 开关)；
+- 缓存渲染总是使用可复现模式（deterministic），同一输入总是得到同一份字节；
+- 后端可插拔：目录（每条一个文件）或 SQLite（单文件），也可传入任何实现 get/put 的对象；
+- 按总字节数做 LRU 淘汰：命中时刷新使用时间，写入后超出上限则从最久未用的条目开始删除；
+- 内置后端支持 with / close()，由路径打开的后端用完即关闭。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+RENDER_CACHE_FORMAT = 2
+DEFAULT_MAX_BYTES = 1 << 30
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def _canonical(obj: Any) -> bytes:
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def render_cache_key(prepared: Dict[str, Any], template_docx_path=None, *, source_digest: Optional[str] = None,
+                     **flags) -> str:
+    """
+    prepared 为 expand_document() 的结果；流式输入（块迭代器）无法先行规范化，
+    由调用方提供 source_digest（如 Markdown 文本摘要）代替 blocks 参与计算。
+    """
+    from .. import __version__
+
+    h = hashlib.sha256()
+    h.update(f"{RENDER_CACHE_FORMAT}:{__version__}:".encode("utf-8"))
+    h.update(_canonical(prepared))
+    h.update(_canonical({"source": source_digest, "flags": flags}))
+    if template_docx_path:
+        with open(template_docx_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+class _Backend:
+    """内置后端的公共部分：可用作上下文管理器，退出时 close()。"""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class DirectoryRenderCache(_Backend):
+    """
+    目录后端：<dir>/<键前两位>/<键>.docx；文件 mtime 作为最近使用时间。
+    总字节数首次写入时扫描一次，之后随 put 累加；只有估计值超出上限时才重新扫描并淘汰
+    （其他进程写入的条目在下次淘汰扫描时计入）。
+    """
+
+    def __init__(self, path: Union[str, Path], *, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._total: Optional[int] = None
+
+    def _entry(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.docx"
+
+    def _scan(self):
+        entries = []
+        for f in self.path.glob("*/*.docx"):
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, f))
+        return entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entry(key)
+        try:
+            data = entry.read_bytes()
+            os.utime(entry)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        entry = self._entry(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        if self._total is None:
+            self._total = sum(size for _, size, _ in self._scan())
+        try:
+            self._total -= entry.stat().st_size
+        except OSError:
+            pass
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, entry)
+        self._total += len(data)
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> int:
+        """超出 max_bytes 时按 mtime 从旧到新删除，返回删除的条目数。"""
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, f in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                f.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._total = total
+        return removed
+
+
+class SQLiteRenderCache(_Backend):
+    """SQLite 后端：单表 renders(key, data, size, used)，适合大量小文档。"""
+
+    def __init__(self, path: Union[str, Path], *, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS renders ("
+                "key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS renders_used ON renders(used)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT data FROM renders WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE renders SET used = ? WHERE key = ?", (time.time(), key))
+        return bytes(row[0])
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO renders (key, data, size, used) VALUES (?, ?, ?, ?)",
+                (key, sqlite3.Binary(data), len(data), time.time()),
+            )
+        self.evict()
+
+    def evict(self) -> int:
+        removed = 0
+        with self._lock, self._conn:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM renders").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            for key, size in self._conn.execute("SELECT key, size FROM renders ORDER BY used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM renders WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+        return removed
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_render_cache(cache, *, max_bytes: int = DEFAULT_MAX_BYTES):
+    """
+    cache 为后端对象（有 get/put）时原样返回；路径以 .db/.sqlite/.sqlite3 结尾用 SQLite，否则用目录。
+    由路径新建的后端归调用方所有，用完需 close()（或用 with）。
+    """
+    if hasattr(cache, "get") and hasattr(cache, "put"):
+        return cache
+    path = Path(cache)
+    if path.suffix.lower() in SQLITE_SUFFIXES:
+        return SQLiteRenderCache(path, max_bytes=max_bytes)
+    return DirectoryRenderCache(path, max_bytes=max_bytes)
+
+
+__all__ = [
+    "RENDER_CACHE_FORMAT",
+    "DEFAULT_MAX_BYTES",
+    "render_cache_key",
+    "DirectoryRenderCache",
+    "SQLiteRenderCache",
+    "open_render_cache",
+]
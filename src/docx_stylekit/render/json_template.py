@@ -131,6 +131,11 @@ def expand_blocks(blocks: list, vars_dict: dict) -> list:
         out.append(nb)
     return out
 
+def iter_expand_blocks(blocks, vars_dict: dict):
+    """expand_blocks 的惰性版本：逐块展开，适合 blocks 为生成器的流式渲染。"""
+    for b in blocks:
+        yield from expand_blocks([b], vars_dict)
+
 def expand_document(template_json: dict) -> dict:
     doc = deepcopy(template_json.get("doc", {}))
     vars_dict = doc.get("variables", {})
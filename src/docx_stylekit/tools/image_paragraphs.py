@@ -7,6 +7,8 @@ from docx import Document
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 
+from ..io.package_zip import save_docx
+
 
 def _paragraph_contains_image(paragraph) -> bool:
     element = paragraph._element
@@ -66,7 +68,14 @@ def _remove_leading_whitespace_runs(paragraph):
         break
 
 
-def fix_image_paragraph_spacing(input_path: Path, output_path: Optional[Path] = None) -> Path:
+def fix_image_paragraph_spacing(
+    input_path: Path,
+    output_path: Optional[Path] = None,
+    *,
+    compress_level: Optional[int] = None,
+    store_media: bool = False,
+    deterministic: bool = False,
+) -> Path:
     doc = Document(str(input_path))
     updated_count = 0
 
@@ -135,5 +144,5 @@ def fix_image_paragraph_spacing(input_path: Path, output_path: Optional[Path] =
         updated_count += 1
 
     destination = output_path or input_path
-    doc.save(str(destination))
+    save_docx(doc, destination, compress_level=compress_level, store_media=store_media, deterministic=deterministic)
     return destination
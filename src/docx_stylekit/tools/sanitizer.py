@@ -17,10 +17,12 @@ from docx.shared import Pt
 import xml.etree.ElementTree as ET
 
 from .image_paragraphs import fix_image_paragraph_spacing
-from ..utils.io import load_yaml
+from ..io.package_zip import save_docx, write_zip_parts
+from ..data import load_default_profile
+from ..utils.profiling import count, span
 from ..writer.docx_writer import _apply_table_format
+from ..writer.prune import prune_document
 from ..writer.style_store import StyleResolver
-from importlib import resources
 
 
 MANDATORY_STYLES = ["ImageParagraph", "PageNumber", "InfoTable"]
@@ -43,9 +45,7 @@ MANUAL_HEADING_PREFIX = re.compile(
 
 
 def _load_default_profile() -> dict:
-    resource_path = resources.files("docx_stylekit.data").joinpath("default_render_template.yaml")
-    with resources.as_file(resource_path) as path:
-        return load_yaml(path)
+    return load_default_profile()
 
 
 def _copy_docx(src: Path) -> Path:
@@ -56,17 +56,14 @@ def _copy_docx(src: Path) -> Path:
 
 
 def _replace_part(docx_path: Path, part_name: str, content: bytes):
+    # 工作副本随后会被重新打开，仅存储不压缩即可；最终输出的压缩方式在最后一次保存时决定
     tmp_zip = docx_path.with_suffix(".tmp")
-    with zipfile.ZipFile(docx_path, "r") as zin, zipfile.ZipFile(tmp_zip, "w", zipfile.ZIP_DEFLATED) as zout:
-        replaced = False
-        for item in zin.infolist():
-            if item.filename == part_name:
-                zout.writestr(item, content)
-                replaced = True
-            else:
-                zout.writestr(item, zin.read(item.filename))
-        if not replaced:
-            zout.writestr(part_name, content)
+    with zipfile.ZipFile(docx_path, "r") as zin:
+        names = zin.namelist()
+        parts = [(name, content if name == part_name else zin.read(name)) for name in names]
+    if part_name not in names:
+        parts.append((part_name, content))
+    write_zip_parts(tmp_zip, parts, compress_level=0)
     docx_path.unlink()
     tmp_zip.rename(docx_path)
 
@@ -444,6 +441,10 @@ def sanitize_docx(
     template_docx: Optional[Path] = None,
     *,
     output_path: Optional[Path] = None,
+    compress_level: Optional[int] = None,
+    store_media: bool = False,
+    deterministic: bool = False,
+    prune: bool = False,
 ) -> Path:
     raw_docx = Path(raw_docx)
     template_docx = Path(template_docx) if template_docx else None
@@ -454,124 +455,138 @@ def sanitize_docx(
     table_format = table_defaults.get("format", {})
 
     if template_docx and template_docx.exists():
-        styles_xml = _extract_part(template_docx, "word/styles.xml")
-        if styles_xml:
-            _replace_part(working_copy, "word/styles.xml", styles_xml)
-        numbering_xml = _extract_part(template_docx, "word/numbering.xml")
-        if numbering_xml:
-            _replace_part(working_copy, "word/numbering.xml", numbering_xml)
-
-    doc = Document(str(working_copy))
-    original_doc = Document(str(raw_docx))
-    _ensure_required_styles(doc, default_profile, allow_override=template_docx is None)
+        with span("sanitize.replace_parts"):
+            styles_xml = _extract_part(template_docx, "word/styles.xml")
+            if styles_xml:
+                _replace_part(working_copy, "word/styles.xml", styles_xml)
+            numbering_xml = _extract_part(template_docx, "word/numbering.xml")
+            if numbering_xml:
+                _replace_part(working_copy, "word/numbering.xml", numbering_xml)
+
+    with span("sanitize.load"):
+        doc = Document(str(working_copy))
+        original_doc = Document(str(raw_docx))
+    with span("sanitize.styles"):
+        _ensure_required_styles(doc, default_profile, allow_override=template_docx is None)
     defined_num_ids = _load_defined_num_ids(working_copy)
 
     paragraphs = list(_iter_paragraphs(doc))
     original_paragraphs = list(_iter_paragraphs(original_doc))
     original_styles = [p.style.name if p.style else "" for p in original_paragraphs]
 
-    non_empty_counter = 0
-    previous_heading_level: Optional[int] = None
-    previous_pattern_level: Optional[int] = None
-    previous_pattern_kind: Optional[str] = None
-    for idx, paragraph in enumerate(paragraphs):
-        original_style = original_styles[idx] if idx < len(original_styles) else ""
-        in_table = paragraph._element.getparent().tag.endswith('tc')
-        text_content = paragraph.text
-        stripped_text = text_content.strip()
-        pattern_info = _detect_heading_pattern(stripped_text) if stripped_text else None
-        pattern_level = pattern_info[0] if pattern_info else None
-        pattern_kind = pattern_info[1] if pattern_info else None
-        pattern_remainder = pattern_info[2] if pattern_info else ""
-        style_name = _map_style_name(
-            original_style,
-            text_content,
-            non_empty_counter,
-            previous_heading_level,
-            in_table=in_table,
-            pattern_level=pattern_level,
-            pattern_kind=pattern_kind,
-            pattern_remainder=pattern_remainder,
-            previous_pattern_level=previous_pattern_level,
-            previous_pattern_kind=previous_pattern_kind,
-        )
-        assigned_level = None
-        if style_name.startswith("Heading "):
-            try:
-                assigned_level = int(style_name.split()[1])
-            except ValueError:
-                assigned_level = None
-        if assigned_level is not None and previous_heading_level is not None and assigned_level > previous_heading_level + 1:
-            assigned_level = previous_heading_level + 1
-            style_name = f"Heading {assigned_level}"
-        style_obj = None
-        if paragraph._element.xpath(".//w:drawing"):
-            style_obj = doc.styles["ImageParagraph"]
-            paragraph.style = style_obj
-        else:
-            try:
-                style_obj = doc.styles[style_name]
+    with span("sanitize.classify"):
+        non_empty_counter = 0
+        previous_heading_level: Optional[int] = None
+        previous_pattern_level: Optional[int] = None
+        previous_pattern_kind: Optional[str] = None
+        for idx, paragraph in enumerate(paragraphs):
+            original_style = original_styles[idx] if idx < len(original_styles) else ""
+            in_table = paragraph._element.getparent().tag.endswith('tc')
+            text_content = paragraph.text
+            stripped_text = text_content.strip()
+            pattern_info = _detect_heading_pattern(stripped_text) if stripped_text else None
+            pattern_level = pattern_info[0] if pattern_info else None
+            pattern_kind = pattern_info[1] if pattern_info else None
+            pattern_remainder = pattern_info[2] if pattern_info else ""
+            style_name = _map_style_name(
+                original_style,
+                text_content,
+                non_empty_counter,
+                previous_heading_level,
+                in_table=in_table,
+                pattern_level=pattern_level,
+                pattern_kind=pattern_kind,
+                pattern_remainder=pattern_remainder,
+                previous_pattern_level=previous_pattern_level,
+                previous_pattern_kind=previous_pattern_kind,
+            )
+            assigned_level = None
+            if style_name.startswith("Heading "):
+                try:
+                    assigned_level = int(style_name.split()[1])
+                except ValueError:
+                    assigned_level = None
+            if assigned_level is not None and previous_heading_level is not None and assigned_level > previous_heading_level + 1:
+                assigned_level = previous_heading_level + 1
+                style_name = f"Heading {assigned_level}"
+            style_obj = None
+            if paragraph._element.xpath(".//w:drawing"):
+                style_obj = doc.styles["ImageParagraph"]
                 paragraph.style = style_obj
-            except KeyError:
+            else:
                 try:
                     style_obj = doc.styles[style_name]
                     paragraph.style = style_obj
                 except KeyError:
-                    style_obj = doc.styles["Normal"]
-                    paragraph.style = style_obj
-        _clear_run_formatting(paragraph)
-        _clear_paragraph_formatting(paragraph)
-        if in_table:
-            pf = paragraph.paragraph_format
-            pf.left_indent = Pt(0)
-            pf.first_line_indent = Pt(0)
-        numbering_applied = False
-        if assigned_level is not None and style_obj is not None:
-            numbering_info = _style_numbering_info(style_obj)
-            if numbering_info:
-                num_id, default_ilvl = numbering_info
-                if num_id in defined_num_ids:
-                    _apply_style_numbering(paragraph, num_id, assigned_level, default_ilvl)
-                    numbering_applied = True
+                    try:
+                        style_obj = doc.styles[style_name]
+                        paragraph.style = style_obj
+                    except KeyError:
+                        style_obj = doc.styles["Normal"]
+                        paragraph.style = style_obj
+            _clear_run_formatting(paragraph)
+            _clear_paragraph_formatting(paragraph)
+            if in_table:
+                pf = paragraph.paragraph_format
+                pf.left_indent = Pt(0)
+                pf.first_line_indent = Pt(0)
+            numbering_applied = False
+            if assigned_level is not None and style_obj is not None:
+                numbering_info = _style_numbering_info(style_obj)
+                if numbering_info:
+                    num_id, default_ilvl = numbering_info
+                    if num_id in defined_num_ids:
+                        _apply_style_numbering(paragraph, num_id, assigned_level, default_ilvl)
+                        numbering_applied = True
+                    else:
+                        _remove_paragraph_numbering(paragraph)
                 else:
                     _remove_paragraph_numbering(paragraph)
-            else:
-                _remove_paragraph_numbering(paragraph)
-        if numbering_applied and pattern_level:
-            _strip_manual_heading_prefix(paragraph)
-        if paragraph.text.strip():
-            if style_name.startswith("Heading "):
-                try:
-                    previous_heading_level = int(style_name.split()[1])
-                except ValueError:
-                    previous_heading_level = None
-                if assigned_level is not None and pattern_level is not None:
-                    previous_pattern_level = pattern_level
-                    previous_pattern_kind = pattern_kind
-                else:
+            if numbering_applied and pattern_level:
+                _strip_manual_heading_prefix(paragraph)
+            if paragraph.text.strip():
+                if style_name.startswith("Heading "):
+                    try:
+                        previous_heading_level = int(style_name.split()[1])
+                    except ValueError:
+                        previous_heading_level = None
+                    if assigned_level is not None and pattern_level is not None:
+                        previous_pattern_level = pattern_level
+                        previous_pattern_kind = pattern_kind
+                    else:
+                        previous_pattern_level = None
+                        previous_pattern_kind = None
+                elif style_name == "Title":
+                    previous_heading_level = 0
                     previous_pattern_level = None
                     previous_pattern_kind = None
-            elif style_name == "Title":
-                previous_heading_level = 0
-                previous_pattern_level = None
-                previous_pattern_kind = None
-            non_empty_counter += 1
+                non_empty_counter += 1
+    count("sanitize.paragraphs_classified", len(paragraphs))
 
     try:
         style = doc.styles["InfoTable"]
     except KeyError:
         style = None
-    for table in doc.tables:
-        if style:
-            try:
-                table.style = style
-            except KeyError:
-                pass
-        if table_format:
-            _apply_table_format(table, table_format)
-
-    doc.save(str(working_copy))
-    fix_image_paragraph_spacing(working_copy, working_copy)
+    with span("sanitize.tables"):
+        for table in doc.tables:
+            count("sanitize.tables")
+            if style:
+                try:
+                    table.style = style
+                except KeyError:
+                    pass
+            if table_format:
+                _apply_table_format(table, table_format)
+
+    if prune:
+        # 模板的整份 styles.xml/numbering.xml 已换入，保存前删掉文中未用到的部分
+        with span("sanitize.prune"):
+            prune_document(doc)
+    with span("sanitize.save"):
+        save_docx(doc, working_copy, compress_level=0)
+    with span("sanitize.fix_images"):
+        fix_image_paragraph_spacing(working_copy, working_copy, compress_level=compress_level, store_media=store_media,
+                                    deterministic=deterministic)
 
     destination = Path(output_path) if output_path else raw_docx
     shutil.copy2(working_copy, destination)
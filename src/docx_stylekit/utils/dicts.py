@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from copy import deepcopy
 
 
@@ -33,4 +34,84 @@ def deep_merge(base, override, *, replace_lists=True):
     return merged
 
 
-__all__ = ["deep_merge"]
+def merge_shared(base, override, *, replace_lists=True):
+    """
+    与 deep_merge 结果等值，但采用结构共享（copy-on-write）：
+    - 只为 override 实际触及的路径新建 dict（浅复制该层）；
+    - 未触及的子树、override 中的值均直接引用，不做深复制。
+    分配量与 override 的大小成正比，而非与 base 的大小成正比。
+    返回值与输入共享子对象：调用方需把结果视为只读，或在修改前自行复制对应层。
+    """
+    if base is None:
+        return override
+    if override is None:
+        return base
+    if not isinstance(base, dict) or not isinstance(override, dict):
+        return override
+    if not override:
+        return base
+
+    merged = dict(base)
+    for key, val in override.items():
+        cur = merged.get(key)
+        if isinstance(cur, dict) and isinstance(val, dict):
+            merged[key] = merge_shared(cur, val, replace_lists=replace_lists)
+        elif isinstance(cur, list) and isinstance(val, list) and not replace_lists:
+            merged[key] = cur + val
+        else:
+            merged[key] = val
+    return merged
+
+
+class MergedView(Mapping):
+    """
+    只读叠加视图（类似嵌套的 ChainMap）：读取时 override 优先，两侧均为 dict 的键
+    返回下一层 MergedView；构造本身不复制任何数据，materialize() 时才按 merge_shared 生成 dict。
+    list 一律按 override 替换。
+    """
+
+    __slots__ = ("_base", "_override")
+
+    def __init__(self, base=None, override=None):
+        self._base = base if isinstance(base, Mapping) else {}
+        self._override = override if isinstance(override, Mapping) else {}
+
+    def __getitem__(self, key):
+        if key in self._override:
+            val = self._override[key]
+            if isinstance(val, Mapping):
+                under = self._base.get(key)
+                if isinstance(under, Mapping):
+                    return MergedView(under, val)
+            return val
+        return self._base[key]
+
+    def __contains__(self, key):
+        return key in self._override or key in self._base
+
+    def __iter__(self):
+        yield from self._override
+        for key in self._base:
+            if key not in self._override:
+                yield key
+
+    def __len__(self):
+        return len(self._override) + sum(1 for key in self._base if key not in self._override)
+
+    def __bool__(self):
+        return bool(self._override) or bool(self._base)
+
+    def __repr__(self):
+        return f"MergedView({self._base!r}, {self._override!r})"
+
+    def materialize(self):
+        return merge_shared(_plain(self._base), _plain(self._override))
+
+
+def _plain(obj):
+    if isinstance(obj, MergedView):
+        return obj.materialize()
+    return obj
+
+
+__all__ = ["deep_merge", "merge_shared", "MergedView"]
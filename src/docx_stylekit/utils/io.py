@@ -5,7 +5,12 @@ def load_yaml(path):
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
+class _NoAliasDumper(yaml.SafeDumper):
+    # 结构共享的数据（如有效样式表）按值展开输出，不生成 &id/*id 锚点
+    def ignore_aliases(self, data):
+        return True
+
 def dump_yaml(data, path):
     Path(path).parent.mkdir(parents=True, exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
-        yaml.safe_dump(data, f, sort_keys=False, allow_unicode=True)
+        yaml.dump(data, f, Dumper=_NoAliasDumper, sort_keys=False, allow_unicode=True)
@@ -0,0 +1,188 @@
+"""
+分阶段计时与计数埋点。
+
+未开启 profile_session 时，span()/count() 只做一次 ContextVar 读取，开销可忽略；
+开启后记录嵌套 span 的耗时、计数器，并可选采集 cProfile / tracemalloc。
+
+    with profile_session(callback=print) as prof:
+        render_from_json(...)
+    report = prof.report()
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+SpanCallback = Callable[[Dict[str, Any]], None]
+
+_ACTIVE: ContextVar[Optional["Profiler"]] = ContextVar("docx_stylekit_profiler", default=None)
+
+
+class Profiler:
+    def __init__(
+        self,
+        *,
+        callback: Optional[SpanCallback] = None,
+        cprofile: bool = False,
+        trace_memory: bool = False,
+        max_spans: int = 10000,
+    ):
+        self.callback = callback
+        self.max_spans = max_spans
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped_spans = 0
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self.counters: Counter = Counter()
+        self._stack: List[str] = []
+        self._t0 = time.perf_counter()
+        self._elapsed: Optional[float] = None
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._trace_memory = trace_memory
+        self._owns_tracemalloc = False
+        self._mem_peak_kb: Optional[float] = None
+
+    # -- 生命周期 --
+    def start(self):
+        if self._trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._trace_memory and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            self._mem_peak_kb = round(peak / 1024, 1)
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+        self._elapsed = time.perf_counter() - self._t0
+
+    # -- 记录 --
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        path = "/".join(self._stack + [name])
+        depth = len(self._stack)
+        self._stack.append(name)
+        mem_before = tracemalloc.get_traced_memory()[0] if self._trace_memory and tracemalloc.is_tracing() else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._stack.pop()
+            event = {
+                "name": name,
+                "path": path,
+                "depth": depth,
+                "start_s": round(start - self._t0, 6),
+                "duration_s": round(duration, 6),
+            }
+            if mem_before is not None:
+                event["mem_delta_kb"] = round((tracemalloc.get_traced_memory()[0] - mem_before) / 1024, 1)
+            total = self.totals.setdefault(name, {"count": 0, "total_s": 0.0})
+            total["count"] += 1
+            total["total_s"] += duration
+            if len(self.spans) < self.max_spans:
+                self.spans.append(event)
+            else:
+                self.dropped_spans += 1
+            if self.callback is not None:
+                self.callback(event)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    # -- 输出 --
+    def report(self, *, top: int = 30) -> Dict[str, Any]:
+        elapsed = self._elapsed if self._elapsed is not None else time.perf_counter() - self._t0
+        out: Dict[str, Any] = {
+            "elapsed_s": round(elapsed, 6),
+            "totals": {
+                k: {"count": int(v["count"]), "total_s": round(v["total_s"], 6)}
+                for k, v in sorted(self.totals.items(), key=lambda kv: -kv[1]["total_s"])
+            },
+            "counters": dict(self.counters),
+            "spans": self.spans,
+            "dropped_spans": self.dropped_spans,
+        }
+        if self._mem_peak_kb is not None:
+            out["memory"] = {"peak_kb": self._mem_peak_kb}
+        if self._cprofile is not None:
+            out["cprofile"] = _cprofile_top(self._cprofile, top)
+        return out
+
+    def write_json(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path
+
+
+def _cprofile_top(prof: cProfile.Profile, top: int) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(prof, stream=io.StringIO())
+    rows = []
+    for (filename, lineno, func), (cc, nc, tt, ct, _callers) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{lineno}({func})",
+            "calls": nc,
+            "tottime_s": round(tt, 6),
+            "cumtime_s": round(ct, 6),
+        })
+    rows.sort(key=lambda r: -r["cumtime_s"])
+    return rows[:top]
+
+
+@contextmanager
+def profile_session(
+    callback: Optional[SpanCallback] = None,
+    *,
+    cprofile: bool = False,
+    trace_memory: bool = False,
+) -> Iterator[Profiler]:
+    """
+    开启一次 profile 会话：期间所有 API 调用的 span/计数都记录到返回的 Profiler。
+    callback 在每个 span 结束时收到事件 dict（name/path/depth/start_s/duration_s）。
+    """
+    prof = Profiler(callback=callback, cprofile=cprofile, trace_memory=trace_memory)
+    token = _ACTIVE.set(prof)
+    prof.start()
+    try:
+        yield prof
+    finally:
+        prof.stop()
+        _ACTIVE.reset(token)
+
+
+def active_profiler() -> Optional[Profiler]:
+    return _ACTIVE.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    prof = _ACTIVE.get()
+    if prof is None:
+        yield
+        return
+    with prof.span(name):
+        yield
+
+
+def count(name: str, n: int = 1):
+    prof = _ACTIVE.get()
+    if prof is not None:
+        prof.counters[name] += n
+
+
+__all__ = ["Profiler", "profile_session", "active_profiler", "span", "count"]
@@ -1,25 +1,49 @@
 import os
 import json
 import yaml
+from copy import deepcopy
 from typing import Optional
 from docx import Document
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
-from docx.shared import RGBColor
+from docx.shared import Emu, RGBColor, Twips
+from docx.text.run import Run
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL
 from .style_store import StyleResolver
-from .section_utils import apply_section_layout, add_page_number_field, add_toc_field
-from ..utils.dicts import deep_merge
+from .run_builder import append_run, replace_t_text
+from .incremental import render_context_key, write_blocks_incremental
+from .sharded import write_blocks_sharded
+from .prune import prune_document
+from .skeleton import open_default_document, remember_default_document, skeleton_key
+from .section_utils import (
+    add_page_number_footers,
+    add_toc_field,
+    apply_section_layout,
+    current_usable_width,
+    update_section_state,
+)
+from ..io.package_zip import save_docx
+from ..render.json_template import expand_blocks, substitute_text
+from ..utils.dicts import MergedView
+from ..utils.profiling import count, span
 
 def _clear_cell(cell):
     while cell._tc.getchildren():
         cell._tc.remove(cell._tc.getchildren()[-1])
 
-def _set_cell_shading(cell, color_hex: str):
+_VERTICAL_ALIGN = {
+    "top": WD_ALIGN_VERTICAL.TOP,
+    "center": WD_ALIGN_VERTICAL.CENTER,
+    "middle": WD_ALIGN_VERTICAL.CENTER,
+    "bottom": WD_ALIGN_VERTICAL.BOTTOM,
+    "both": WD_ALIGN_VERTICAL.BOTH,
+}
+
+def _set_tc_shading(tc, color_hex: str):
     if not color_hex:
         return
     color = color_hex.lstrip("#").upper()
-    tc_pr = cell._tc.get_or_add_tcPr()
+    tc_pr = tc.get_or_add_tcPr()
     shd = tc_pr.find(qn('w:shd'))
     if shd is None:
         shd = OxmlElement('w:shd')
@@ -28,108 +52,56 @@ def _set_cell_shading(cell, color_hex: str):
     shd.set(qn('w:color'), 'auto')
     shd.set(qn('w:fill'), color)
 
-def _set_cell_border(cell, border: dict):
-    if not border:
-        return
-    tc_pr = cell._tc.get_or_add_tcPr()
-    tc_borders = tc_pr.find(qn('w:tcBorders'))
-    if tc_borders is None:
-        tc_borders = OxmlElement('w:tcBorders')
-        tc_pr.append(tc_borders)
-    for edge in ("top", "bottom", "left", "right"):
+def _set_border_edges(borders, border: dict, edges):
+    for edge in edges:
         cfg = border.get(edge)
         if not cfg:
             continue
-        el = tc_borders.find(qn(f'w:{edge}'))
+        el = borders.find(qn(f'w:{edge}'))
         if el is None:
             el = OxmlElement(f'w:{edge}')
-            tc_borders.append(el)
+            borders.append(el)
         el.set(qn('w:val'), cfg.get("style", "single"))
         if "color" in cfg:
             el.set(qn('w:color'), cfg["color"].lstrip("#").upper())
         if "size" in cfg:
             el.set(qn('w:sz'), str(int(cfg["size"])))
 
-def _apply_cell_vertical_align(cell, align):
+def _set_tc_border(tc, border: dict):
+    if not border:
+        return
+    tc_pr = tc.get_or_add_tcPr()
+    tc_borders = tc_pr.find(qn('w:tcBorders'))
+    if tc_borders is None:
+        tc_borders = OxmlElement('w:tcBorders')
+        tc_pr.append(tc_borders)
+    _set_border_edges(tc_borders, border, ("top", "bottom", "left", "right"))
+
+def _set_tc_vertical_align(tc, align):
     if not align:
         return
-    key = str(align).lower()
-    mapping = {
-        "top": WD_ALIGN_VERTICAL.TOP,
-        "center": WD_ALIGN_VERTICAL.CENTER,
-        "middle": WD_ALIGN_VERTICAL.CENTER,
-        "bottom": WD_ALIGN_VERTICAL.BOTTOM,
-        "both": WD_ALIGN_VERTICAL.BOTH if hasattr(WD_ALIGN_VERTICAL, "BOTH") else None,
-    }
-    val = mapping.get(key)
+    val = _VERTICAL_ALIGN.get(str(align).lower())
     if val is not None:
-        cell.vertical_alignment = val
+        tc.get_or_add_tcPr().vAlign_val = val
 
-def _apply_table_format(table, fmt: dict):
-    if not fmt:
-        return
-    header_cfg = fmt.get("header")
-    if header_cfg:
-        for cell in table.rows[0].cells:
-            _set_cell_shading(cell, header_cfg.get("fill"))
-            _set_cell_border(cell, header_cfg.get("border"))
-            _apply_cell_vertical_align(cell, header_cfg.get("verticalAlign"))
-            for p in cell.paragraphs:
-                for run in p.runs:
-                    font = run.font
-                    if header_cfg.get("bold") is not None:
-                        font.bold = bool(header_cfg.get("bold"))
-                    if header_cfg.get("color"):
-                        font.color.rgb = RGBColor.from_string(header_cfg["color"].lstrip("#"))
-    banding = fmt.get("bandedRows")
-    if banding:
-        alt_cfg = fmt.get("alternate")
-        for idx, row in enumerate(table.rows[1:], start=1):
-            if idx % 2 == 1 and alt_cfg:
-                for cell in row.cells:
-                    _set_cell_shading(cell, alt_cfg.get("fill"))
-                    _apply_cell_vertical_align(cell, alt_cfg.get("verticalAlign"))
-    table_border = fmt.get("tableBorder")
-    if table_border:
-        tbl = table._tbl
-        tbl_pr = tbl.tblPr
-        if tbl_pr is None:
-            tbl_pr = OxmlElement('w:tblPr')
-            tbl.append(tbl_pr)
-        borders = tbl_pr.find(qn('w:tblBorders'))
-        if borders is None:
-            borders = OxmlElement('w:tblBorders')
-            tbl_pr.append(borders)
-        for edge in ("top","bottom","left","right","insideH","insideV"):
-            cfg = table_border.get(edge)
-            if not cfg:
-                continue
-            el = borders.find(qn(f'w:{edge}'))
-            if el is None:
-                el = OxmlElement(f'w:{edge}')
-                borders.append(el)
-            el.set(qn('w:val'), cfg.get("style","single"))
-            if "color" in cfg:
-                el.set(qn('w:color'), cfg["color"].lstrip("#").upper())
-            if "size" in cfg:
-                el.set(qn('w:sz'), str(int(cfg["size"])))
-    body_cfg = fmt.get("cell") or fmt.get("body")
-    if body_cfg:
-        has_header = bool(header_cfg) and len(table.rows) > 0
-        start_idx = 1 if has_header else 0
-        for row in table.rows[start_idx:]:
-            for cell in row.cells:
-                _apply_cell_vertical_align(cell, body_cfg.get("verticalAlign"))
-
-def _set_table_widths(table, columns_cfg, section):
-    if not columns_cfg or section is None:
-        return
-    try:
-        usable = section.page_width - section.left_margin - section.right_margin
-    except AttributeError:
-        return
-    if usable <= 0:
+def _format_header_runs(tc, header_cfg: dict):
+    bold = header_cfg.get("bold")
+    color = RGBColor.from_string(header_cfg["color"].lstrip("#")) if header_cfg.get("color") else None
+    if bold is None and color is None:
         return
+    for p in tc.p_lst:
+        for r in p.r_lst:
+            font = Run(r, None).font
+            if bold is not None:
+                font.bold = bool(bold)
+            if color is not None:
+                font.color.rgb = color
+
+def _column_widths(columns_cfg, usable_twips):
+    """按 widthPct 计算 (可用宽度, 各列宽) 两个 EMU 值；未指定的列均分剩余比例，无法计算时返回 None。"""
+    if not columns_cfg or usable_twips is None or usable_twips <= 0:
+        return None
+    usable = Twips(usable_twips)
     widths_pct = []
     unspecified = []
     for idx, col_cfg in enumerate(columns_cfg):
@@ -146,13 +118,11 @@ def _set_table_widths(table, columns_cfg, section):
         widths_pct[idx] = default_pct
     total_pct = sum(widths_pct)
     if total_pct <= 0:
-        return
+        return None
     scale = 100.0 / total_pct
-    widths_pct = [p * scale for p in widths_pct]
-    table.autofit = False
-    if hasattr(table, "allow_autofit"):
-        table.allow_autofit = False
-    tbl = table._tbl
+    return usable, [int(round(usable * p * scale / 100.0)) for p in widths_pct]
+
+def _apply_table_widths(tbl, usable, grid_twips):
     tbl_pr = tbl.tblPr
     if tbl_pr is None:
         tbl_pr = OxmlElement('w:tblPr')
@@ -161,37 +131,177 @@ def _set_table_widths(table, columns_cfg, section):
     if tblW is None:
         tblW = OxmlElement('w:tblW')
         tbl_pr.insert(0, tblW)
-    tblW.set(qn('w:w'), str(int(usable)))
+    tblW.set(qn('w:w'), str(Emu(usable).twips))
     tblW.set(qn('w:type'), 'dxa')
-    for col_idx, pct in enumerate(widths_pct):
-        col_width = int(round(usable * pct / 100.0))
-        if col_idx >= len(table.columns):
-            break
-        table.columns[col_idx].width = col_width
-        for cell in table.columns[col_idx].cells:
-            cell.width = col_width
-    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    tbl_pr.autofit = False
+    for grid_col, w in zip(tbl.tblGrid.gridCol_lst, grid_twips):
+        grid_col.set(qn('w:w'), str(w))
+
+def _apply_table_format(table, fmt: dict, *, columns_cfg=None, usable_twips=None):
+    """
+    表格版式一次完成：列宽（w:tblGrid/w:gridCol + 每个单元格 tcW）、表头/隔行/正文的底纹、边框、垂直对齐。
+    列宽只算一次；单元格按 w:tc 元素单趟遍历，每个单元格的各项设置按原先的先后顺序写入。
+    """
+    fmt = fmt or {}
+    tbl = table._tbl
+    widths = _column_widths(columns_cfg, usable_twips)
+    col_twips = None
+    if widths is not None:
+        usable, col_emu = widths
+        col_twips = [Emu(w).twips for w in col_emu]
+        _apply_table_widths(tbl, usable, col_twips)
+        table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    if not fmt and col_twips is None:
+        return
+
+    table_border = fmt.get("tableBorder")
+    if table_border:
+        tbl_pr = tbl.tblPr
+        if tbl_pr is None:
+            tbl_pr = OxmlElement('w:tblPr')
+            tbl.append(tbl_pr)
+        borders = tbl_pr.find(qn('w:tblBorders'))
+        if borders is None:
+            borders = OxmlElement('w:tblBorders')
+            tbl_pr.append(borders)
+        _set_border_edges(borders, table_border, ("top", "bottom", "left", "right", "insideH", "insideV"))
+
+    header_cfg = fmt.get("header")
+    alt_cfg = fmt.get("alternate") if fmt.get("bandedRows") else None
+    body_cfg = fmt.get("cell") or fmt.get("body")
+    body_start = 1 if header_cfg else 0
+    for r_idx, tr in enumerate(tbl.tr_lst):
+        header_row = r_idx == 0 and header_cfg
+        banded_row = alt_cfg and r_idx % 2 == 1
+        body_row = body_cfg and r_idx >= body_start
+        for c_idx, tc in enumerate(tr.tc_lst):
+            if col_twips is not None and c_idx < len(col_twips):
+                tcW = tc.get_or_add_tcPr().get_or_add_tcW()
+                tcW.set(qn('w:type'), 'dxa')
+                tcW.set(qn('w:w'), str(col_twips[c_idx]))
+            if header_row:
+                _set_tc_shading(tc, header_cfg.get("fill"))
+                _set_tc_border(tc, header_cfg.get("border"))
+                _set_tc_vertical_align(tc, header_cfg.get("verticalAlign"))
+                _format_header_runs(tc, header_cfg)
+            elif banded_row:
+                _set_tc_shading(tc, alt_cfg.get("fill"))
+                _set_tc_vertical_align(tc, alt_cfg.get("verticalAlign"))
+            if body_row:
+                _set_tc_vertical_align(tc, body_cfg.get("verticalAlign"))
+
+def _add_paragraph(container, st, style_id):
+    """container.add_paragraph(style=st.name) 的快速版：直接写入已解析的 styleId，返回 CT_P。"""
+    p = container.add_paragraph()._p
+    if st is not None:
+        p.style = style_id
+    return p
+
+
+def _append_runs(p, runs, resolver: StyleResolver):
+    for r in runs:
+        if r.get("charStyleRef"):
+            cstyle, sid = resolver.ensure_style_id(r["charStyleRef"], "character")
+            append_run(p, r.get("text", ""), sid, with_rpr=cstyle is not None)
+        else:
+            append_run(p, r.get("text", ""))
+
 
 def _write_cell_blocks(cell, blocks, resolver: StyleResolver):
+    count("render.cells")
     _clear_cell(cell)
     for b in blocks or []:
         btype = b.get("type")
         if btype == "paragraph":
-            st = resolver.ensure_style(b.get("styleRef", "Normal"), "paragraph")
-            p = cell.add_paragraph(style=st.name if st else None)
-            for r in b.get("runs", []):
-                run = p.add_run(r.get("text", ""))
-                cstyle = resolver.ensure_style(r.get("charStyleRef"), "character") if r.get("charStyleRef") else None
-                if cstyle:
-                    run.style = cstyle
+            st, sid = resolver.ensure_style_id(b.get("styleRef", "Normal"), "paragraph")
+            p = _add_paragraph(cell, st, sid)
+            _append_runs(p, b.get("runs", []), resolver)
         elif btype == "heading":
             level = int(b.get("level", 1))
-            st = resolver.ensure_style(b.get("styleRef", f"Heading {level}"), "paragraph")
-            cell.add_paragraph(b.get("text", ""), style=st.name if st else None)
+            st, sid = resolver.ensure_style_id(b.get("styleRef", f"Heading {level}"), "paragraph")
+            p = _add_paragraph(cell, st, sid)
+            if b.get("text"):
+                append_run(p, b["text"])
         elif btype == "caption":
-            st = resolver.ensure_style(b.get("styleRef", "Caption"), "paragraph")
-            p = cell.add_paragraph(style=st.name if st else None)
-            p.add_run(b.get("text", ""))
+            st, sid = resolver.ensure_style_id(b.get("styleRef", "Caption"), "paragraph")
+            p = _add_paragraph(cell, st, sid)
+            append_run(p, b.get("text", ""))
+
+_CONTROL_BLOCKS = ("repeat", "conditional", "variable")
+_T = qn("w:t")
+
+
+def _substitutable(blocks) -> bool:
+    """模板 blocks 不含控制块/嵌套 useTemplate/行重复时，变量只影响 run 文本，可在生成的 w:t 上代入。"""
+    for b in blocks or []:
+        if "useTemplate" in b or b.get("type") in _CONTROL_BLOCKS:
+            return False
+        if b.get("type") == "table":
+            if isinstance(b.get("rows"), dict):
+                return False
+            for row in list(b.get("header") or []) + list(b.get("rows") or []):
+                if not all(_substitutable(cell.get("blocks")) for cell in row):
+                    return False
+    return True
+
+
+def _substituted_copies(elements, variables):
+    """深拷贝已编译元素并在 w:t 上代入变量；代入结果需要不同的 run 结构时返回 None。"""
+    copies = [deepcopy(el) for el in elements]
+    for el in copies:
+        for t in el.iter(_T):
+            text = t.text or ""
+            if "{" in text:
+                new = substitute_text(text, variables)
+                if new != text and not replace_t_text(t, new):
+                    return None
+    return copies
+
+
+def _write_page_template(doc: Document, blocks: list, variables: dict, resolver: StyleResolver,
+                         fail_on_unknown_style, table_defaults):
+    """
+    页面模板内容按（模板 blocks, 当前节 sectPr）编译一次，之后的调用直接深拷贝已生成的元素，
+    不再重复样式解析与元素构建：
+    - 普通模板按未代入变量的 blocks 编译，每次使用时在拷贝的 w:t 上代入变量，变量不同也能复用；
+      代入值为空或含换行/制表符（run 结构会变）时该次按展开后的 blocks 正常写入；
+    - 含 repeat/conditional/variable 的模板结构随变量变化，按展开后的 blocks 编译；
+    - 含嵌套 useTemplate 的模板会新建节，仍逐块写入。
+    """
+    static = _substitutable(blocks)
+    source = blocks if static else expand_blocks(blocks, variables)
+    if not static and any("useTemplate" in b for b in source):
+        write_blocks(doc, source, resolver, fail_on_unknown_style, table_defaults=table_defaults)
+        return
+    compiled = getattr(doc, "_compiled_page_templates", None)
+    if compiled is None:
+        compiled = doc._compiled_page_templates = {}
+    body = doc.element.body
+    key = (static, json.dumps(source, sort_keys=True, ensure_ascii=False, default=str), str(body.sectPr.xml))
+    elements = compiled.get(key)
+    if elements is None:
+        start = len(body) - 1  # 新内容插在末尾 sectPr 之前
+        write_blocks(doc, source, resolver, fail_on_unknown_style, table_defaults=table_defaults)
+        written = body[start:len(body) - 1]
+        count("render.page_templates.compiled")
+        if not static:
+            compiled[key] = [deepcopy(el) for el in written]
+            return
+        # 含占位符的原始结果只作为编译缓存，代入变量后再插入
+        for el in written:
+            body.remove(el)
+        elements = compiled[key] = written
+    else:
+        count("render.page_templates.reused")
+    copies = _substituted_copies(elements, variables) if static else [deepcopy(el) for el in elements]
+    if copies is None:
+        write_blocks(doc, expand_blocks(blocks, variables), resolver, fail_on_unknown_style,
+                     table_defaults=table_defaults)
+        return
+    sect = body.sectPr
+    for el in copies:
+        sect.addprevious(el)
+
 
 def write_blocks(
     doc: Document,
@@ -211,14 +321,15 @@ def write_blocks(
             # 新建节
             section = doc.add_section()
             apply_section_layout(section, tpl.get("layout"))
-            # 局部变量合并：已在 expand_document 合并到 b["variables"]，此处仅透传
-            # 渲染模板 blocks
-            write_blocks(
+            update_section_state(doc)
+            # 局部变量已在 expand_document 合并到 b["variables"]，由 _write_page_template 代入模板 blocks
+            _write_page_template(
                 doc,
                 tpl.get("blocks", []),
+                b.get("variables") or {},
                 resolver,
                 fail_on_unknown_style,
-                table_defaults=table_defaults,
+                table_defaults,
             )
             continue
 
@@ -236,46 +347,44 @@ def write_blocks(
 
         if btype in ("paragraph", "caption"):
             stname = b.get("styleRef", "Normal")
-            st = resolver.ensure_style(stname, "paragraph")
+            st, sid = resolver.ensure_style_id(stname, "paragraph")
             if fail_on_unknown_style and st is None:
                 raise ValueError(f"未知样式（段落）：{stname}")
-            p = doc.add_paragraph(style=st.name if st else None)
+            p = _add_paragraph(doc, st, sid)
+            count("render.paragraphs")
             if b.get("pageBreakBefore"):
-                p.paragraph_format.page_break_before = True
-            for r in b.get("runs", []):
-                run = p.add_run(r.get("text", ""))
-                cstyle = resolver.ensure_style(r.get("charStyleRef"), "character") if r.get("charStyleRef") else None
-                if cstyle:
-                    run.style = cstyle
+                p.get_or_add_pPr().pageBreakBefore_val = True
+            _append_runs(p, b.get("runs", []), resolver)
             if btype == "caption" and not b.get("runs"):
-                p.add_run(b.get("text", ""))
+                append_run(p, b.get("text", ""))
             continue
 
         if btype == "heading":
             level = int(b.get("level", 1))
             stname = b.get("styleRef", f"Heading {level}")
-            st = resolver.ensure_style(stname, "paragraph")
+            st, sid = resolver.ensure_style_id(stname, "paragraph")
             if fail_on_unknown_style and st is None:
                 raise ValueError(f"未知样式（标题）：{stname}")
-            doc.add_paragraph(b.get("text", ""), style=st.name if st else None)
+            p = _add_paragraph(doc, st, sid)
+            if b.get("text"):
+                append_run(p, b["text"])
+            count("render.paragraphs")
             continue
 
         if btype == "list":
             ordered = bool(b.get("ordered", False))
             stname = b.get("styleRef", "Normal")
-            st = resolver.ensure_style(stname, "paragraph")
+            st, sid = resolver.ensure_style_id(stname, "paragraph")
             if fail_on_unknown_style and st is None:
                 raise ValueError(f"未知样式（列表段落）：{stname}")
             for it in b.get("items", []):
-                p = doc.add_paragraph(style=st.name if st else None)
-                for r in it.get("runs", []):
-                    run = p.add_run(r.get("text", ""))
-                    cstyle = resolver.ensure_style(r.get("charStyleRef"), "character") if r.get("charStyleRef") else None
-                    if cstyle:
-                        run.style = cstyle
+                p = _add_paragraph(doc, st, sid)
+                count("render.paragraphs")
+                _append_runs(p, it.get("runs", []), resolver)
             continue
 
         if btype == "table":
+            count("render.tables")
             defaults = table_defaults or {}
             columns = b.get("columns") or defaults.get("columns", [])
             if columns:
@@ -291,24 +400,34 @@ def write_blocks(
             total_rows = len(header) + len(rows)
             if total_rows == 0:
                 total_rows = 1
-            table = doc.add_table(rows=total_rows, cols=ncols)
-            style_ref = b.get("styleRef") or defaults.get("styleRef")
-            tstyle = resolver.ensure_style(style_ref, "table") if style_ref else None
-            if tstyle:
-                table.style = tstyle
-            r_idx = 0
-            for hrow in header:
-                for c_idx, cell in enumerate(hrow):
-                    _write_cell_blocks(table.cell(r_idx, c_idx), cell.get("blocks", []), resolver)
-                r_idx += 1
-            for drow in rows:
-                for c_idx, cell in enumerate(drow):
-                    _write_cell_blocks(table.cell(r_idx, c_idx), cell.get("blocks", []), resolver)
-                r_idx += 1
-            current_section = doc.sections[-1] if doc.sections else None
-            _set_table_widths(table, columns, current_section)
-            table_format = deep_merge(defaults.get("format", {}), b.get("format", {})) if defaults else b.get("format")
-            _apply_table_format(table, table_format)
+            usable = current_usable_width(doc)
+            with span("render.table.build"):
+                if usable is None:
+                    # 节缺少页宽/页边距：交给 python-docx 按默认值计算表格宽度
+                    table = doc.add_table(rows=total_rows, cols=ncols)
+                else:
+                    # 与 doc.add_table 相同，但直接使用已记录的可用宽度，不再每张表遍历 doc.sections
+                    table = doc._body.add_table(total_rows, ncols, Twips(usable))
+                    table._tbl.tblStyle_val = None
+                style_ref = b.get("styleRef") or defaults.get("styleRef")
+                tstyle, tstyle_id = resolver.ensure_style_id(style_ref, "table") if style_ref else (None, None)
+                if tstyle:
+                    # 样式 ID 已缓存；table.style 赋值每次都会遍历全部样式查找默认表格样式
+                    table._tbl.tblStyle_val = tstyle_id
+                # table.cell() 每次调用都会重建整张单元格网格，这里只取一次（下标换算与 table.cell 相同）
+                grid = table._cells
+                r_idx = 0
+                for hrow in header:
+                    for c_idx, cell in enumerate(hrow):
+                        _write_cell_blocks(grid[r_idx * ncols + c_idx], cell.get("blocks", []), resolver)
+                    r_idx += 1
+                for drow in rows:
+                    for c_idx, cell in enumerate(drow):
+                        _write_cell_blocks(grid[r_idx * ncols + c_idx], cell.get("blocks", []), resolver)
+                    r_idx += 1
+            with span("render.table.format"):
+                table_format = MergedView(defaults.get("format"), b.get("format")) if defaults else b.get("format")
+                _apply_table_format(table, table_format, columns_cfg=columns, usable_twips=usable)
             continue
 
         # 其它类型（figure 等）可按需扩展
@@ -323,33 +442,33 @@ def _clear_document_body(doc: Document):
 
 # src/docx_stylekit/writer/docx_writer.py （续）
 
-def render_to_docx(template_json: dict,
-                   template_docx_path: Optional[str] = None,
-                   styles_yaml: dict = None,
-                   output_path: str = "output.docx",
-                   prefer_json_styles: bool = False,
-                   fail_on_unknown_style: bool = True,
-                   clear_existing_content: bool = True):
+def open_render_document(doc_cfg: dict,
+                         template_docx_path: Optional[str] = None,
+                         styles_yaml: dict = None,
+                         prefer_json_styles: bool = False,
+                         clear_existing_content: bool = True):
     """
-    template_json: expand_document() 的结果（已展开变量/循环/条件；保留 useTemplate）
-    template_docx_path: 样式/编号/页眉页脚基础骨架。可为空（使用内置空白文档）
-    styles_yaml: 合并后的 YAML（dict）。如传入路径字符串则会自动读取。
+    打开渲染用文档并完成写入正文前的准备：模板/空白骨架、页面模板与 TOC 配置、第一节 pageSetup、内联样式预加载。
+    返回 (doc, resolver)。分片渲染的各工作进程用同样的方式打开文档，保证样式与节设置一致。
     """
-    doc_cfg = template_json.get("doc", {})
     # 读取 JSON 内联样式 / 页面模板 / TOC 级别
     styles_inline = doc_cfg.get("stylesInline", {}) or {}
     page_templates = doc_cfg.get("pageTemplates", {}) or {}
     toc_levels = doc_cfg.get("toc", {}).get("levels", [1,3])
 
     # 打开模板 DOCX（若未提供，则使用空白文档）
-    if template_docx_path:
-        doc = Document(template_docx_path)
-        if clear_existing_content:
-            _clear_document_body(doc)
-    else:
-        doc = Document()
+    with span("render.open_template"):
+        if template_docx_path:
+            doc = Document(template_docx_path)
+            if clear_existing_content:
+                _clear_document_body(doc)
+        else:
+            # 无模板：复用已缓存的样式骨架（空白文档 + 预加载后的 styles.xml）
+            skeleton = skeleton_key(styles_inline, prefer_json_styles)
+            doc, preloaded = open_default_document(skeleton)
     # 挂载配置供 writer 使用
     doc._page_templates_cfg = page_templates
+    doc._compiled_page_templates = {}
     doc._toc_levels = toc_levels
 
     # 全局 pageSetup（第一节）
@@ -364,6 +483,7 @@ def render_to_docx(template_json: dict,
             "startAt": ps.get("pageNumbering", {}).get("startAt"),
         }
         apply_section_layout(first, layout)
+    update_section_state(doc)
 
     # YAML 样式库：此实现依赖模板 DOCX 自带样式；YAML 用于校验/提示（如需从 YAML 动态创建，可在此扩展）
     if isinstance(styles_yaml, str) and os.path.exists(styles_yaml):
@@ -373,41 +493,117 @@ def render_to_docx(template_json: dict,
     # 构建解析器（支持 JSON 动态新增样式 & 受控覆盖）
     resolver = StyleResolver(doc, styles_inline, prefer_json_styles=prefer_json_styles)
     # 预加载所有内联样式，确保字体/颜色覆盖立即生效
-    for name, style_def in styles_inline.items():
-        stype = style_def.get("type")
-        if stype in ("paragraph", "character", "table"):
-            try:
-                resolver.ensure_style(name, stype)
-            except ValueError:
-                # table 样式在文档缺失时跳过，由后续调用按需创建
-                continue
+    # （骨架已包含预加载结果；之后按需解析时 $override 的重复应用不改变样式）
+    if template_docx_path or not preloaded:
+        with span("render.preload_styles"):
+            for name, style_def in styles_inline.items():
+                stype = style_def.get("type")
+                if stype in ("paragraph", "character", "table"):
+                    try:
+                        resolver.ensure_style(name, stype)
+                    except ValueError:
+                        # table 样式在文档缺失时跳过，由后续调用按需创建
+                        continue
+        if not template_docx_path:
+            remember_default_document(skeleton, doc)
+
+    return doc, resolver
+
+
+def render_to_docx(template_json: dict,
+                   template_docx_path: Optional[str] = None,
+                   styles_yaml: dict = None,
+                   output_path: str = "output.docx",
+                   prefer_json_styles: bool = False,
+                   fail_on_unknown_style: bool = True,
+                   clear_existing_content: bool = True,
+                   blocks=None,
+                   fragment_cache=None,
+                   workers: Optional[int] = None,
+                   compress_level: Optional[int] = None,
+                   store_media: bool = False,
+                   deterministic: bool = False,
+                   prune: bool = False):
+    """
+    template_json: expand_document() 的结果（已展开变量/循环/条件；保留 useTemplate）
+    blocks: 可选的块迭代器（如流式 Markdown 转换结果），提供时替代 doc.blocks，逐块写入
+    fragment_cache: 可选的 FragmentCache，提供时按块复用上次渲染的正文片段（增量渲染）
+    workers: >1 时分片并行渲染正文（见 writer/sharded.py），与 fragment_cache 互斥
+    output_path: 输出路径，或可写的二进制流（不可 seek 时以流式 ZIP 写出，见 io/stream_zip.py）
+    compress_level / store_media: 保存时的压缩级别（0 仅存储，1–9 deflate）与媒体仅存储，见 io/package_zip.py
+    deterministic: 可复现输出（固定时间戳/核心属性、成员排序），相同输入得到逐字节相同的 DOCX
+    prune: 保存前删掉正文用不到的样式、编号定义与部件（见 writer/prune.py）
+    template_docx_path: 样式/编号/页眉页脚基础骨架。可为空（使用内置空白文档）
+    styles_yaml: 合并后的 YAML（dict）。如传入路径字符串则会自动读取。
+    """
+    doc_cfg = template_json.get("doc", {})
+    if fragment_cache is not None and workers and workers > 1:
+        raise ValueError("增量渲染（fragment_cache）不支持分片并行（workers > 1）")
+    doc, resolver = open_render_document(
+        doc_cfg,
+        template_docx_path,
+        styles_yaml,
+        prefer_json_styles=prefer_json_styles,
+        clear_existing_content=clear_existing_content,
+    )
 
     # TOC（顶层 doc.toc.required 也可以在 blocks 里单独放 type:"toc" 控制位置）
     # 若需要固定在文档开头：可以在此插入；这里尊重 blocks 中的显式位置。
 
     # 内容写入
     table_defaults = doc_cfg.get("renderDefaults", {}).get("table", {})
-    write_blocks(
-        doc,
-        doc_cfg.get("blocks", []),
-        resolver,
-        fail_on_unknown_style=fail_on_unknown_style,
-        table_defaults=table_defaults,
-    )
+    with span("render.write_blocks"):
+        if fragment_cache is not None:
+            context_key = render_context_key(
+                doc_cfg,
+                template_docx_path,
+                prefer_json_styles=prefer_json_styles,
+                fail_on_unknown_style=fail_on_unknown_style,
+            )
+            write_blocks_incremental(
+                doc,
+                doc_cfg.get("blocks", []) if blocks is None else blocks,
+                resolver,
+                fragment_cache,
+                context_key,
+                fail_on_unknown_style=fail_on_unknown_style,
+                table_defaults=table_defaults,
+            )
+        elif workers and workers > 1:
+            write_blocks_sharded(
+                doc,
+                doc_cfg.get("blocks", []) if blocks is None else blocks,
+                resolver,
+                doc_cfg,
+                template_docx_path=template_docx_path,
+                prefer_json_styles=prefer_json_styles,
+                fail_on_unknown_style=fail_on_unknown_style,
+                clear_existing_content=clear_existing_content,
+                workers=workers,
+            )
+        else:
+            write_blocks(
+                doc,
+                doc_cfg.get("blocks", []) if blocks is None else blocks,
+                resolver,
+                fail_on_unknown_style=fail_on_unknown_style,
+                table_defaults=table_defaults,
+            )
 
     # 页眉页脚页码（若 JSON 指定 pageNumber 项，模板未内置时可插入）
     hf = doc_cfg.get("headersFooters", {})
     if "footer" in hf:
-        for comp in hf["footer"]:
-            if comp.get("type") == "pageNumber":
-                for section in doc.sections:
-                    fp = section.footer.paragraphs[0] if section.footer.paragraphs else section.footer.add_paragraph()
-                    style_ref = comp.get("styleRef")
-                    if style_ref:
-                        style_obj = resolver.ensure_style(style_ref, "paragraph")
-                        if style_obj:
-                            fp.style = style_obj
-                    if not fp.text.strip():
-                        add_page_number_field(fp, align=comp.get("align", "center"))
-
-    doc.save(output_path)
+        page_numbers = [comp for comp in hf["footer"] if comp.get("type") == "pageNumber"]
+        if page_numbers:
+            with span("render.footer"):
+                styles = [resolver.ensure_style(comp["styleRef"], "paragraph") if comp.get("styleRef") else None
+                          for comp in page_numbers]
+                add_page_number_footers(doc, page_numbers, styles)
+
+    if prune:
+        with span("render.prune"):
+            prune_document(doc)
+
+    with span("render.save"):
+        save_docx(doc, output_path, compress_level=compress_level, store_media=store_media,
+                  deterministic=deterministic)
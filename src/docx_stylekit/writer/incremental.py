@@ -0,0 +1,204 @@
+"""
+增量渲染：按顶层块缓存生成的正文 XML 片段，再次渲染时只重建内容有变化的块。
+- 指纹 = sha256(渲染上下文, 块 JSON, 块开始时正文末尾 sectPr)；useTemplate 块（新建节 + 模板内容）作为一个整体；
+  sectPr 决定了表格宽度、分节复制等，纳入指纹后上游版式变化会让下游片段自然失效；
+- 缓存为旁路 JSON 文件（默认 <输出>.fragments.json），保存时只保留本次用到的片段；
+- 复用片段时回放该片段用到的样式（ensure_style），保证按需创建/覆盖的样式与完整渲染一致。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from ..utils.profiling import count
+from .section_utils import update_section_state
+
+FRAGMENT_FORMAT = 1
+_WRAPPER_TAG = qn("w:body")
+_WRAPPER_CLOSE = "</w:body>"
+
+
+def _canonical(obj: Any) -> str:
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def render_context_key(doc_cfg: Dict[str, Any], template_docx_path=None, **flags) -> str:
+    """渲染上下文：除 blocks 外的模板配置、模板 DOCX 内容与渲染开关；任一变化则全部片段失效。"""
+    from .. import __version__
+
+    h = hashlib.sha256()
+    h.update(f"{FRAGMENT_FORMAT}:{__version__}:".encode("utf-8"))
+    h.update(_canonical({k: v for k, v in doc_cfg.items() if k != "blocks"}).encode("utf-8"))
+    h.update(_canonical(flags).encode("utf-8"))
+    if template_docx_path:
+        with open(template_docx_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+class FragmentCache:
+    """旁路片段缓存：{"format": 1, "fragments": {指纹: {"xml", "sectPr", "styles"}}}。"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.used: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("format") == FRAGMENT_FORMAT and isinstance(data.get("fragments"), dict):
+            self.entries = data["fragments"]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used[key] = entry
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        self.entries[key] = entry
+        self.used[key] = entry
+
+    def save(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"format": FRAGMENT_FORMAT, "fragments": self.used}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        return self.path
+
+
+class _RecordingResolver:
+    """包装 StyleResolver，按首次出现顺序记录片段内调用过的 (样式名, 类型)。"""
+
+    def __init__(self, resolver):
+        self.resolver = resolver
+        self.calls = {}
+
+    def ensure_style(self, name, expected_type):
+        self.calls.setdefault((name, expected_type), None)
+        return self.resolver.ensure_style(name, expected_type)
+
+    def ensure_style_id(self, name, expected_type):
+        self.calls.setdefault((name, expected_type), None)
+        return self.resolver.ensure_style_id(name, expected_type)
+
+
+@contextmanager
+def _capture_body(body):
+    """捕获 with 块内追加到正文（末尾 sectPr 之前）的元素，退出时写入产出的列表。"""
+    captured: List[Any] = []
+    before = len(body)
+    yield captured
+    added = len(body) - before
+    if added <= 0:
+        return
+    end = len(body) - 1 if body[-1].tag == qn("w:sectPr") else len(body)
+    captured.extend(body[end - added:end])
+
+
+def _serialize(elements, nsmap) -> str:
+    # 暂时移入带文档根命名空间的包装元素，命名空间只声明一次；序列化后放回原位
+    if not elements:
+        return ""
+    anchor = elements[-1].getnext()
+    parent = elements[0].getparent()
+    wrapper = etree.Element(_WRAPPER_TAG, nsmap=nsmap)
+    for el in elements:
+        wrapper.append(el)
+    text = etree.tostring(wrapper, encoding="unicode")
+    for el in list(wrapper):
+        if anchor is not None:
+            anchor.addprevious(el)
+        else:
+            parent.append(el)
+    return text[text.index(">") + 1:-len(_WRAPPER_CLOSE)]
+
+
+def _wrapper_open(nsmap) -> str:
+    empty = etree.tostring(etree.Element(_WRAPPER_TAG, nsmap=nsmap), encoding="unicode")
+    return empty[:-2] + ">"
+
+
+def _splice(body, wrapper_open: str, inner: str):
+    if not inner:
+        return
+    fragment = parse_xml(wrapper_open + inner + _WRAPPER_CLOSE)
+    sect = body.sectPr
+    for el in list(fragment):
+        if sect is not None:
+            sect.addprevious(el)
+        else:
+            body.append(el)
+
+
+def _sect_xml(body) -> str:
+    sect = body.sectPr
+    return etree.tostring(sect, encoding="unicode") if sect is not None else ""
+
+
+def write_blocks_incremental(
+    doc,
+    blocks: Iterable[Dict[str, Any]],
+    resolver,
+    cache: FragmentCache,
+    context_key: str,
+    *,
+    fail_on_unknown_style: bool = True,
+    table_defaults: Optional[dict] = None,
+):
+    """与 write_blocks 输出一致；命中缓存的块直接拼接片段，其余块正常写入并记录片段。"""
+    from .docx_writer import write_blocks
+
+    body = doc.element.body
+    nsmap = doc.element.nsmap
+    wrapper_open = _wrapper_open(nsmap)
+    replayed = set()
+    for b in blocks:
+        sect_before = _sect_xml(body)
+        key = hashlib.sha256(
+            "\0".join((context_key, _canonical(b), sect_before)).encode("utf-8")
+        ).hexdigest()
+        entry = cache.get(key)
+        if entry is not None:
+            _splice(body, wrapper_open, entry["xml"])
+            if entry["sectPr"] is not None:
+                body.replace(body.sectPr, parse_xml(entry["sectPr"]))
+                update_section_state(doc)
+            for name, stype in entry["styles"]:
+                if (name, stype) not in replayed:
+                    replayed.add((name, stype))
+                    resolver.ensure_style(name, stype)
+            count("render.fragments.reused")
+            continue
+
+        recorder = _RecordingResolver(resolver)
+        with _capture_body(body) as added:
+            write_blocks(doc, [b], recorder, fail_on_unknown_style, table_defaults=table_defaults)
+        sect_after = _sect_xml(body)
+        cache.put(key, {
+            "xml": _serialize(added, nsmap),
+            "sectPr": sect_after if sect_after != sect_before else None,
+            "styles": [list(call) for call in recorder.calls],
+        })
+        replayed.update(recorder.calls)
+        count("render.fragments.built")
+
+
+__all__ = ["FragmentCache", "render_context_key", "write_blocks_incremental"]
@@ -0,0 +1,196 @@
+"""
+保存前的精简：删掉模板带来、但正文用不到的样式、编号定义与部件，缩小输出包体。
+- 样式：正文/页眉页脚/脚注等部件引用的 pStyle/rStyle/tblStyle，加上 basedOn/link 闭包；
+  默认样式（w:default="1"）始终保留，含 TOC 域时保留目录样式；stylesWithEffects.xml 同步删减；
+- 编号：部件与保留样式使用的 numId 及其 abstractNum（numStyleLink 指向的样式一并保留，直到不再变化）；
+- 部件：显式引用类关系（图片、页眉页脚、超链接、嵌入对象…）在所属部件 XML 中找不到 rId 的删除，
+  随之不可达的部件不再写出。
+只改动样式/编号部件与关系表，正文 XML 不变。
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Set
+
+from lxml import etree
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.oxml import serialize_part_xml
+from docx.opc.part import XmlPart
+from docx.oxml.ns import qn
+
+from ..utils.profiling import count, span
+
+# 通过 XML 中的 r:id/r:embed 等属性显式引用的关系；其余（styles、numbering、settings、theme…）为隐式关系，始终保留
+EXPLICIT_RELTYPES = frozenset({
+    RT.IMAGE, RT.HEADER, RT.FOOTER, RT.HYPERLINK, RT.OLE_OBJECT, RT.PACKAGE, RT.CHART,
+    RT.DIAGRAM_DATA, RT.DIAGRAM_LAYOUT, RT.DIAGRAM_QUICK_STYLE, RT.DIAGRAM_COLORS, RT.AUDIO, RT.VIDEO,
+})
+# Word 2010 兼容用的样式副本（python-docx 按普通部件加载），与 styles.xml 同步删减
+RT_STYLES_WITH_EFFECTS = "http://schemas.microsoft.com/office/2007/relationships/stylesWithEffects"
+_STYLE_REF_TAGS = tuple(qn(f"w:{t}") for t in ("pStyle", "rStyle", "tblStyle", "clickAndTypeStyle"))
+_TOC_STYLE_PREFIXES = ("toc ", "toc heading", "table of figures", "hyperlink")
+_W_VAL = qn("w:val")
+_W_STYLE_ID = qn("w:styleId")
+_W_NUM_ID = qn("w:numId")
+_W_ABSTRACT_NUM_ID = qn("w:abstractNumId")
+
+
+def _related(part, reltype):
+    try:
+        return part.part_related_by(reltype)
+    except KeyError:
+        return None
+
+
+def _content_elements(doc, skip) -> Iterable:
+    for part in doc.part.package.iter_parts():
+        if isinstance(part, XmlPart) and part not in skip:
+            yield part.element
+
+
+def _vals(elements, tags) -> Set[str]:
+    out: Set[str] = set()
+    for root in elements:
+        for el in root.iter(*tags):
+            val = el.get(_W_VAL)
+            if val:
+                out.add(val)
+    return out
+
+
+def _has_toc_field(elements) -> bool:
+    for root in elements:
+        for el in root.iter(qn("w:instrText")):
+            if (el.text or "").strip().upper().startswith("TOC"):
+                return True
+        for el in root.iter(qn("w:fldSimple")):
+            if el.get(qn("w:instr"), "").strip().upper().startswith("TOC"):
+                return True
+    return False
+
+
+def _style_closure(styles_by_id, seeds: Iterable[str], kept: Set[str]) -> None:
+    stack = [s for s in seeds if s in styles_by_id and s not in kept]
+    while stack:
+        sid = stack.pop()
+        if sid in kept:
+            continue
+        kept.add(sid)
+        style = styles_by_id[sid]
+        for tag in ("w:basedOn", "w:link"):
+            ref = style.find(qn(tag))
+            if ref is not None and ref.get(_W_VAL) in styles_by_id:
+                stack.append(ref.get(_W_VAL))
+
+
+def _style_num_ids(style) -> Set[str]:
+    return {el.get(_W_VAL) for el in style.iter(qn("w:numId")) if el.get(_W_VAL)}
+
+
+def _prune_styles_with_effects(part, kept: Set[str]) -> None:
+    root = etree.fromstring(part.blob)
+    removed = False
+    for style in list(root.iterchildren(qn("w:style"))):
+        if style.get(_W_STYLE_ID) not in kept:
+            root.remove(style)
+            removed = True
+    if removed:
+        part._blob = serialize_part_xml(root)
+
+
+def prune_document(doc) -> Dict[str, int]:
+    """
+    就地精简 doc，返回 {"styles_removed", "numbering_removed", "parts_removed", "bytes_saved"}；
+    bytes_saved 为样式/编号部件与被删部件的未压缩字节数之差。
+    """
+    package = doc.part.package
+    styles_part = _related(doc.part, RT.STYLES)
+    numbering_part = _related(doc.part, RT.NUMBERING)
+    effects_part = _related(doc.part, RT_STYLES_WITH_EFFECTS)
+    parts_before = list(package.iter_parts())
+    sizes_before = {p: len(p.blob) for p in (styles_part, numbering_part, effects_part) if p is not None}
+    content = list(_content_elements(doc, {styles_part, numbering_part}))
+
+    stats = {"styles_removed": 0, "numbering_removed": 0, "parts_removed": 0, "bytes_saved": 0}
+    kept_styles: Set[str] = set()
+    styles_by_id = {}
+    if styles_part is not None:
+        with span("prune.styles"):
+            styles_root = styles_part.element
+            styles_by_id = {s.get(_W_STYLE_ID): s for s in styles_root.iterchildren(qn("w:style"))}
+            seeds = _vals(content, _STYLE_REF_TAGS)
+            seeds |= {sid for sid, s in styles_by_id.items() if s.get(qn("w:default")) in ("1", "true", "on")}
+            if _has_toc_field(content):
+                for sid, s in styles_by_id.items():
+                    name = s.find(qn("w:name"))
+                    if name is not None and name.get(_W_VAL, "").lower().startswith(_TOC_STYLE_PREFIXES):
+                        seeds.add(sid)
+            _style_closure(styles_by_id, seeds, kept_styles)
+
+    with span("prune.numbering"):
+        used_num_ids = _vals(content, (_W_NUM_ID,))
+        nums, abstracts = {}, {}
+        if numbering_part is not None:
+            numbering_root = numbering_part.element
+            nums = {n.get(_W_NUM_ID): n for n in numbering_root.iterchildren(qn("w:num"))}
+            abstracts = {a.get(_W_ABSTRACT_NUM_ID): a for a in numbering_root.iterchildren(qn("w:abstractNum"))}
+        kept_abstracts: Set[str] = set()
+        while True:
+            # 保留的样式可能带编号，编号的 numStyleLink/lvl pStyle 又会引用样式，循环到不再变化
+            for sid in kept_styles:
+                used_num_ids |= _style_num_ids(styles_by_id[sid])
+            linked: Set[str] = set()
+            for num_id in used_num_ids:
+                num = nums.get(num_id)
+                ref = num.find(_W_ABSTRACT_NUM_ID) if num is not None else None
+                if ref is not None and ref.get(_W_VAL) in abstracts:
+                    kept_abstracts.add(ref.get(_W_VAL))
+            for aid in kept_abstracts:
+                linked |= _vals([abstracts[aid]], (qn("w:numStyleLink"), qn("w:styleLink"), qn("w:pStyle")))
+            before = len(kept_styles)
+            _style_closure(styles_by_id, linked, kept_styles)
+            if len(kept_styles) == before:
+                break
+        for num_id, num in nums.items():
+            if num_id not in used_num_ids:
+                num.getparent().remove(num)
+                stats["numbering_removed"] += 1
+        for aid, abstract in abstracts.items():
+            if aid not in kept_abstracts:
+                abstract.getparent().remove(abstract)
+                stats["numbering_removed"] += 1
+
+    for sid, style in styles_by_id.items():
+        if sid in kept_styles:
+            nxt = style.find(qn("w:next"))
+            if nxt is not None and nxt.get(_W_VAL) not in kept_styles:
+                style.remove(nxt)
+        else:
+            style.getparent().remove(style)
+            stats["styles_removed"] += 1
+    if effects_part is not None and styles_part is not None and not isinstance(effects_part, XmlPart):
+        _prune_styles_with_effects(effects_part, kept_styles)
+
+    with span("prune.rels"):
+        for part in parts_before:
+            if not isinstance(part, XmlPart):
+                continue
+            rel_ids = [rId for rId, rel in part.rels.items() if rel.reltype in EXPLICIT_RELTYPES]
+            if not rel_ids:
+                continue
+            referenced = {v for el in part.element.iter() for v in el.attrib.values()}
+            for rId in rel_ids:
+                if rId not in referenced:
+                    del part.rels[rId]
+
+    parts_after = set(package.iter_parts())
+    removed = [p for p in parts_before if p not in parts_after]
+    stats["parts_removed"] = len(removed)
+    stats["bytes_saved"] = sum(len(p.blob) for p in removed) + sum(
+        size - len(part.blob) for part, size in sizes_before.items()
+    )
+    for name, n in stats.items():
+        count(f"prune.{name}", n)
+    return stats
+
+
+__all__ = ["EXPLICIT_RELTYPES", "prune_document"]
@@ -0,0 +1,72 @@
+# src/docx_stylekit/writer/run_builder.py
+"""
+直接构建 w:r 元素：跳过 python-docx 的 Run 代理与按名称查找样式，调用方传入已解析的 styleId。
+输出与 p.add_run(text) + run.style = ... 逐字节一致：
+- 文本按 \\t → w:tab、\\r/\\n → w:br 切分，其余连续字符写入同一个 w:t；
+- w:t 有首尾空白时加 xml:space="preserve"。
+"""
+import re
+
+from docx.oxml.ns import qn
+from lxml import etree
+
+_R = qn("w:r")
+_RPR = qn("w:rPr")
+_RSTYLE = qn("w:rStyle")
+_T = qn("w:t")
+_TAB = qn("w:tab")
+_BR = qn("w:br")
+_VAL = qn("w:val")
+_XML_SPACE = qn("xml:space")
+_SPECIAL = re.compile(r"[\t\r\n]")
+
+
+def _add_t(r, text: str):
+    t = etree.SubElement(r, _T)
+    t.text = text
+    if len(text.strip()) < len(text):
+        t.set(_XML_SPACE, "preserve")
+
+
+def append_run(p, text=None, style_id=None, *, with_rpr: bool = False):
+    """
+    在段落元素 p（CT_P）末尾追加一个 run 并返回。
+    style_id 为字符样式 id；with_rpr=True 时即使无 styleId 也写出空 w:rPr（对应给 run 赋默认字符样式）。
+    """
+    r = etree.SubElement(p, _R)
+    if style_id:
+        etree.SubElement(etree.SubElement(r, _RPR), _RSTYLE).set(_VAL, style_id)
+    elif with_rpr:
+        etree.SubElement(r, _RPR)
+    if not text:
+        return r
+    if _SPECIAL.search(text) is None:
+        _add_t(r, text)
+        return r
+    pos = 0
+    for m in _SPECIAL.finditer(text):
+        if m.start() > pos:
+            _add_t(r, text[pos:m.start()])
+        etree.SubElement(r, _TAB if m.group() == "\t" else _BR)
+        pos = m.end()
+    if pos < len(text):
+        _add_t(r, text[pos:])
+    return r
+
+
+def replace_t_text(t, text: str) -> bool:
+    """
+    把已有 w:t 的文本换成 text（xml:space 规则同 append_run）。
+    text 为空或含 \\t/\\r/\\n 时 append_run 会生成不同的元素结构，此时不修改并返回 False。
+    """
+    if not text or _SPECIAL.search(text) is not None:
+        return False
+    t.text = text
+    if len(text.strip()) < len(text):
+        t.set(_XML_SPACE, "preserve")
+    else:
+        t.attrib.pop(_XML_SPACE, None)
+    return True
+
+
+__all__ = ["append_run", "replace_t_text"]
@@ -1,7 +1,14 @@
 # src/docx_stylekit/writer/section_utils.py
+from collections import Counter
+
+from docx.enum.section import WD_HEADER_FOOTER
+from docx.opc.oxml import serialize_part_xml
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
-from docx.shared import Cm
+from docx.section import Section
+from docx.shared import Cm, Emu
+
+from ..utils.profiling import count
 
 def apply_section_layout(section, layout: dict):
     if not layout:
@@ -46,6 +53,25 @@ def apply_section_layout(section, layout: dict):
             section._sectPr.append(v)
         v.set(qn('w:val'), layout["verticalAlign"])
 
+def usable_width_twips(sect_pr):
+    """页面宽度减左右页边距（twips）；缺少 pgSz/pgMar 时返回 None。"""
+    try:
+        return Emu(sect_pr.page_width - sect_pr.left_margin - sect_pr.right_margin).twips
+    except TypeError:
+        return None
+
+
+def update_section_state(doc):
+    """正文末尾 sectPr（当前节）的版式变化后调用：记录可用宽度，表格列宽直接读取，不再每张表遍历 doc.sections。"""
+    doc._usable_width_twips = usable_width_twips(doc.element.body.sectPr)
+
+
+def current_usable_width(doc):
+    if not hasattr(doc, "_usable_width_twips"):
+        update_section_state(doc)
+    return doc._usable_width_twips
+
+
 def add_page_number_field(paragraph, align="center"):
     # 设置段落对齐
     align_map = {"left":0, "center":1, "right":2}
@@ -59,6 +85,67 @@ def add_page_number_field(paragraph, align="center"):
     fld.append(r)
     paragraph._p.append(fld)
 
+def _has_page_field(p) -> bool:
+    for fld in p.iter(qn('w:fldSimple')):
+        if fld.get(qn('w:instr'), '').split()[:1] == ['PAGE']:
+            return True
+    return any((t.text or '').split()[:1] == ['PAGE'] for t in p.iter(qn('w:instrText')))
+
+
+def _fill_page_number(footer, components, styles):
+    for comp, style_obj in zip(components, styles):
+        fp = footer.paragraphs[0] if footer.paragraphs else footer.add_paragraph()
+        if style_obj:
+            fp.style = style_obj
+        if not fp.text.strip() and not _has_page_field(fp._p):
+            add_page_number_field(fp, align=comp.get("align", "center"))
+
+
+def _footer_key(part):
+    # 页脚内容 + 其关系（图片等）目标，相同才可链接到上一节
+    rels = sorted((rId, rel.reltype, rel.target_ref) for rId, rel in part.rels.items())
+    return serialize_part_xml(part.element), tuple(rels)
+
+
+def add_page_number_footers(doc, components, styles):
+    """
+    按 pageNumber 组件设置各节主页脚（styles 为各组件已解析的段落样式，可为 None）。
+    每个页脚部件只填一次；内容与上一节相同的节去掉自己的 footerReference、链接到上一节，
+    未定义页脚的节本就沿用上一节，因此节再多也只保留一个页脚部件。
+    """
+    document_part = doc.part
+    sect_prs = doc.element.sectPr_lst
+    if not sect_prs:
+        return
+    if sect_prs[0].get_footerReference(WD_HEADER_FOOTER.PRIMARY) is None:
+        # 首节没有页脚时新建（与原先逐节访问 section.footer 的效果一致）
+        Section(sect_prs[0], document_part).footer.is_linked_to_previous = False
+    refs = Counter()
+    for sect_pr in sect_prs:
+        ref = sect_pr.get_footerReference(WD_HEADER_FOOTER.PRIMARY)
+        if ref is not None:
+            refs[ref.rId] += 1
+    keys = {}
+    prev_key = None
+    for sect_pr in sect_prs:
+        ref = sect_pr.get_footerReference(WD_HEADER_FOOTER.PRIMARY)
+        if ref is None:
+            continue
+        rId = ref.rId
+        footer_part = document_part.related_parts[rId]
+        key = keys.get(footer_part)
+        if key is None:
+            _fill_page_number(Section(sect_pr, document_part).footer, components, styles)
+            key = keys[footer_part] = _footer_key(footer_part)
+        if key == prev_key:
+            sect_pr.remove(ref)
+            refs[rId] -= 1
+            if not refs[rId]:
+                del document_part.rels[rId]
+            count("render.footer.linked")
+        prev_key = key
+
+
 def add_toc_field(paragraph, levels=(1,3)):
     start = min(levels) if isinstance(levels, (list,tuple)) and levels else 1
     end = max(levels) if isinstance(levels, (list,tuple)) and levels else 3
@@ -0,0 +1,139 @@
+"""
+分片并行渲染：把展开后的顶层 blocks 切成若干分片，在进程池中分别写出正文 XML，再按顺序拼回同一份 document.xml。
+- 各工作进程用 open_render_document 以相同方式打开文档（同一模板、pageSetup、内联样式预加载），样式天然一致；
+  分片内按需解析过的样式在主进程按顺序回放（ensure_style），保证按需创建/覆盖与串行渲染一致；
+- 节状态：正文末尾 sectPr 只会被 useTemplate（新建节 + 布局）改变。主进程先只执行各分片中的节变化，
+  记下每个分片开始时的 sectPr，工作进程从该状态开始写入（表格宽度、分节复制都依赖它），最后采用末分片的 sectPr；
+- 页眉页脚/页码在拼接完成后由 render_to_docx 统一设置。
+"""
+from __future__ import annotations
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from typing import Any, Dict, List, Optional, Sequence
+
+from docx.oxml import parse_xml
+
+from ..render.json_template import expand_blocks
+from ..utils.profiling import count, span
+from .incremental import _RecordingResolver, _sect_xml, _serialize, _splice, _wrapper_open
+from .section_utils import apply_section_layout, update_section_state
+
+# 每个分片至少包含的顶层块数；分片数默认为 workers * SHARDS_PER_WORKER（便于负载均衡）
+MIN_SHARD_BLOCKS = 64
+SHARDS_PER_WORKER = 2
+
+
+def split_shards(blocks: Sequence[Dict[str, Any]], shards: int) -> List[List[Dict[str, Any]]]:
+    """按块 JSON 体积在顶层块边界上均分为至多 shards 个分片。"""
+    shards = max(1, min(shards, len(blocks) // MIN_SHARD_BLOCKS or 1))
+    if shards == 1:
+        return [list(blocks)] if blocks else []
+    weights = [len(json.dumps(b, ensure_ascii=False, default=str)) for b in blocks]
+    target = sum(weights) / shards
+    out: List[List[Dict[str, Any]]] = [[]]
+    acc = 0.0
+    for b, w in zip(blocks, weights):
+        if out[-1] and acc >= target * len(out) and len(out) < shards:
+            out.append([])
+        out[-1].append(b)
+        acc += w
+    return out
+
+
+def _advance_sections(doc, blocks):
+    """只执行 blocks（含页面模板内嵌套的 useTemplate）对节的改动，与 write_blocks 的节变化一致。"""
+    page_templates = getattr(doc, "_page_templates_cfg", {})
+    for b in blocks:
+        if "useTemplate" not in b:
+            continue
+        tpl = page_templates.get(b["useTemplate"])
+        if not tpl:
+            raise ValueError(f"useTemplate 指向的页面模板不存在：{b['useTemplate']}")
+        section = doc.add_section()
+        apply_section_layout(section, tpl.get("layout"))
+        _advance_sections(doc, expand_blocks(tpl.get("blocks", []), b.get("variables") or {}))
+
+
+def _shard_start_sections(doc, shards) -> List[str]:
+    """记录每个分片开始时的正文 sectPr，完成后把文档恢复原状。"""
+    body = doc.element.body
+    initial = deepcopy(body.sectPr)
+    start = len(body) - 1
+    starts = []
+    for shard in shards:
+        starts.append(_sect_xml(body))
+        _advance_sections(doc, shard)
+    for el in list(body[start:len(body) - 1]):
+        body.remove(el)
+    body.replace(body.sectPr, initial)
+    update_section_state(doc)
+    return starts
+
+
+def _render_shard(task):
+    from .docx_writer import open_render_document, write_blocks
+
+    doc_cfg, template_docx_path, prefer_json_styles, fail_on_unknown_style, clear_existing_content, start_sect, blocks = task
+    doc, resolver = open_render_document(
+        doc_cfg,
+        template_docx_path,
+        prefer_json_styles=prefer_json_styles,
+        clear_existing_content=clear_existing_content,
+    )
+    body = doc.element.body
+    body.replace(body.sectPr, parse_xml(start_sect))
+    update_section_state(doc)
+    start = len(body) - 1
+    recorder = _RecordingResolver(resolver)
+    table_defaults = doc_cfg.get("renderDefaults", {}).get("table", {})
+    write_blocks(doc, blocks, recorder, fail_on_unknown_style, table_defaults=table_defaults)
+    added = list(body[start:len(body) - 1])
+    return _serialize(added, doc.element.nsmap), _sect_xml(body), list(recorder.calls)
+
+
+def write_blocks_sharded(
+    doc,
+    blocks,
+    resolver,
+    doc_cfg: Dict[str, Any],
+    *,
+    template_docx_path: Optional[str] = None,
+    prefer_json_styles: bool = False,
+    fail_on_unknown_style: bool = True,
+    clear_existing_content: bool = True,
+    workers: int = 2,
+):
+    """与 write_blocks 输出一致；分片不足两个时直接串行写入。"""
+    from .docx_writer import write_blocks
+
+    blocks = list(blocks)
+    shards = split_shards(blocks, workers * SHARDS_PER_WORKER)
+    if len(shards) < 2:
+        table_defaults = doc_cfg.get("renderDefaults", {}).get("table", {})
+        write_blocks(doc, blocks, resolver, fail_on_unknown_style, table_defaults=table_defaults)
+        return
+    count("render.shards", len(shards))
+    with span("render.shards.sections"):
+        starts = _shard_start_sections(doc, shards)
+    shared_cfg = {k: v for k, v in doc_cfg.items() if k != "blocks"}
+    tasks = [
+        (shared_cfg, template_docx_path, prefer_json_styles, fail_on_unknown_style, clear_existing_content, sect, shard)
+        for sect, shard in zip(starts, shards)
+    ]
+    body = doc.element.body
+    wrapper_open = _wrapper_open(doc.element.nsmap)
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+        last_sect = None
+        for xml, end_sect, calls in pool.map(_render_shard, tasks):
+            with span("render.shards.splice"):
+                _splice(body, wrapper_open, xml)
+                for name, stype in calls:
+                    resolver.ensure_style(name, stype)
+            last_sect = end_sect
+    body.replace(body.sectPr, parse_xml(last_sect))
+    update_section_state(doc)
+
+
+__all__ = ["MIN_SHARD_BLOCKS", "SHARDS_PER_WORKER", "split_shards", "write_blocks_sharded"]
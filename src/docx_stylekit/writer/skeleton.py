@@ -0,0 +1,61 @@
+# src/docx_stylekit/writer/skeleton.py
+"""
+无模板渲染的样式骨架：python-docx 内置空白文档 + 预加载完 stylesInline 后的 styles.xml。
+预加载只改动样式部件，因此按 (stylesInline, prefer_json_styles) 缓存该部件的元素树；
+再次渲染时打开空白文档并换入骨架的深拷贝，跳过逐个创建/覆盖样式，输出与完整预加载一致。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Any, Dict, Optional, Tuple
+
+from docx import Document
+
+from ..utils.profiling import count
+
+MAX_SKELETONS = 8
+
+_SKELETONS: "OrderedDict[str, Any]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def skeleton_key(styles_inline: Dict[str, Any], prefer_json_styles: bool) -> str:
+    payload = json.dumps([styles_inline, bool(prefer_json_styles)], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def open_default_document(key: str) -> Tuple[Any, bool]:
+    """打开空白文档；骨架已缓存时换入其样式部件，返回 (doc, 是否已预加载)。"""
+    doc = Document()
+    with _LOCK:
+        styles_el = _SKELETONS.get(key)
+        if styles_el is not None:
+            _SKELETONS.move_to_end(key)
+    if styles_el is None:
+        return doc, False
+    doc.part._styles_part._element = deepcopy(styles_el)
+    count("render.skeleton.reused")
+    return doc, True
+
+
+def remember_default_document(key: str, doc) -> None:
+    """预加载完成后记录样式部件（此时尚未写入正文，样式即骨架状态）。"""
+    styles_el = deepcopy(doc.part._styles_part.element)
+    with _LOCK:
+        _SKELETONS[key] = styles_el
+        _SKELETONS.move_to_end(key)
+        while len(_SKELETONS) > MAX_SKELETONS:
+            _SKELETONS.popitem(last=False)
+    count("render.skeleton.built")
+
+
+def clear_skeletons() -> None:
+    with _LOCK:
+        _SKELETONS.clear()
+
+
+__all__ = ["MAX_SKELETONS", "skeleton_key", "open_default_document", "remember_default_document", "clear_skeletons"]
@@ -1,6 +1,44 @@
 # src/docx_stylekit/writer/style_store.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
+from docx.styles.style import StyleFactory
+from lxml import etree
+
+from ..utils.profiling import count
+
+# 编译后的 w:style 元素：键 = 内联样式定义 + 目标模板中的原样式（或新建样式名/类型）+ basedOn 目标 id 的内容哈希，
+# 跨渲染共享（同一进程内），应用时深拷贝后插入/替换，不再逐个子元素构建
+MAX_COMPILED_STYLES = 4096
+_COMPILED_STYLES: "OrderedDict[str, object]" = OrderedDict()
+_COMPILED_LOCK = threading.Lock()
+
+def _compiled_key(*parts) -> str:
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _get_compiled(key):
+    with _COMPILED_LOCK:
+        el = _COMPILED_STYLES.get(key)
+        if el is not None:
+            _COMPILED_STYLES.move_to_end(key)
+    return deepcopy(el) if el is not None else None
+
+def _put_compiled(key, style_el):
+    el = deepcopy(style_el)
+    with _COMPILED_LOCK:
+        _COMPILED_STYLES[key] = el
+        while len(_COMPILED_STYLES) > MAX_COMPILED_STYLES:
+            _COMPILED_STYLES.popitem(last=False)
+
+def clear_compiled_styles():
+    with _COMPILED_LOCK:
+        _COMPILED_STYLES.clear()
 
 def _set_rfonts(rPr, eastAsia=None, ascii_=None):
     rfonts = rPr.find(qn('w:rFonts'))
@@ -135,11 +173,15 @@ class StyleResolver:
     - 先用文档内已有样式（通常来自模板 DOCX）
     - 其次用 JSON stylesInline 动态创建
     - prefer_json_styles/$override 控制是否覆盖同名样式字段
+    同名样式只解析/覆盖一次，结果按 (名称, 类型) 缓存。
     """
     def __init__(self, document, styles_inline: dict, prefer_json_styles: bool = False):
         self.document = document
         self.styles_inline = styles_inline or {}
         self.prefer_json_styles = prefer_json_styles
+        self._resolved = {}
+        self._ids = {}
+        self._defaults = {}
 
     def _doc_style_by_name(self, name):
         try:
@@ -151,19 +193,51 @@ class StyleResolver:
         """
         返回 python-docx 的 style 对象；必要时依据 JSON 定义创建或受控覆盖。
         expected_type: 'paragraph' | 'character' | 'table'
+        按 (名称, 类型) 记忆化：同一 resolver 内重复调用返回同一对象，$override/prefer_json_styles
+        的覆盖只在首次解析时执行一次（之后对文档样式或 styles_inline 的改动不会再被重新覆盖）。
+        """
+        count("styles.resolved")
+        key = (name, expected_type)
+        if key in self._resolved:
+            return self._resolved[key]
+        st = self._resolve(name)
+        self._resolved[key] = st
+        return st
+
+    def ensure_style_id(self, name: str, expected_type: str):
         """
+        返回 (style, styleId)，供直接构建 XML 使用。styleId 为 None 表示该类型的默认样式
+        （与 python-docx 赋值时一致：不写出引用）；类型不符时与 python-docx 一样抛 ValueError。
+        """
+        st = self.ensure_style(name, expected_type)
+        if st is None:
+            return None, None
+        key = (name, expected_type)
+        if key not in self._ids:
+            from docx.enum.style import WD_STYLE_TYPE
+            wd_type = getattr(WD_STYLE_TYPE, expected_type.upper())
+            if st.type != wd_type:
+                raise ValueError("assigned style is type %s, need type %s" % (st.type, wd_type))
+            if wd_type not in self._defaults:
+                self._defaults[wd_type] = self.document.styles.default(wd_type)
+            self._ids[key] = None if st == self._defaults[wd_type] else st.style_id
+        return st, self._ids[key]
+
+    def _resolve(self, name: str):
         st = self._doc_style_by_name(name)
         json_def = self.styles_inline.get(name)
 
         # 创建：文档无、JSON 提供
         if st is None and json_def:
             st = self._create_style_from_json(name, json_def)
+            count("styles.created")
             return st
 
         # 覆盖：文档有、JSON 也有，且允许覆盖
         if st is not None and json_def:
             if json_def.get("$override") or self.prefer_json_styles:
-                self._apply_json_to_style(st, json_def)
+                st = self._override_style(st, json_def)
+                count("styles.overridden")
             return st
 
         return st  # 文档已有；或找不到（返回 None）
@@ -178,10 +252,40 @@ class StyleResolver:
         }
         if stype not in mapping:
             raise ValueError("Unsupported style type for JSON inline style: %s" % stype)
+        key = _compiled_key("new", name, stype, jd, self._base_style_id(jd))
+        style_el = _get_compiled(key)
+        if style_el is not None:
+            # 与 styles.add_style 一致：追加在 w:styles 末尾
+            self.document.styles.element.append(style_el)
+            count("styles.compiled_reused")
+            return StyleFactory(style_el)
         st = self.document.styles.add_style(name, mapping[stype])
         self._apply_json_to_style(st, jd)
+        _put_compiled(key, st._element)
         return st
 
+    def _override_style(self, st, jd: dict):
+        """受控覆盖；结果按（原样式 XML, 定义）缓存，命中时把编译结果整体写入原 w:style 元素。"""
+        s_el = st._element
+        key = _compiled_key("override", etree.tostring(s_el, encoding="unicode"), jd, self._base_style_id(jd))
+        style_el = _get_compiled(key)
+        if style_el is not None:
+            # 原地替换属性与子元素（不换元素本身），已持有的样式对象（如默认样式）仍然有效
+            s_el.attrib.clear()
+            s_el.attrib.update(style_el.attrib)
+            s_el[:] = list(style_el)
+            count("styles.compiled_reused")
+            return st
+        self._apply_json_to_style(st, jd)
+        _put_compiled(key, s_el)
+        return st
+
+    def _base_style_id(self, jd: dict):
+        if not jd.get("basedOn"):
+            return None
+        base = self._doc_style_by_name(jd["basedOn"])
+        return base.style_id if base is not None else None
+
     def _apply_json_to_style(self, st, jd: dict):
         # basedOn
         if jd.get("basedOn"):
@@ -0,0 +1,41 @@
+import io
+import zipfile
+
+from docx_stylekit import profile_session, render_from_json
+from docx_stylekit.writer.skeleton import clear_skeletons
+
+TEMPLATE = {
+    "doc": {
+        "stylesInline": {
+            "Body": {"type": "paragraph", "basedOn": "Normal", "font": {"eastAsia": "仿宋", "sizePt": 16}},
+            "Normal": {"type": "paragraph", "$override": True, "font": {"ascii": "Arial"}},
+        },
+        "blocks": [{"type": "paragraph", "styleRef": "Body", "runs": [{"text": "正文"}]}],
+    }
+}
+
+
+def _parts(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        return {n: z.read(n) for n in z.namelist() if n != "docProps/core.xml"}
+
+
+def test_skeleton_reused_with_identical_output():
+    clear_skeletons()
+    with profile_session() as prof:
+        cold = render_from_json(TEMPLATE, return_bytes=True)
+        warm = render_from_json(TEMPLATE, return_bytes=True)
+    assert prof.counters["render.skeleton.built"] == 1
+    assert prof.counters["render.skeleton.reused"] == 1
+    assert _parts(cold) == _parts(warm)
+
+
+def test_skeleton_keyed_by_inline_styles():
+    clear_skeletons()
+    render_from_json(TEMPLATE, return_bytes=True)
+    changed = {"doc": dict(TEMPLATE["doc"], stylesInline={"Body": {"type": "paragraph", "font": {"sizePt": 12}}})}
+    with profile_session() as prof:
+        render_from_json(changed, return_bytes=True)
+        render_from_json(TEMPLATE, return_bytes=True, prefer_json_styles=True)
+    assert prof.counters.get("render.skeleton.reused", 0) == 0
+    assert prof.counters["render.skeleton.built"] == 2
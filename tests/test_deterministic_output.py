@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+from docx import Document
+
+from docx_stylekit import render_from_json
+
+SAMPLE = Path(__file__).resolve().parent.parent / "examples" / "sample.docx"
+
+
+def _template():
+    blocks = [{"type": "heading", "level": 1, "text": "标题"}]
+    blocks += [{"type": "paragraph", "styleRef": f"S{i % 3}", "text": f"段落 {i}"} for i in range(20)]
+    styles = {f"S{i}": {"type": "paragraph", "basedOn": "Normal", "font": {"sizePt": 10 + i}} for i in range(3)}
+    return {"doc": {"stylesInline": styles, "blocks": blocks}}
+
+
+def test_repeat_and_incremental_renders_are_byte_identical(tmp_path):
+    a = render_from_json(_template(), template_docx=SAMPLE, return_bytes=True, deterministic=True)
+    b = render_from_json(_template(), template_docx=SAMPLE, return_bytes=True, deterministic=True)
+    cache = tmp_path / "frag.json"
+    render_from_json(_template(), template_docx=SAMPLE, output_path=tmp_path / "cold.docx", fragment_cache=cache,
+                     deterministic=True)
+    warm = render_from_json(_template(), template_docx=SAMPLE, output_path=tmp_path / "warm.docx", fragment_cache=cache,
+                            deterministic=True)
+    assert a == b == warm.read_bytes()
+
+    names = zipfile.ZipFile(warm).namelist()
+    assert names[:2] == ["[Content_Types].xml", "_rels/.rels"] and names[2:] == sorted(names[2:])
+
+
+def test_source_date_epoch(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    out = render_from_json(_template(), output_path=tmp_path / "out.docx", deterministic=True)
+    assert {i.date_time for i in zipfile.ZipFile(out).infolist()} == {(2023, 11, 14, 22, 13, 20)}
+    props = Document(str(out)).core_properties
+    assert props.created == props.modified and props.modified.year == 2023
+
+
+def test_independent_of_hash_seed(tmp_path):
+    code = (
+        "import sys, json; from docx_stylekit import render_from_json; "
+        "sys.stdout.buffer.write(render_from_json(json.loads(sys.argv[1]), return_bytes=True, deterministic=True))"
+    )
+    outputs = []
+    for seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        outputs.append(subprocess.run([sys.executable, "-c", code, json.dumps(_template())],
+                                      env=env, check=True, capture_output=True).stdout)
+    assert outputs[0] == outputs[1] and outputs[0][:2] == b"PK"
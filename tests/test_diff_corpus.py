@@ -0,0 +1,83 @@
+import copy
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from docx_stylekit import diff_corpus
+from docx_stylekit.utils.io import dump_yaml, load_yaml
+
+
+def build_corpus(tmp_path: Path):
+    baseline = load_yaml(Path("sampleObserved.yaml"))
+    corpus = tmp_path / "corpus"
+    dump_yaml(baseline, corpus / "same.yaml")
+    drifted = copy.deepcopy(baseline)
+    first_style = next(iter(drifted["styles"]["paragraph_styles"].values()))
+    first_style["rPr"]["size_pt"] = 99.0
+    first_style["rPr"]["italic"] = "drift"
+    dump_yaml(drifted, corpus / "dept_a" / "drift.yaml")
+    dump_yaml(drifted, corpus / "dept_b" / "drift.yml")
+    (corpus / "broken.yaml").write_text("styles: [unclosed", encoding="utf-8")
+    return baseline, corpus
+
+
+def test_diff_corpus_summary(tmp_path):
+    baseline, corpus = build_corpus(tmp_path)
+    result = diff_corpus(baseline, [corpus], workers=1, depth=3)
+    summary = result["summary"]
+    assert summary["files"] == 4
+    assert summary["with_deviation"] == 2
+    assert summary["errors"] == 1
+    top_path, n = next(iter(result["paths"].items()))
+    assert top_path.startswith("styles.paragraph_styles.")
+    assert n == 2
+    parallel = diff_corpus(baseline, [corpus], workers=2, depth=3)
+    assert parallel == result
+
+
+def test_cli_diff_corpus(tmp_path):
+    _, corpus = build_corpus(tmp_path)
+    out = tmp_path / "corpus.json"
+    cmd = [
+        sys.executable, "-m", "docx_stylekit.cli", "diff-corpus",
+        "sampleObserved.yaml", str(corpus), "-j", "2", "-o", str(out), "--top", "1",
+    ]
+    proc = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    assert "most frequent drift" in proc.stdout
+    result = json.loads(out.read_text(encoding="utf-8"))
+    assert max(len(r["paths"]) for r in result["files"]) == 1
+
+
+def test_errored_file_is_not_counted_as_deviation(tmp_path, monkeypatch):
+    from docx_stylekit.diff import corpus as corpus_mod
+    baseline, corpus = build_corpus(tmp_path)
+    real_iter = corpus_mod.BaselineIndex.iter_diff
+
+    def failing_after_first(self, observed):
+        for d in real_iter(self, observed):
+            yield d
+            raise ValueError("中途失败")
+
+    monkeypatch.setattr(corpus_mod.BaselineIndex, "iter_diff", failing_after_first)
+    summary = diff_corpus(baseline, [corpus / "dept_a"], workers=1)["summary"]
+    assert (summary["errors"], summary["with_deviation"]) == (1, 0)
+
+
+def test_baseline_digest_memo_stays_bounded(tmp_path):
+    from docx_stylekit.diff.corpus import BaselineIndex, summarize_file
+    baseline, corpus = build_corpus(tmp_path)
+    # 节列表没有唯一键，按摘要做序列对齐：observed 侧每个节都会计算摘要
+    sections = copy.deepcopy(baseline)
+    sections["page_setup"]["sections"].append(copy.deepcopy(sections["page_setup"]["sections"][0]))
+    sections["page_setup"]["sections"][0]["titlePg"] = "drift"
+    drift = tmp_path / "sections.yaml"
+    dump_yaml(sections, drift)
+    index = BaselineIndex(baseline)
+    frozen = len(index.digests)
+    first = summarize_file(index, drift)
+    assert first["total"]
+    for _ in range(20):
+        assert summarize_file(index, drift)["total"] == first["total"]
+    # observed 侧摘要只存在于每次 diff 的子缓存中，基线缓存不随文件数增长
+    assert len(index.digests) == frozen
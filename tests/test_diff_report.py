@@ -0,0 +1,45 @@
+import io
+import json
+import subprocess
+import sys
+
+from docx_stylekit.emit.report import write_diff_stream
+
+DIFFS = [
+    {"path": "styles.paragraph_styles.Normal.rPr.size_pt", "a": 16.0, "b": 12.0, "status": "changed"},
+    {"path": "styles.paragraph_styles.Title", "a": None, "b": {"name": "标题"}, "status": "added"},
+    {"path": "page_setup.sections[0].titlePg", "a": True, "b": False, "status": "changed"},
+    {"path": "stylesX", "a": 1, "b": None, "status": "removed"},
+]
+
+
+def test_json_stream_matches_json_dumps():
+    buf = io.StringIO()
+    assert write_diff_stream(iter(DIFFS), fmt="json", out=buf) == len(DIFFS)
+    assert buf.getvalue() == json.dumps(DIFFS, ensure_ascii=False, indent=2) + "\n"
+    empty = io.StringIO()
+    write_diff_stream(iter([]), fmt="json", out=empty)
+    assert json.loads(empty.getvalue()) == []
+
+
+def test_jsonl_stream_filters_by_prefix_and_status(tmp_path):
+    out = tmp_path / "diff.jsonl"
+    count = write_diff_stream(
+        iter(DIFFS), fmt="jsonl", out=out, path_prefix="styles", statuses=["changed", "added"]
+    )
+    lines = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert count == 2
+    assert [d["path"] for d in lines] == [DIFFS[0]["path"], DIFFS[1]["path"]]
+
+
+def test_cli_diff_jsonl(tmp_path):
+    out = tmp_path / "diff.jsonl"
+    cmd = [
+        sys.executable, "-m", "docx_stylekit.cli", "diff",
+        "examples/enterprise_baseline.yaml", "sampleObserved.yaml",
+        "--structural", "--fmt", "jsonl", "--status", "added", "-o", str(out),
+    ]
+    subprocess.run(cmd, check=True)
+    lines = out.read_text(encoding="utf-8").splitlines()
+    assert lines
+    assert all(json.loads(line)["status"] == "added" for line in lines)
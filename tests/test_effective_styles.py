@@ -0,0 +1,85 @@
+from pathlib import Path
+
+from docx_stylekit import observe_docx, resolve_effective_styles
+from docx_stylekit.constants import CN_FONT_SIZE_PT
+from docx_stylekit.parsers.effective_styles import resolve_effective_styles_xml
+from docx_stylekit.parsers.styles import closest_cn_size_name, parse_styles
+from docx_stylekit.utils.io import load_yaml
+
+
+def _style(based_on=None, rPr=None, pPr=None):
+    return {"name": None, "based_on": based_on, "link_char_style": None, "rPr": rPr or {}, "pPr": pPr or {}}
+
+
+def test_inheritance_chain_flattening():
+    styles = {
+        "doc_defaults": {"rPr": {"ascii": "Times New Roman", "size_pt": 10.5}, "pPr": {}},
+        "paragraph_styles": {
+            "Normal": _style(rPr={"eastAsia": "仿宋", "size_pt": 16.0, "bold": False}, pPr={"alignment": "both"}),
+            "Heading1": _style("Normal", rPr={"bold": True, "size_pt": 22.0}),
+            "Heading2": _style("Heading1", rPr={"size_pt": None}, pPr={"alignment": "left", "space_before_pt": 0.0}),
+            "Loop": _style("Loop"),
+            "Dangling": _style("Missing"),
+        },
+    }
+    eff = resolve_effective_styles(styles)["paragraph_styles"]
+    h2 = eff["Heading2"]
+    assert h2["rPr"]["eastAsia"] == "仿宋"
+    assert h2["rPr"]["ascii"] == "Times New Roman"
+    assert h2["rPr"]["bold"] is True
+    assert (h2["rPr"]["size_pt"], h2["rPr"]["size_cn"]) == (22.0, "二号")
+    assert h2["pPr"]["alignment"] == "left"
+    assert eff["Normal"]["rPr"]["size_cn"] == "三号"
+    assert eff["Loop"]["rPr"]["size_pt"] == 10.5
+    assert eff["Dangling"]["rPr"]["size_cn"] == "五号"
+
+
+def test_closest_cn_size_name_matches_linear_scan():
+    def linear(pt):
+        return sorted(CN_FONT_SIZE_PT.items(), key=lambda kv: abs(kv[1] - pt))[0][0]
+    for i in range(0, 900):
+        pt = i / 20
+        assert closest_cn_size_name(pt) == linear(pt)
+
+
+def test_observe_effective_styles():
+    observed = observe_docx("examples/sample.docx", effective_styles=True)
+    eff = observed["styles_effective"]["paragraph_styles"]
+    assert set(eff) == set(observed["styles"]["paragraph_styles"])
+    assert resolve_effective_styles("examples/sample.docx") == observed["styles_effective"]
+    assert "styles_effective" not in observe_docx("examples/sample.docx")
+    # 有效样式单独解析，observe 的 styles 段保持原有（缺省项填默认值的）结构
+    assert observed["styles"] == load_yaml(Path("sampleObserved.yaml"))["styles"]
+
+
+def _styles_xml(body):
+    return (
+        '<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"{body}</w:styles>"
+    ).encode()
+
+
+def test_first_line_only_child_keeps_parent_left_indent():
+    xml = _styles_xml(
+        '<w:style w:type="paragraph" w:styleId="Base"><w:pPr><w:ind w:left="1134"/></w:pPr></w:style>'
+        '<w:style w:type="paragraph" w:styleId="Child"><w:basedOn w:val="Base"/>'
+        '<w:pPr><w:ind w:firstLineChars="200"/></w:pPr></w:style>'
+    )
+    explicit = parse_styles(xml, explicit_only=True)
+    assert explicit["paragraph_styles"]["Child"]["pPr"]["indent"] == {"first_line": {"type": "chars", "value": 2.0}}
+    # 默认解析仍输出完整键
+    assert parse_styles(xml)["paragraph_styles"]["Child"]["pPr"]["indent"]["left_cm"] == 0.0
+    indent = resolve_effective_styles_xml(xml)["paragraph_styles"]["Child"]["pPr"]["indent"]
+    assert indent["left_cm"] == explicit["paragraph_styles"]["Base"]["pPr"]["indent"]["left_cm"] > 1.9
+    assert indent["first_line"] == {"type": "chars", "value": 2.0}
+
+
+def test_child_can_turn_off_inherited_bold():
+    eff = resolve_effective_styles_xml(_styles_xml(
+        '<w:style w:type="paragraph" w:styleId="Base"><w:pPr><w:keepNext/></w:pPr><w:rPr><w:b/></w:rPr></w:style>'
+        '<w:style w:type="paragraph" w:styleId="Child"><w:basedOn w:val="Base"/>'
+        '<w:pPr><w:keepNext w:val="0"/></w:pPr><w:rPr><w:b w:val="false"/></w:rPr></w:style>'
+    ))["paragraph_styles"]
+    assert eff["Base"]["rPr"]["bold"] is True and eff["Base"]["pPr"]["keep_next"] is True
+    assert eff["Child"]["rPr"]["bold"] is False
+    assert eff["Child"]["pPr"]["keep_next"] is False
@@ -0,0 +1,51 @@
+import io
+import zipfile
+
+from docx import Document
+
+from docx_stylekit import profile_session, render_from_json
+
+
+def _page_fields(xml: str) -> int:
+    return xml.count('w:instr="PAGE"')
+
+
+def test_many_sections_share_one_footer():
+    tpl = {"doc": {
+        "pageTemplates": {"s": {"layout": {}, "blocks": [{"type": "paragraph", "text": "x"}]}},
+        "headersFooters": {"footer": [{"type": "pageNumber", "align": "center", "styleRef": "Footer"}]},
+        "blocks": [{"useTemplate": "s"} for _ in range(200)],
+    }}
+    data = render_from_json(tpl, return_bytes=True)
+    z = zipfile.ZipFile(io.BytesIO(data))
+    footers = [n for n in z.namelist() if n.startswith("word/footer")]
+    assert len(footers) == 1
+    # 共享页脚只插入一个页码域（不再随节数重复）
+    assert _page_fields(z.read(footers[0]).decode()) == 1
+    doc = Document(io.BytesIO(data))
+    assert len(doc.sections) == 201
+    assert all(s.footer.is_linked_to_previous for s in doc.sections[1:])
+
+
+def test_identical_template_footers_are_linked(tmp_path):
+    template = Document()
+    template.add_paragraph("正文")
+    for _ in range(3):
+        template.add_section()
+    for section in template.sections:
+        section.footer.is_linked_to_previous = False
+    template.sections[3].footer.paragraphs[0].text = "附录页脚"
+    template.save(tmp_path / "t.docx")
+
+    tpl = {"doc": {"headersFooters": {"footer": [{"type": "pageNumber"}]}, "blocks": []}}
+    with profile_session() as prof:
+        data = render_from_json(tpl, template_docx=tmp_path / "t.docx", keep_template_content=True, return_bytes=True)
+    assert prof.counters["render.footer.linked"] == 2
+    z = zipfile.ZipFile(io.BytesIO(data))
+    assert len([n for n in z.namelist() if n.startswith("word/footer")]) == 2
+    doc = Document(io.BytesIO(data))
+    linked = [s.footer.is_linked_to_previous for s in doc.sections]
+    assert linked == [False, True, True, False]
+    assert _page_fields(doc.sections[0].footer.paragraphs[0]._p.xml) == 1
+    # 已有内容的页脚保持原样
+    assert doc.sections[3].footer.paragraphs[0].text == "附录页脚"
@@ -0,0 +1,54 @@
+import copy
+import json
+import zipfile
+
+from docx_stylekit import profile_session, render_from_json
+
+
+def _template():
+    blocks = [{"type": "heading", "level": 1, "text": "标题"}]
+    blocks += [{"type": "paragraph", "styleRef": "Normal", "runs": [{"text": f"段落 {i}"}]} for i in range(6)]
+    cell = lambda t: {"blocks": [{"type": "paragraph", "runs": [{"text": t}]}]}  # noqa: E731
+    blocks.append({"type": "table", "rows": [[cell("A"), cell("B")], [cell("1"), cell("2")]]})
+    return {"doc": {"blocks": blocks}}
+
+
+def _document_xml(path):
+    with zipfile.ZipFile(path) as z:
+        return z.read("word/document.xml"), z.read("word/styles.xml")
+
+
+def test_incremental_matches_full_render(tmp_path):
+    tpl = _template()
+    full = render_from_json(tpl, output_path=tmp_path / "full.docx")
+    cold = render_from_json(tpl, output_path=tmp_path / "inc.docx", incremental=True)
+    cache_path = tmp_path / "inc.docx.fragments.json"
+    assert cache_path.exists()
+    warm = render_from_json(tpl, output_path=tmp_path / "warm.docx", fragment_cache=cache_path)
+    assert _document_xml(full) == _document_xml(cold) == _document_xml(warm)
+
+
+def test_edit_rebuilds_only_changed_blocks(tmp_path):
+    tpl = _template()
+    cache_path = tmp_path / "frag.json"
+    render_from_json(tpl, output_path=tmp_path / "a.docx", fragment_cache=cache_path)
+    edited = copy.deepcopy(tpl)
+    edited["doc"]["blocks"][3]["runs"][0]["text"] = "改过的段落"
+
+    with profile_session() as prof:
+        render_from_json(edited, output_path=tmp_path / "b.docx", fragment_cache=cache_path)
+    assert prof.counters["render.fragments.built"] == 1
+    assert prof.counters["render.fragments.reused"] == len(tpl["doc"]["blocks"]) - 1
+
+    full = render_from_json(edited, output_path=tmp_path / "full.docx")
+    assert _document_xml(full) == _document_xml(tmp_path / "b.docx")
+
+
+def test_cache_keeps_only_used_fragments(tmp_path):
+    tpl = _template()
+    cache_path = tmp_path / "frag.json"
+    render_from_json(tpl, output_path=tmp_path / "a.docx", fragment_cache=cache_path)
+    tpl["doc"]["blocks"] = tpl["doc"]["blocks"][:2]
+    render_from_json(tpl, output_path=tmp_path / "b.docx", fragment_cache=cache_path)
+    data = json.loads(cache_path.read_text(encoding="utf-8"))
+    assert len(data["fragments"]) == 2
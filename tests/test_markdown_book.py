@@ -0,0 +1,72 @@
+import subprocess
+import sys
+import zipfile
+
+from docx import Document
+
+from docx_stylekit import render_book_from_markdown, render_from_markdown
+
+CHAPTERS = [
+    "# 第一章\n\n正文 **一**。\n\n- a\n- b\n",
+    "# 第二章\n\n| A | B |\n| --- | --- |\n| 1 | 2 |\n",
+    "# 第三章\n\n结束。\n",
+]
+
+
+def _write_chapters(tmp_path):
+    paths = []
+    for i, text in enumerate(CHAPTERS):
+        p = tmp_path / f"ch{i + 1}.md"
+        p.write_text(text, encoding="utf-8")
+        paths.append(p)
+    return paths
+
+
+def test_book_without_breaks_matches_concatenation(tmp_path):
+    paths = _write_chapters(tmp_path)
+    book = render_book_from_markdown(paths, chapter_break="none", workers=2, output_path=tmp_path / "book.docx")
+    single = render_from_markdown("\n\n".join(CHAPTERS), output_path=tmp_path / "single.docx")
+    with zipfile.ZipFile(book) as za, zipfile.ZipFile(single) as zb:
+        assert za.read("word/document.xml") == zb.read("word/document.xml")
+
+
+def test_book_page_and_section_breaks(tmp_path):
+    paths = _write_chapters(tmp_path)
+    paged = Document(render_book_from_markdown(paths, workers=1, output_path=tmp_path / "paged.docx"))
+    breaks = [p for p in paged.paragraphs if p.paragraph_format.page_break_before]
+    assert len(breaks) == 2
+    assert len(paged.sections) == 1
+
+    sectioned = Document(
+        render_book_from_markdown(paths, chapter_break="section", workers=1, output_path=tmp_path / "sect.docx")
+    )
+    assert len(sectioned.sections) == 3
+
+
+def test_book_chapter_templates_and_base_json(tmp_path):
+    paths = _write_chapters(tmp_path)
+    base = {
+        "doc": {
+            "pageTemplates": {
+                "chapter": {
+                    "layout": {"orientation": "landscape"},
+                    "blocks": [{"type": "paragraph", "styleRef": "Normal", "runs": [{"text": "章节扉页"}]}],
+                }
+            },
+            "blocks": [{"type": "paragraph", "styleRef": "Normal", "runs": [{"text": "封面"}]}],
+        }
+    }
+    chapters = [{"path": str(paths[0]), "useTemplate": "chapter"}, {"text": CHAPTERS[1]}]
+    doc = Document(render_book_from_markdown(chapters, base_template=base, workers=1, output_path=tmp_path / "t.docx"))
+    texts = [p.text for p in doc.paragraphs]
+    assert texts[0] == "封面"
+    assert texts.count("章节扉页") == 1
+    assert len(doc.sections) == 2
+
+
+def test_cli_markdown_book(tmp_path):
+    _write_chapters(tmp_path)
+    out = tmp_path / "book.docx"
+    cmd = [sys.executable, "-m", "docx_stylekit.cli", "markdown-book", str(tmp_path), "-o", str(out), "-j", "1"]
+    subprocess.run(cmd, check=True)
+    assert len([p for p in Document(out).paragraphs if p.text.startswith("第")]) == 3
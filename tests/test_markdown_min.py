@@ -64,3 +64,44 @@ def test_headline_heuristic_disabled_when_markdown_headings_present():
     data = markdown_to_template(md)
     # 第二个块应保持段落
     assert data["doc"]["blocks"][1]["type"] == "paragraph"
+
+
+def test_streaming_blocks_match_full_conversion():
+    from docx_stylekit.convert.markdown import iter_markdown_blocks, markdown_to_template
+
+    md = (
+        "段落 [ref] 与 **粗体**\n续行\n\n"
+        "| A | B |\n| --- | --- |\n| 1 | 2 |\n\n"
+        "- a\n- b\n\n  列表内段落\n\n"
+        "```\ncode\n\n\nblock\n```\n\n"
+        "Setext 标题\n===\n\n"
+        "> 引用\n懒续行\n\n"
+        "[ref]: http://example.com\n"
+    ) * 3
+    full = markdown_to_template(md)["doc"]["blocks"]
+    for window in (1, 16, 64, 4096):
+        assert list(iter_markdown_blocks(md, window_chars=window)) == full
+
+
+def test_streaming_render_matches(tmp_path):
+    import zipfile
+
+    from docx_stylekit import render_from_markdown
+
+    md = "一、概述\n\n正文 *强调*。\n\n| A | B |\n| --- | --- |\n| 1 | 2 |\n\n- x\n- y\n" * 5
+    full = render_from_markdown(md, output_path=tmp_path / "full.docx")
+    streamed = render_from_markdown(md, output_path=tmp_path / "stream.docx", streaming=True)
+    with zipfile.ZipFile(full) as za, zipfile.ZipFile(streamed) as zb:
+        assert za.read("word/document.xml") == zb.read("word/document.xml")
+
+
+def test_markdown_converter_reuse():
+    from docx_stylekit.convert.markdown import MarkdownConverter, markdown_to_template
+
+    converter = MarkdownConverter()
+    texts = ["# 一\n\n正文", "| A |\n| --- |\n| 1 |", "一、标题\n\n段落"]
+    results = list(converter.convert_many(texts))
+    assert results == [markdown_to_template(t) for t in texts]
+    # 每次返回独立的模板，修改不影响后续结果
+    results[0]["doc"]["pageSetup"]["marginsCm"]["top"] = 9
+    assert converter.convert(texts[0])["doc"]["pageSetup"]["marginsCm"]["top"] == 2.5
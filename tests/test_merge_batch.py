@@ -0,0 +1,58 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from docx_stylekit import merge_batch, merge_yaml
+from docx_stylekit.utils.io import dump_yaml, load_yaml
+
+BASELINE = Path("examples/enterprise_baseline.yaml")
+
+
+def build_inputs(tmp_path: Path):
+    observed = load_yaml(Path("sampleObserved.yaml"))
+    src = tmp_path / "observed"
+    dump_yaml(observed, src / "a.yaml")
+    dump_yaml(observed, src / "dept" / "b.yaml")
+    return observed, src
+
+
+def test_merge_batch_matches_single_merge_and_is_incremental(tmp_path):
+    observed, src = build_inputs(tmp_path)
+    out = tmp_path / "merged"
+
+    first = merge_batch(BASELINE, [src], out, workers=1)
+    assert first["merged"] == ["a.yaml", "dept/b.yaml"]
+    assert load_yaml(out / "dept" / "b.yaml") == merge_yaml(BASELINE, observed)
+
+    again = merge_batch(BASELINE, [src], out, workers=1)
+    assert again["merged"] == []
+    assert again["skipped"] == ["a.yaml", "dept/b.yaml"]
+
+    observed["theme"] = {"colors": {"accent1": "FF0000"}}
+    dump_yaml(observed, src / "a.yaml")
+    (out / "dept" / "b.yaml").unlink()
+    third = merge_batch(BASELINE, [src], out, workers=1)
+    assert third["merged"] == ["a.yaml", "dept/b.yaml"]
+
+
+def test_merge_batch_baseline_change_and_errors(tmp_path):
+    _, src = build_inputs(tmp_path)
+    (src / "broken.yaml").write_text("styles: [unclosed", encoding="utf-8")
+    out = tmp_path / "merged"
+    first = merge_batch(BASELINE, [src], out, workers=2)
+    assert sorted(first["errors"]) == ["broken.yaml"]
+
+    baseline = load_yaml(BASELINE)
+    baseline["meta"] = {"rev": 2}
+    second = merge_batch(baseline, [src], out, workers=1)
+    assert second["merged"] == ["a.yaml", "dept/b.yaml"]
+    assert list(second["errors"]) == ["broken.yaml"]
+
+
+def test_cli_merge_batch(tmp_path):
+    _, src = build_inputs(tmp_path)
+    out = tmp_path / "merged"
+    cmd = [sys.executable, "-m", "docx_stylekit.cli", "merge-batch", str(BASELINE), str(src), "-o", str(out), "-j", "1"]
+    subprocess.run(cmd, check=True)
+    assert (out / "a.yaml").exists()
+    assert (out / ".merge-manifest.json").exists()
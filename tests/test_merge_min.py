@@ -0,0 +1,47 @@
+import copy
+from pathlib import Path
+
+from docx_stylekit.merge.merger import merge_enterprise_with_observed
+from docx_stylekit.utils.dicts import MergedView, deep_merge, merge_shared
+from docx_stylekit.utils.io import load_yaml
+
+BASE = {
+    "doc": {
+        "stylesInline": {"Normal": {"font": {"sizePt": 16}}, "Heading 1": {"font": {"bold": True}}},
+        "renderDefaults": {"table": {"format": {"header": {"fill": "#DCE6F1", "bold": True}}}},
+        "blocks": [],
+    }
+}
+OVERRIDE = {"doc": {"stylesInline": {"Normal": {"font": {"sizePt": 12}}}, "blocks": [{"type": "toc"}]}}
+
+
+def test_merge_shared_matches_deep_merge_and_shares_untouched_subtrees():
+    before = copy.deepcopy(BASE)
+    merged = merge_shared(BASE, OVERRIDE)
+    assert merged == deep_merge(BASE, OVERRIDE)
+    assert BASE == before
+    assert merged["doc"]["renderDefaults"] is BASE["doc"]["renderDefaults"]
+    assert merged["doc"]["stylesInline"]["Heading 1"] is BASE["doc"]["stylesInline"]["Heading 1"]
+    assert merged["doc"]["stylesInline"] is not BASE["doc"]["stylesInline"]
+
+
+def test_merged_view_overlays_lazily():
+    base = BASE["doc"]["renderDefaults"]["table"]["format"]
+    view = MergedView(base, {"header": {"fill": "#FFFFFF"}, "bandedRows": True})
+    assert view["header"]["fill"] == "#FFFFFF"
+    assert view["header"]["bold"] is True
+    assert view.get("alternate") is None
+    assert set(view) == {"header", "bandedRows"}
+    assert view.materialize() == deep_merge(base, {"header": {"fill": "#FFFFFF"}, "bandedRows": True})
+    assert not MergedView(None, None)
+
+
+def test_merge_enterprise_does_not_mutate_inputs():
+    enterprise = load_yaml(Path("examples/enterprise_baseline.yaml"))
+    observed = load_yaml(Path("sampleObserved.yaml"))
+    snapshot = copy.deepcopy(enterprise)
+    merged = merge_enterprise_with_observed(enterprise, observed)
+    assert enterprise == snapshot
+    assert merged == merge_enterprise_with_observed(copy.deepcopy(enterprise), observed)
+    for key, val in observed["theme"]["colors"].items():
+        assert key in merged["theme"]["colors"]
@@ -0,0 +1,47 @@
+from docx import Document
+
+from docx_stylekit import profile_session, render_from_json
+
+
+def _cell(text):
+    return {"blocks": [{"type": "paragraph", "runs": [{"text": text}]}]}
+
+
+def _template(uses):
+    return {
+        "doc": {
+            "variables": {"org": "示例单位"},
+            "pageTemplates": {
+                "appendix": {
+                    "layout": {"orientation": "landscape"},
+                    "blocks": [
+                        {"type": "heading", "level": 1, "text": "附录 {n}"},
+                        {"type": "paragraph", "runs": [{"text": "{org}"}]},
+                        {"type": "table", "header": [[_cell("A"), _cell("B")]], "rows": [[_cell("1"), _cell("2")]]},
+                    ],
+                }
+            },
+            "blocks": [{"useTemplate": "appendix", "variables": {"n": n}} for n in uses],
+        }
+    }
+
+
+def test_page_template_compiled_once_and_cloned(tmp_path):
+    with profile_session() as prof:
+        out = render_from_json(_template(["A", "A", "A", "B"]), output_path=tmp_path / "t.docx")
+    # 变量不同（A/B）也复用同一份编译结果，只在 w:t 上代入
+    assert prof.counters["render.page_templates.compiled"] == 1
+    assert prof.counters["render.page_templates.reused"] == 3
+    doc = Document(out)
+    assert [p.text for p in doc.paragraphs if p.text.startswith("附录")] == ["附录 A"] * 3 + ["附录 B"]
+    assert [p.text for p in doc.paragraphs].count("示例单位") == 4
+    assert len(doc.tables) == 4
+    assert len(doc.sections) == 5
+
+
+def test_page_template_values_changing_run_structure(tmp_path):
+    with profile_session() as prof:
+        out = render_from_json(_template(["A", "", "x\ty", "B"]), output_path=tmp_path / "t.docx")
+    assert prof.counters["render.page_templates.compiled"] == 1
+    doc = Document(out)
+    assert [p.text for p in doc.paragraphs if p.text.startswith("附录")] == ["附录 A", "附录 ", "附录 x\ty", "附录 B"]
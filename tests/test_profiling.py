@@ -0,0 +1,43 @@
+import json
+import subprocess
+import sys
+
+from docx_stylekit import profile_session, render_from_json
+
+
+def test_profile_session_records_render_stages():
+    events = []
+    template_json = {
+        "doc": {
+            "blocks": [
+                {"type": "paragraph", "runs": [{"text": "段落"}]},
+                {
+                    "type": "table",
+                    "rows": [[{"blocks": [{"type": "paragraph", "runs": [{"text": "格"}]}]}]],
+                },
+            ]
+        }
+    }
+    with profile_session(callback=events.append) as prof:
+        render_from_json(template_json, return_bytes=True)
+    report = prof.report()
+    names = {e["name"] for e in events}
+    assert {"render.expand", "render.write_blocks", "render.table.format", "render.save"} <= names
+    assert report["counters"]["render.cells"] == 1
+    assert report["counters"]["styles.resolved"] > 0
+    assert report["totals"]["render.save"]["count"] == 1
+
+
+def test_cli_profile_writes_report(tmp_path):
+    md_path = tmp_path / "sample.md"
+    md_path.write_text("# 标题\n\n正文。", encoding="utf-8")
+    report_path = tmp_path / "profile.json"
+    cmd = [
+        sys.executable, "-m", "docx_stylekit.cli",
+        "--profile", str(report_path),
+        "markdown", str(md_path), "-o", str(tmp_path / "out.docx"),
+    ]
+    subprocess.run(cmd, check=True)
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert "markdown.parse" in report["totals"]
+    assert report["counters"]["markdown.blocks"] == 2
@@ -0,0 +1,84 @@
+import base64
+import io
+import zipfile
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from docx_stylekit import profile_session, render_from_markdown, sanitize_docx
+from docx_stylekit.writer.prune import prune_document
+from docx_stylekit.writer.section_utils import add_toc_field
+
+PNG_1PX = base64.b64decode(
+    b"iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEvwH+0zm6AwAAAABJRU5ErkJggg=="
+)
+
+MARKDOWN = "# 标题\n\n## 小节\n\n正文 **加粗**\n\n1. 一\n2. 二\n\n| a | b |\n|---|---|\n| 1 | 2 |\n"
+
+
+def _style_ids(doc):
+    return {s.get(qn("w:styleId")) for s in doc.styles.element.iterchildren(qn("w:style"))}
+
+
+def test_render_prune_keeps_referenced_styles_and_closure(tmp_path):
+    full = Document(io.BytesIO(render_from_markdown(MARKDOWN, return_bytes=True)))
+    with profile_session() as prof:
+        data = render_from_markdown(MARKDOWN, return_bytes=True, prune=True)
+    doc = Document(io.BytesIO(data))
+    kept = _style_ids(doc)
+    assert len(kept) < len(_style_ids(full)) / 4
+    body = doc.element.body
+    for tag in ("w:pStyle", "w:rStyle", "w:tblStyle"):
+        assert {el.get(qn("w:val")) for el in body.iter(qn(tag))} <= kept
+    for style in doc.styles.element.iterchildren(qn("w:style")):
+        for tag in ("w:basedOn", "w:link", "w:next"):
+            ref = style.find(qn(tag))
+            assert ref is None or ref.get(qn("w:val")) in kept
+    # 列表用到的编号定义仍在
+    numbering = doc.part.numbering_part.element
+    num_ids = {n.get(qn("w:numId")) for n in numbering.iterchildren(qn("w:num"))}
+    assert {el.get(qn("w:val")) for el in body.iter(qn("w:numId"))} <= num_ids
+    assert prof.counters["prune.bytes_saved"] > 100_000
+    assert [p.text for p in doc.paragraphs] == [p.text for p in full.paragraphs]
+
+
+def test_prune_drops_orphan_media(tmp_path):
+    img = tmp_path / "img.png"
+    img.write_bytes(PNG_1PX * 200)
+    doc = Document()
+    doc.add_paragraph("保留")
+    doc.add_picture(str(img))
+    doc.add_picture(str(img))  # 同一图片复用同一部件
+    for p in doc.paragraphs[1:]:
+        p._element.getparent().remove(p._element)
+    stats = prune_document(doc)
+    assert stats["parts_removed"] == 1
+    assert stats["bytes_saved"] >= len(PNG_1PX) * 200
+    buf = io.BytesIO()
+    doc.save(buf)
+    assert not [n for n in zipfile.ZipFile(buf).namelist() if n.startswith("word/media/")]
+
+
+def test_prune_keeps_toc_styles_only_with_toc_field():
+    plain = Document()
+    plain.add_paragraph("正文")
+    prune_document(plain)
+    assert "TOC Heading" not in {s.name for s in plain.styles}
+
+    doc = Document()
+    add_toc_field(doc.add_paragraph())
+    prune_document(doc)
+    assert {"TOC Heading", "Normal"} <= {s.name for s in doc.styles}
+
+
+def test_sanitize_prune(tmp_path):
+    raw = tmp_path / "raw.docx"
+    raw_doc = Document()
+    raw_doc.add_paragraph("一、测试标题")
+    raw_doc.add_paragraph("正文内容")
+    raw_doc.save(raw)
+    plain = sanitize_docx(raw, output_path=tmp_path / "plain.docx")
+    pruned = sanitize_docx(raw, output_path=tmp_path / "pruned.docx", prune=True)
+    assert pruned.stat().st_size < plain.stat().st_size
+    a, b = Document(str(plain)), Document(str(pruned))
+    assert [(p.text, p.style.name) for p in a.paragraphs] == [(p.text, p.style.name) for p in b.paragraphs]
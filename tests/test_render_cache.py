@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+from docx_stylekit import profile_session, render_from_json
+from docx_stylekit.render.cache import DirectoryRenderCache, SQLiteRenderCache
+
+
+def _template(n=30):
+    return {"doc": {"blocks": [{"type": "paragraph", "text": f"段落 {i}"} for i in range(n)]}}
+
+
+@pytest.mark.parametrize("name", ["cache_dir", "cache.sqlite"])
+def test_repeat_render_hits_cache(tmp_path, name):
+    cache = tmp_path / name
+    with profile_session() as prof:
+        first = render_from_json(_template(), return_bytes=True, render_cache=cache)
+        second = render_from_json(_template(), return_bytes=True, render_cache=cache)
+        out = render_from_json(_template(), output_path=tmp_path / "out.docx", render_cache=cache)
+    assert prof.counters["render.cache.miss"] == 1
+    assert prof.counters["render.cache.hit"] == 2
+    assert first == second == out.read_bytes()
+
+
+def test_key_covers_content_and_flags(tmp_path):
+    cache = tmp_path / "c"
+    with profile_session() as prof:
+        render_from_json(_template(), return_bytes=True, render_cache=cache)
+        render_from_json(_template(31), return_bytes=True, render_cache=cache)
+        render_from_json(_template(), return_bytes=True, render_cache=cache, compress_level=1)
+    assert prof.counters["render.cache.miss"] == 3
+
+
+def test_cached_output_is_reproducible(tmp_path, monkeypatch):
+    a = render_from_json(_template(), return_bytes=True, render_cache=tmp_path / "a")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 3600)  # 换个钟点再渲染，不依赖真实等待
+    b = render_from_json(_template(), return_bytes=True, render_cache=tmp_path / "b.db")
+    assert a == b
+
+
+def _age(cache, key, t):
+    if isinstance(cache, DirectoryRenderCache):
+        os.utime(cache._entry(key), (t, t))
+    else:
+        with cache._conn:
+            cache._conn.execute("UPDATE renders SET used = ? WHERE key = ?", (t, key))
+
+
+@pytest.mark.parametrize("backend", [DirectoryRenderCache, SQLiteRenderCache])
+def test_lru_eviction_by_size(tmp_path, backend):
+    cache = backend(tmp_path / "cache", max_bytes=250)
+    base = time.time() - 3600
+    for i, key in enumerate(("aa1", "bb2", "cc3")):
+        cache.put(key, b"x" * 100)
+        _age(cache, key, base + i)
+    assert cache.get("aa1") is None
+    assert cache.get("bb2") is not None  # 刷新 bb2，下次淘汰 cc3
+    cache.put("dd4", b"y" * 100)
+    assert cache.get("cc3") is None
+    assert cache.get("bb2") == b"x" * 100 and cache.get("dd4") == b"y" * 100
+
+
+def test_directory_cache_scans_only_when_over_limit(tmp_path, monkeypatch):
+    cache = DirectoryRenderCache(tmp_path / "cache", max_bytes=250)
+    scans = []
+    real_scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or real_scan())
+    cache.put("aa1", b"x" * 100)
+    cache.put("aa1", b"x" * 100)  # 覆盖同键不重复计数
+    cache.put("bb2", b"x" * 100)
+    assert len(scans) == 1
+    cache.put("cc3", b"x" * 100)
+    assert len(scans) == 2 and cache.get("aa1") is None
+
+
+def test_path_opened_backends_are_closed(tmp_path, monkeypatch):
+    closed = []
+    monkeypatch.setattr(SQLiteRenderCache, "close", lambda self: closed.append(self) or self._conn.close())
+    render_from_json(_template(), return_bytes=True, render_cache=tmp_path / "c.db")
+    assert len(closed) == 1
+    with SQLiteRenderCache(tmp_path / "own.db") as own:
+        render_from_json(_template(), return_bytes=True, render_cache=own)
+        assert len(closed) == 1  # 调用方传入的后端不代为关闭
+    with pytest.raises(sqlite3.ProgrammingError):
+        own._conn.execute("SELECT 1")
@@ -0,0 +1,59 @@
+import pytest
+from docx import Document
+
+from docx_stylekit import profile_session, render_from_json
+from docx_stylekit.writer.run_builder import append_run
+from docx_stylekit.writer.style_store import StyleResolver
+
+TEXTS = ["", "普通文本", " 首尾空格 ", "a\tb", "行1\n行2\r\n行3", "\t\n", "　全角空格　"]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_append_run_matches_python_docx(text):
+    doc = Document()
+    strong = doc.styles.add_style("Strong X", 2)
+    expected = doc.add_paragraph()
+    expected.add_run(text).style = strong
+    expected.add_run(text)
+    built = doc.add_paragraph()._p
+    append_run(built, text, strong.style_id)
+    append_run(built, text)
+    assert built.xml == expected._p.xml
+
+
+def test_style_ids_and_override_applied_once():
+    doc = Document()
+    resolver = StyleResolver(doc, {"Normal": {"type": "paragraph", "$override": True, "font": {"ascii": "Arial"}}})
+    with profile_session() as prof:
+        for _ in range(3):
+            st, sid = resolver.ensure_style_id("Normal", "paragraph")
+    assert sid is None  # 默认段落样式不写出 pStyle
+    assert prof.counters["styles.overridden"] == 1
+    assert resolver.ensure_style_id("Heading 1", "paragraph")[1] == "Heading1"
+    with pytest.raises(ValueError):
+        resolver.ensure_style_id("Heading 1", "character")
+
+
+def test_rich_runs_render(tmp_path):
+    runs = [{"text": "前"}, {"text": "粗\t体", "charStyleRef": "Strong"}]
+    tpl = {"doc": {
+        "stylesInline": {"Strong": {"type": "character", "font": {"bold": True}}},
+        "blocks": [{"type": "paragraph", "runs": runs}],
+    }}
+    para = Document(render_from_json(tpl, output_path=tmp_path / "r.docx")).paragraphs[0]
+    assert para.text == "前粗\t体"
+    assert para.runs[1].style.name == "Strong"
+
+
+def test_ensure_style_is_memoized_and_overrides_once():
+    doc = Document()
+    inline = {"Heading 1": {"type": "paragraph", "$override": True, "paragraph": {"align": "center"}}}
+    resolver = StyleResolver(doc, inline)
+    with profile_session() as prof:
+        first = resolver.ensure_style("Heading 1", "paragraph")
+        first.paragraph_format.alignment = 2  # 首次覆盖之后的改动不会被再次覆盖
+        again = [resolver.ensure_style("Heading 1", "paragraph") for _ in range(3)]
+    assert all(st is first for st in again)
+    assert prof.counters["styles.resolved"] == 4
+    assert prof.counters["styles.overridden"] == 1
+    assert doc.styles["Heading 1"].paragraph_format.alignment == 2
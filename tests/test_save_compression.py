@@ -0,0 +1,81 @@
+import base64
+import io
+import time
+import zipfile
+
+from docx import Document
+
+from docx_stylekit import profile_session, render_from_json
+from docx_stylekit.io import package_zip
+from docx_stylekit.io.package_zip import write_docx_package
+
+
+PNG_1PX = base64.b64decode(
+    b"iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEvwH+0zm6AwAAAABJRU5ErkJggg=="
+)
+
+
+def _doc_with_image(tmp_path):
+    img = tmp_path / "img.png"
+    img.write_bytes(PNG_1PX)
+    doc = Document()
+    for i in range(50):
+        doc.add_paragraph(f"段落 {i}")
+    doc.add_picture(str(img))
+    return doc
+
+
+def test_default_level_matches_python_docx_save(tmp_path, monkeypatch):
+    monkeypatch.setattr(package_zip, "PARALLEL_MIN_BYTES", 1024)
+    doc = _doc_with_image(tmp_path)
+    date_time = time.localtime()[:6]
+    saved, written = io.BytesIO(), io.BytesIO()
+    doc.save(saved)
+    with profile_session() as prof:
+        write_docx_package(doc, written, threads=2, date_time=date_time)
+    assert prof.counters["save.parallel_deflate"] >= 1
+    a, b = zipfile.ZipFile(saved), zipfile.ZipFile(written)
+    assert a.namelist() == b.namelist()
+    for x, y in zip(a.infolist(), b.infolist()):
+        assert (x.CRC, x.compress_size, x.compress_type, x.external_attr) == \
+               (y.CRC, y.compress_size, y.compress_type, y.external_attr)
+
+
+def test_store_media_and_stored_level(tmp_path):
+    doc = _doc_with_image(tmp_path)
+    media = io.BytesIO()
+    write_docx_package(doc, media, store_media=True)
+    types = {i.filename: i.compress_type for i in zipfile.ZipFile(media).infolist()}
+    assert types["word/media/image1.png"] == zipfile.ZIP_STORED
+    assert types["word/document.xml"] == zipfile.ZIP_DEFLATED
+
+    stored = io.BytesIO()
+    write_docx_package(doc, stored, compress_level=0)
+    z = zipfile.ZipFile(stored)
+    assert z.testzip() is None and {i.compress_type for i in z.infolist()} == {zipfile.ZIP_STORED}
+
+
+def test_render_compress_level(tmp_path):
+    tpl = {"doc": {"blocks": [{"type": "paragraph", "text": f"段落 {i}"} for i in range(500)]}}
+    fast = render_from_json(tpl, output_path=tmp_path / "fast.docx", compress_level=1)
+    small = render_from_json(tpl, output_path=tmp_path / "small.docx", compress_level=9)
+    default = render_from_json(tpl, output_path=tmp_path / "default.docx")
+    with zipfile.ZipFile(fast) as a, zipfile.ZipFile(default) as b:
+        assert all(a.read(n) == b.read(n) for n in b.namelist())
+    assert fast.stat().st_size >= small.stat().st_size
+
+
+def test_zip64_members_and_directory(tmp_path, monkeypatch):
+    # 把限制调低，小文档即可走 ZIP64 分支（大小、偏移、成员数都超限）
+    monkeypatch.setattr(package_zip, "_LIMIT", 500)
+    monkeypatch.setattr(package_zip, "_COUNT_LIMIT", 3)
+    doc = _doc_with_image(tmp_path)
+    saved, written = io.BytesIO(), io.BytesIO()
+    doc.save(saved)
+    write_docx_package(doc, written, store_media=True)
+    assert b"PK\x06\x06" in written.getvalue()[-200:]
+    a, b = zipfile.ZipFile(saved), zipfile.ZipFile(written)
+    assert b.testzip() is None
+    assert a.namelist() == b.namelist()
+    assert all(a.read(n) == b.read(n) for n in a.namelist())
+    assert [p.text for p in Document(written).paragraphs] == [p.text for p in doc.paragraphs]
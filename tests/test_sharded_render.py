@@ -0,0 +1,61 @@
+import zipfile
+
+import pytest
+
+from docx_stylekit import profile_session, render_from_json
+from docx_stylekit.writer.sharded import MIN_SHARD_BLOCKS, split_shards
+
+
+def _template(n=MIN_SHARD_BLOCKS * 4):
+    cell = lambda t: {"blocks": [{"type": "paragraph", "runs": [{"text": t}]}]}  # noqa: E731
+    blocks = []
+    for i in range(n):
+        if i % 70 == 0:
+            blocks.append({"useTemplate": "land"})
+        blocks.append({"type": "paragraph", "runs": [{"text": f"段落 {i}\t"}, {"text": "粗", "charStyleRef": "Strong"}]})
+    blocks.append({"type": "paragraph", "styleRef": "Late", "text": "末尾才用到的样式"})
+    return {"doc": {
+        "stylesInline": {
+            "Strong": {"type": "character", "font": {"bold": True}},
+            "Late": {"type": "paragraph", "basedOn": "Normal", "font": {"sizePt": 9}},
+        },
+        "pageTemplates": {"land": {
+            "layout": {"orientation": "landscape"},
+            "blocks": [{"type": "table", "columns": [{"widthPct": 30}, {"widthPct": 70}],
+                        "header": [[cell("A"), cell("B")]], "rows": [[cell("1"), cell("2")]]}],
+        }},
+        "headersFooters": {"footer": [{"type": "pageNumber", "align": "center"}]},
+        "blocks": blocks,
+    }}
+
+
+def _parts(path):
+    with zipfile.ZipFile(path) as z:
+        return {n: z.read(n) for n in z.namelist()}
+
+
+def test_sharded_matches_serial(tmp_path):
+    serial = render_from_json(_template(), output_path=tmp_path / "serial.docx")
+    with profile_session() as prof:
+        sharded = render_from_json(_template(), output_path=tmp_path / "sharded.docx", workers=2)
+    assert prof.counters["render.shards"] >= 2
+    assert _parts(serial) == _parts(sharded)
+
+
+def test_split_shards_keeps_order_and_boundaries():
+    blocks = [{"type": "paragraph", "text": "x" * (i % 7)} for i in range(MIN_SHARD_BLOCKS * 3)]
+    shards = split_shards(blocks, 8)
+    assert len(shards) == 3
+    assert [b for s in shards for b in s] == blocks
+    assert split_shards(blocks[:10], 4) == [blocks[:10]]
+
+
+def test_small_documents_render_serially(tmp_path):
+    with profile_session() as prof:
+        render_from_json(_template(10), output_path=tmp_path / "small.docx", workers=4)
+    assert "render.shards" not in prof.counters
+
+
+def test_workers_conflict_with_incremental(tmp_path):
+    with pytest.raises(ValueError):
+        render_from_json(_template(10), output_path=tmp_path / "a.docx", incremental=True, workers=2)
@@ -0,0 +1,51 @@
+import io
+import zipfile
+
+from docx_stylekit import render_from_json
+from docx_stylekit.io.stream_zip import ChunkedWriter
+
+
+class _Socket:
+    """只有 write/flush 的写入端（模拟 socket / HTTP 响应）。"""
+
+    def __init__(self):
+        self.chunks = []
+        self.flushed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        self.flushed = True
+
+
+def _template():
+    return {"doc": {"blocks": [{"type": "paragraph", "text": f"段落 {i}"} for i in range(200)]}}
+
+
+def test_stream_to_unseekable_writer(tmp_path):
+    sock = _Socket()
+    assert render_from_json(_template(), output_path=sock) is sock
+    streamed = zipfile.ZipFile(io.BytesIO(b"".join(sock.chunks)))
+    assert sock.flushed and streamed.testzip() is None
+    assert all(info.flag_bits & 0x08 for info in streamed.infolist())
+
+    saved = zipfile.ZipFile(render_from_json(_template(), output_path=tmp_path / "out.docx"))
+    assert streamed.namelist() == saved.namelist()
+    assert all(streamed.read(n) == saved.read(n) for n in saved.namelist())
+
+
+def test_return_bytes_matches_file(tmp_path):
+    path = render_from_json(_template(), output_path=tmp_path / "out.docx")
+    assert render_from_json(_template(), return_bytes=True) == path.read_bytes()
+
+
+def test_chunked_writer_batches_small_writes():
+    sock = _Socket()
+    w = ChunkedWriter(sock, chunk_size=10)
+    for _ in range(7):
+        w.write(b"abc")
+    assert [len(c) for c in sock.chunks] == [12]
+    w.flush()
+    assert b"".join(sock.chunks) == b"abc" * 7 and w.bytes_written == 21
@@ -0,0 +1,48 @@
+import copy
+from pathlib import Path
+
+from docx_stylekit import diff_yaml, iter_diff_yaml
+from docx_stylekit.diff.structural import DigestCache, structural_diff
+from docx_stylekit.utils.io import load_yaml
+
+
+def _section(rid):
+    return {
+        "pgSz": {"w_cm": 21.0, "h_cm": 29.7, "orient": "portrait"},
+        "titlePg": False,
+        "headerRefs": [{"type": "default", "rId": rid}],
+    }
+
+
+def test_identical_inputs_produce_no_diff():
+    observed = load_yaml(Path("sampleObserved.yaml"))
+    assert structural_diff(observed, copy.deepcopy(observed)) == []
+
+
+def test_keyed_list_alignment_reports_only_changed_element():
+    a = {"refs": [{"rId": "rId1", "type": "default"}, {"rId": "rId2", "type": "first"}]}
+    b = {"refs": [{"rId": "rId2", "type": "even"}, {"rId": "rId1", "type": "default"}]}
+    diffs = structural_diff(a, b)
+    assert diffs == [{"path": "refs[rId=rId2].type", "a": "first", "b": "even", "status": "changed"}]
+
+
+def test_sequence_alignment_of_inserted_section():
+    a = {"sections": [_section("rId7"), _section("rId9")]}
+    b = {"sections": [_section("rId7"), _section("rId8"), _section("rId9")]}
+    diffs = structural_diff(a, b)
+    assert [(d["path"], d["status"]) for d in diffs] == [("sections[1]", "added")]
+
+
+def test_digest_cache_matches_equality_semantics():
+    cache = DigestCache()
+    assert cache.same({"a": [1, {"b": 2.0}]}, {"a": [1, {"b": 2}]})
+    assert not cache.same({"a": [1, 2]}, {"a": [2, 1]})
+
+
+def test_api_structural_diff_is_lazy_and_consistent():
+    enterprise = Path("examples/enterprise_baseline.yaml")
+    observed = Path("sampleObserved.yaml")
+    it = iter_diff_yaml(enterprise, observed)
+    first = next(it)
+    assert {"path", "a", "b", "status"} <= set(first)
+    assert [first, *it] == diff_yaml(enterprise, observed, structural=True)
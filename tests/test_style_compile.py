@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+from docx import Document
+
+from docx_stylekit import profile_session, render_from_json
+from docx_stylekit.writer.skeleton import clear_skeletons
+from docx_stylekit.writer.style_store import StyleResolver, clear_compiled_styles
+
+STYLES = {
+    "Body": {"type": "paragraph", "basedOn": "Normal", "font": {"eastAsia": "仿宋", "sizePt": 16, "bold": True}},
+    "Heading 1": {"type": "paragraph", "$override": True, "font": {"color": "#FF0000"}, "paragraph": {"align": "center"}},
+    "Mark": {"type": "character", "font": {"italic": True}},
+}
+
+
+def _styles_xml(template_docx):
+    blocks = [{"type": "paragraph", "styleRef": "Body", "runs": [{"text": "x", "charStyleRef": "Mark"}]}]
+    data = render_from_json({"doc": {"stylesInline": STYLES, "blocks": blocks}}, template_docx=template_docx, return_bytes=True)
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        return z.read("word/styles.xml")
+
+
+def test_compiled_styles_match_direct_application():
+    for template in (None, "examples/sample.docx"):
+        clear_compiled_styles()
+        cold = _styles_xml(template)
+        clear_skeletons()
+        with profile_session() as prof:
+            warm = _styles_xml(template)
+        assert cold == warm
+        assert prof.counters["styles.compiled_reused"] >= 2
+
+
+def test_override_cache_keyed_by_template_style():
+    clear_compiled_styles()
+    first = Document()
+    heading = StyleResolver(first, STYLES).ensure_style("Heading 1", "paragraph")
+    assert heading.paragraph_format.alignment == 1
+    second = Document("examples/sample.docx")
+    before = len(second.styles.element)
+    resolved = StyleResolver(second, STYLES).ensure_style("Heading 1", "paragraph")
+    assert resolved._element is second.styles["Heading 1"]._element
+    assert len(second.styles.element) == before
+    assert second.styles["Heading 1"].font.color.rgb == resolved.font.color.rgb
@@ -0,0 +1,73 @@
+from docx import Document
+from docx.oxml.ns import qn
+from docx.shared import Emu
+
+from docx_stylekit import render_from_json
+
+
+def _cell(text):
+    return {"blocks": [{"type": "paragraph", "runs": [{"text": text}]}]}
+
+
+def _table_doc(tmp_path):
+    fmt = {
+        "header": {"fill": "#DDEEFF", "bold": True, "verticalAlign": "center"},
+        "bandedRows": True,
+        "alternate": {"fill": "F5F5F5"},
+        "cell": {"verticalAlign": "bottom"},
+    }
+    block = {
+        "type": "table",
+        "columns": [{"widthPct": 50}, {}, {}],
+        "format": fmt,
+        "header": [[_cell("A"), _cell("B"), _cell("C")]],
+        "rows": [[_cell(str(i)), _cell("x"), _cell("y")] for i in range(4)],
+    }
+    return Document(render_from_json({"doc": {"blocks": [block]}}, output_path=tmp_path / "t.docx"))
+
+
+def test_widths_written_as_twips(tmp_path):
+    doc = _table_doc(tmp_path)
+    section = doc.sections[0]
+    usable = Emu(section.page_width - section.left_margin - section.right_margin).twips
+    tbl = doc.tables[0]._tbl
+    assert tbl.tblPr.find(qn("w:tblW")).get(qn("w:w")) == str(usable)
+    grid = [int(g.get(qn("w:w"))) for g in tbl.tblGrid.gridCol_lst]
+    assert abs(sum(grid) - usable) <= 2
+    assert abs(grid[0] - usable / 2) <= 1
+    for tr in tbl.tr_lst:
+        assert [int(tc.tcPr.tcW.get(qn("w:w"))) for tc in tr.tc_lst] == grid
+
+
+def test_header_banding_and_body_format(tmp_path):
+    table = _table_doc(tmp_path).tables[0]
+    fills = [tr.tc_lst[0].tcPr.find(qn("w:shd")) for tr in table._tbl.tr_lst]
+    assert [f.get(qn("w:fill")) if f is not None else None for f in fills] == ["DDEEFF", "F5F5F5", None, "F5F5F5", None]
+    assert table.rows[0].cells[0].paragraphs[0].runs[0].font.bold is True
+    assert table.rows[0].cells[0].vertical_alignment == 1  # center
+    assert all(c.vertical_alignment == 3 for row in table.rows[1:] for c in row.cells)  # bottom
+
+
+def test_widths_follow_tracked_section_layout(tmp_path, monkeypatch):
+    from docx.document import Document as DocumentObject
+
+    block = {"type": "table", "columns": [{}, {}], "rows": [[_cell("1"), _cell("2")]]}
+    tpl = {"doc": {
+        "pageSetup": {"marginsCm": {"left": 3, "right": 3}},
+        "pageTemplates": {"wide": {"layout": {"orientation": "landscape", "marginsCm": {"left": 1, "right": 1}},
+                                   "blocks": [block]}},
+        "blocks": [block, {"useTemplate": "wide"}, block],
+    }}
+    calls = []
+    sections = DocumentObject.sections
+    monkeypatch.setattr(DocumentObject, "sections", property(lambda self: calls.append(1) or sections.fget(self)))
+    out = render_from_json(tpl, output_path=tmp_path / "t.docx")
+    monkeypatch.undo()
+    # 表格宽度取自记录的节状态，写正文时不再逐表查询 doc.sections
+    assert len(calls) <= 1
+    doc = Document(out)
+    widths = [int(t._tbl.tblPr.find(qn("w:tblW")).get(qn("w:w"))) for t in doc.tables]
+    first, last = doc.sections[0], doc.sections[-1]
+    assert widths[0] == Emu(first.page_width - first.left_margin - first.right_margin).twips
+    assert widths[1] == widths[2] == Emu(last.page_width - last.left_margin - last.right_margin).twips
+    assert widths[1] > widths[0]